@@ -0,0 +1,93 @@
+"""
+Feed activities for songs and exchanges. A new song's activity is saved by the
+post_save signal in core/signals.py, and bulk writers that bypass signals (e.g.
+the bulk song import) build the same objects here and bulk_create them.
+Exchange activities are created by the matchers, in the transaction that
+matches the exchanges, with create_song_exchange_activities.
+
+An exchange has at most one song_exchange activity (a partial unique constraint
+since core migration 0004); delete_duplicate_exchange_activities removes the
+duplicates left from before it.
+"""
+from django.db.models import F, Max, Min, Window
+from django.db.models.functions import RowNumber
+
+from core.models import Activity
+
+
+def song_discovery_activity(song):
+    """Unsaved activity announcing a newly uploaded song"""
+    return Activity(
+        actor=song.uploader,
+        activity_type='song_discovery',
+        song=song,
+        extra_data={
+            'song_title': song.title,
+            'song_artist': song.artist,
+            'song_url': song.url,
+        }
+    )
+
+
+def song_exchange_activity(exchange):
+    """Unsaved activity for a matched exchange, with the sender as the actor"""
+    return Activity(
+        actor=exchange.sender,
+        activity_type='song_exchange',
+        song_exchange=exchange,
+        extra_data={
+            'sent_song_title': exchange.sent_song.title,
+            'sent_song_artist': exchange.sent_song.artist,
+            'received_song_title': exchange.received_song.title if exchange.received_song else None,
+            'received_song_artist': exchange.received_song.artist if exchange.received_song else None,
+            'receiver_name': exchange.receiver.display_name,
+            'sender_name': exchange.sender.display_name,
+            'match_type': exchange.match_type if exchange.match_type else None,
+        }
+    )
+
+
+def create_song_exchange_activities(exchanges):
+    """
+    Save the feed activities of matched exchanges in one INSERT. Their sender,
+    receiver and songs must already be loaded. Exchanges that have an activity
+    already are skipped by the unique constraint.
+    """
+    Activity.objects.bulk_create([song_exchange_activity(exchange) for exchange in exchanges], ignore_conflicts=True)
+
+
+def duplicate_exchange_activities(activities):
+    """The song_exchange activities of `activities` other than the oldest of their exchange"""
+    return activities.filter(activity_type='song_exchange', song_exchange__isnull=False).annotate(
+        position=Window(
+            RowNumber(),
+            partition_by=[F('song_exchange_id')],
+            order_by=[F('created_at').asc(), F('id').asc()],
+        )
+    ).filter(position__gt=1)
+
+
+def delete_duplicate_exchange_activities(chunk_size=10000, dry_run=False):
+    """
+    Delete the duplicate song_exchange activities, keeping the oldest of each
+    exchange, one range of `chunk_size` exchange ids at a time. Reactions and
+    comments on the deleted activities are deleted with them.
+    Returns (exchanges with duplicates, activities deleted or, with dry_run, to delete).
+    """
+    exchange_activities = Activity.objects.filter(activity_type='song_exchange')
+    bounds = exchange_activities.aggregate(first=Min('song_exchange_id'), last=Max('song_exchange_id'))
+    if bounds['first'] is None:
+        return 0, 0
+
+    exchanges = deleted = 0
+    for start in range(bounds['first'], bounds['last'] + 1, chunk_size):
+        duplicates = list(duplicate_exchange_activities(
+            Activity.objects.filter(song_exchange_id__gte=start, song_exchange_id__lt=start + chunk_size)
+        ).values_list('id', 'song_exchange_id'))
+        if not duplicates:
+            continue
+        exchanges += len({exchange_id for _, exchange_id in duplicates})
+        deleted += len(duplicates)
+        if not dry_run:
+            Activity.objects.filter(id__in=[activity_id for activity_id, _ in duplicates]).delete()
+    return exchanges, deleted
@@ -25,13 +25,13 @@ def toggle_reaction(request, activity_id, reaction_type):
     try:
         activity = Activity.objects.get(uid=activity_id)
     except Activity.DoesNotExist:
-        logger.warning(f"Activity {activity_id} not found for user {request.user.email}")
+        logger.warning("Activity %s not found for user %s", activity_id, request.user.email)
         return Response(
             {'error': 'Activity not found'},
             status=status.HTTP_404_NOT_FOUND
         )
     except Exception as e:
-        logger.error(f"Error fetching activity {activity_id}: {str(e)}", exc_info=True)
+        logger.error("Error fetching activity %s: %s", activity_id, e, exc_info=True)
         return Response(
             {'error': 'Invalid activity ID'},
             status=status.HTTP_400_BAD_REQUEST
@@ -42,7 +42,7 @@ def toggle_reaction(request, activity_id, reaction_type):
     # Validate reaction type
     valid_reactions = ['🎵', '🎶', '🎸', '🎹', '🥁', '🎤']
     if not reaction_type or reaction_type not in valid_reactions:
-        logger.warning(f"Invalid reaction type '{reaction_type}' from user {user.email}")
+        logger.warning("Invalid reaction type '%s' from user %s", reaction_type, user.email)
         return Response(
             {'error': 'Invalid reaction type. Must be one of: 🎵, 🎶, 🎸, 🎹, 🥁, 🎤'},
             status=status.HTTP_400_BAD_REQUEST
@@ -89,7 +89,7 @@ def toggle_reaction(request, activity_id, reaction_type):
                         send_push=False,
                         target_url=activity_url
                     )
-                    logger.info(f"Notification sent to activity actor {activity.actor.email} for reaction on activity {activity.uid}")
+                    logger.info("Notification sent to activity actor %s for reaction on activity %s", activity.actor.email, activity.uid)
                 
                 # For song exchanges, also notify the other party (receiver)
                 if activity.activity_type == 'song_exchange' and activity.song_exchange:
@@ -106,7 +106,7 @@ def toggle_reaction(request, activity_id, reaction_type):
                             send_push=False,
                             target_url=activity_url
                         )
-                        logger.info(f"Notification sent to receiver {exchange.receiver.email} for reaction on activity {activity.uid}")
+                        logger.info("Notification sent to receiver %s for reaction on activity %s", exchange.receiver.email, activity.uid)
                     
                     # Notify sender if they're different from actor and person who reacted
                     if exchange.sender and exchange.sender != user and exchange.sender != activity.actor:
@@ -120,9 +120,9 @@ def toggle_reaction(request, activity_id, reaction_type):
                             send_push=False,
                             target_url=activity_url
                         )
-                        logger.info(f"Notification sent to sender {exchange.sender.email} for reaction on activity {activity.uid}")
+                        logger.info("Notification sent to sender %s for reaction on activity %s", exchange.sender.email, activity.uid)
             except Exception as e:
-                logger.error(f"Error sending reaction notifications: {str(e)}", exc_info=True)
+                logger.error("Error sending reaction notifications: %s", e, exc_info=True)
                 # Don't fail the reaction creation if notification fails
             
             return Response({
@@ -208,14 +208,14 @@ def add_comment(request, activity_id):
     text = request.data.get('text', '').strip()
     
     if not text:
-        logger.warning(f"Empty comment attempt by {user.email} on activity {activity_id}")
+        logger.warning("Empty comment attempt by %s on activity %s", user.email, activity_id)
         return Response(
             {'error': 'Comment text is required'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
     if len(text) > 500:
-        logger.warning(f"Comment too long ({len(text)} chars) by {user.email} on activity {activity_id}")
+        logger.warning("Comment too long (%d chars) by %s on activity %s", len(text), user.email, activity_id)
         return Response(
             {'error': 'Comment is too long (max 500 characters)'},
             status=status.HTTP_400_BAD_REQUEST
@@ -231,10 +231,12 @@ def add_comment(request, activity_id):
             activity=activity,
             text=text
         )
-        logger.info(f"Comment {comment.uid} created by {user.email} on activity {activity_id}")
+        logger.info("Comment %s created by %s on activity %s", comment.uid, user.email, activity_id)
         
-        # Log if there's a reciprocal activity for debugging
-        if activity.activity_type == 'song_exchange' and activity.song_exchange:
+        # Log if there's a reciprocal activity for debugging; looking it up takes
+        # two queries, so only when debug logging is on
+        if (logger.isEnabledFor(logging.DEBUG)
+                and activity.activity_type == 'song_exchange' and activity.song_exchange):
             exchange = activity.song_exchange
             if exchange.sender and exchange.receiver and exchange.sent_song and exchange.received_song:
                 reciprocal_exchange = SongExchange.objects.filter(
@@ -249,9 +251,10 @@ def add_comment(request, activity_id):
                         song_exchange=reciprocal_exchange,
                         activity_type='song_exchange'
                     )
-                    logger.info(
-                        f"Found {reciprocal_activities.count()} reciprocal activities for exchange {exchange.uid}. "
-                        f"Comments will be aggregated when fetching."
+                    logger.debug(
+                        "Found %d reciprocal activities for exchange %s. "
+                        "Comments will be aggregated when fetching.",
+                        reciprocal_activities.count(), exchange.uid
                     )
         
         # Send notifications to activity participants
@@ -271,7 +274,7 @@ def add_comment(request, activity_id):
                     send_push=False,
                     target_url=activity_url
                 )
-                logger.info(f"Notification sent to activity actor {activity.actor.email} for comment {comment.uid}")
+                logger.info("Notification sent to activity actor %s for comment %s", activity.actor.email, comment.uid)
             
             # For song exchanges, also notify the other party (receiver)
             if activity.activity_type == 'song_exchange' and activity.song_exchange:
@@ -288,7 +291,7 @@ def add_comment(request, activity_id):
                         send_push=False,
                         target_url=activity_url
                     )
-                    logger.info(f"Notification sent to receiver {exchange.receiver.email} for comment {comment.uid}")
+                    logger.info("Notification sent to receiver %s for comment %s", exchange.receiver.email, comment.uid)
                 
                 # Notify sender if they're different from actor and commenter
                 if exchange.sender and exchange.sender != user and exchange.sender != activity.actor:
@@ -302,13 +305,13 @@ def add_comment(request, activity_id):
                         send_push=False,
                         target_url=activity_url
                     )
-                    logger.info(f"Notification sent to sender {exchange.sender.email} for comment {comment.uid}")
+                    logger.info("Notification sent to sender %s for comment %s", exchange.sender.email, comment.uid)
         except Exception as e:
-            logger.error(f"Error sending comment notifications: {str(e)}", exc_info=True)
+            logger.error("Error sending comment notifications: %s", e, exc_info=True)
             # Don't fail the comment creation if notification fails
         
     except Exception as e:
-        logger.error(f"Error creating comment: {str(e)}", exc_info=True)
+        logger.error("Error creating comment: %s", e, exc_info=True)
         return Response(
             {'error': 'Failed to create comment'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -377,28 +380,29 @@ def get_activity_comments(request, activity_id):
             activity_ids.extend([a.id for a in reciprocal_activities])
         
         # Get all comments from all related activities
-        comments = ActivityComment.objects.filter(
+        comments = list(ActivityComment.objects.filter(
             activity_id__in=activity_ids
-        ).select_related('user', 'activity').order_by('created_at')
+        ).select_related('user', 'activity').order_by('created_at'))
         
         logger.info(
-            f"Fetching comments for activity {activity_id} (exchange {exchange.uid}) "
-            f"by user {request.user.email}. Found {comments.count()} comments "
-            f"across {len(activity_ids)} related activities"
+            "Fetching comments for activity %s (exchange %s) by user %s. "
+            "Found %d comments across %d related activities",
+            activity_id, exchange.uid, request.user.email, len(comments), len(activity_ids)
         )
     else:
         # For non-exchange activities, just get comments for this activity
-        comments = ActivityComment.objects.filter(
+        comments = list(ActivityComment.objects.filter(
             activity=activity
-        ).select_related('user').order_by('created_at')
+        ).select_related('user').order_by('created_at'))
         
         logger.info(
-            f"Fetching comments for activity {activity_id} (type: {activity.activity_type}) "
-            f"by user {request.user.email}. Found {comments.count()} comments"
+            "Fetching comments for activity %s (type: %s) by user %s. Found %d comments",
+            activity_id, activity.activity_type, request.user.email, len(comments)
         )
     
     comments_data = []
     seen_comment_ids = set()  # Deduplicate in case of any overlap
+    log_comments = logger.isEnabledFor(logging.DEBUG)
     
     for comment in comments:
         # Skip duplicates (shouldn't happen, but safety check)
@@ -424,13 +428,17 @@ def get_activity_comments(request, activity_id):
             'created_at': comment.created_at.isoformat(),
         })
         
-        logger.debug(
-            f"Comment {comment.uid} by {comment.user.email} ({comment.user.display_name}) "
-            f"on activity {comment.activity.uid}: '{comment.text[:50]}...'"
-        )
+        if log_comments:
+            # comment.activity is only selected for song exchanges
+            logger.debug(
+                "Comment %s by %s (%s) on activity %s: '%s...'",
+                comment.uid, comment.user.email, comment.user.display_name,
+                comment.activity.uid, comment.text[:50]
+            )
     
     logger.info(
-        f"Returning {len(comments_data)} unique comments for activity {activity_id} to user {request.user.email}"
+        "Returning %d unique comments for activity %s to user %s",
+        len(comments_data), activity_id, request.user.email
     )
     
     return Response({
@@ -456,7 +464,7 @@ def delete_comment(request, comment_id):
         )
     
     if comment.user != request.user:
-        logger.warning(f"User {request.user.email} attempted to delete comment {comment_id} owned by {comment.user.email}")
+        logger.warning("User %s attempted to delete comment %s owned by %s", request.user.email, comment_id, comment.user.email)
         return Response(
             {'error': 'You can only delete your own comments'},
             status=status.HTTP_403_FORBIDDEN
@@ -464,12 +472,12 @@ def delete_comment(request, comment_id):
     
     try:
         comment.delete()
-        logger.info(f"Comment {comment_id} deleted by {request.user.email}")
+        logger.info("Comment %s deleted by %s", comment_id, request.user.email)
         return Response({
             'message': 'Comment deleted'
         }, status=status.HTTP_200_OK)
     except Exception as e:
-        logger.error(f"Error deleting comment {comment_id}: {str(e)}", exc_info=True)
+        logger.error("Error deleting comment %s: %s", comment_id, e, exc_info=True)
         return Response(
             {'error': 'Failed to delete comment'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
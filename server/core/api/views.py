@@ -11,6 +11,7 @@ from core.decorators import handle_api_errors
 from django.db.models import Count
 from users.models import Friendship
 import pycountry
+from soundly.metrics import FEED_ASSEMBLY_SECONDS
 import logging
 
 User = get_user_model()
@@ -58,7 +59,7 @@ def country_list(request):
     search = request.GET.get("search", "").strip().lower()
     
     if search and len(search) > 100:
-        logger.warning(f"Country search query too long: {len(search)} characters")
+        logger.warning("Country search query too long: %d characters", len(search))
         return Response(
             {"error": "Search query must be less than 100 characters"},
             status=status.HTTP_400_BAD_REQUEST
@@ -84,7 +85,7 @@ def country_list(request):
         ]
         return Response(result, status=status.HTTP_200_OK)
     except Exception as e:
-        logger.error(f"Error in country_list: {str(e)}", exc_info=True)
+        logger.error("Error in country_list: %s", e, exc_info=True)
         return Response(
             {"error": "Failed to fetch countries"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -94,6 +95,7 @@ def country_list(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 @handle_api_errors
+@FEED_ASSEMBLY_SECONDS.time()
 def activity_feed(request):
     """
     Get activity feed from all users
@@ -105,14 +107,17 @@ def activity_feed(request):
     
     # Input validation
     if scope not in ['all', 'friends']:
-        logger.warning(f"Invalid scope '{scope}' from user {user.email}")
+        logger.warning("Invalid scope '%s' from user %s", scope, user.email)
         scope = 'all'  # Default to 'all' if invalid
     
-    logger.info(f"Activity feed requested by {user.email} with scope={scope}")
+    logger.info("Activity feed requested by %s with scope=%s", user.email, scope)
     
-    # For debugging: log exchange activities
-    exchange_activities = Activity.objects.filter(activity_type='song_exchange').count()
-    logger.debug(f"Total exchange activities in DB: {exchange_activities}")
+    # For debugging: log exchange activities, counted only when debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Total exchange activities in DB: %d",
+            Activity.objects.filter(activity_type='song_exchange').count()
+        )
     
     if scope == 'all':
         # Get only song exchange activities from all users
@@ -120,7 +125,8 @@ def activity_feed(request):
         # we need to show exchanges where the user is either sender or receiver
         # But exclude activities where the user is the actor (to avoid showing their own activities)
         activities = Activity.objects.filter(
-            activity_type='song_exchange'
+            activity_type='song_exchange',
+            song_exchange__isnull=False
         ).exclude(
             actor=user
         ).select_related(
@@ -134,21 +140,8 @@ def activity_feed(request):
             'song__platform'
         ).order_by('-created_at')
         
-        # Additional deduplication by song_exchange to ensure no duplicates
-        # (safety measure in case old duplicate activities exist)
-        seen_exchanges = set()
-        unique_activities = []
-        for activity in activities:
-            if activity.song_exchange:
-                exchange_id = activity.song_exchange.uid
-                if exchange_id not in seen_exchanges:
-                    seen_exchanges.add(exchange_id)
-                    unique_activities.append(activity)
-                    if len(unique_activities) >= 50:  # Limit to 50 most recent
-                        break
-        
-        activities_list = unique_activities
-        logger.info(f"Found {len(activities_list)} unique exchange activities from all users (deduplicated)")
+        activities_list = list(activities[:50])  # Limit to 50 most recent
+        logger.info("Found %d exchange activities from all users", len(activities_list))
     else:
         # Get all friends
         friendships = Friendship.objects.filter(
@@ -177,7 +170,8 @@ def activity_feed(request):
         # However, since activities are created with sender as actor, we just filter by actor in friends
         activities = Activity.objects.filter(
             actor_id__in=friend_ids,
-            activity_type='song_exchange'
+            activity_type='song_exchange',
+            song_exchange__isnull=False
         ).select_related(
             'actor',
             'song',
@@ -189,22 +183,9 @@ def activity_feed(request):
             'song__platform'
         ).order_by('-created_at')
         
-        # Additional deduplication by song_exchange (safety measure)
-        seen_exchanges = set()
-        unique_activities = []
-        for activity in activities:
-            if activity.song_exchange:
-                exchange_id = activity.song_exchange.uid
-                if exchange_id not in seen_exchanges:
-                    seen_exchanges.add(exchange_id)
-                    unique_activities.append(activity)
-                    if len(unique_activities) >= 50:  # Limit to 50 most recent
-                        break
-        
-        activities_list = unique_activities
-        logger.info(f"Found {len(activities_list)} unique exchange activities from {len(friend_ids)} friends (deduplicated)")
+        activities_list = list(activities[:50])  # Limit to 50 most recent
+        logger.info("Found %d exchange activities from %d friends", len(activities_list), len(friend_ids))
     
-    # Use the deduplicated activities list
     activities = activities_list
     
     # Serialize activities
@@ -393,7 +374,7 @@ def activity_feed(request):
         
         feed_data.append(activity_data)
     
-    logger.info(f"Returning {len(feed_data)} activities to {user.email}")
+    logger.info("Returning %d activities to %s", len(feed_data), user.email)
     
     return Response({
         'count': len(feed_data),
@@ -29,7 +29,7 @@ def initialize_firebase_admin(cred_path=None):
             cred_path = os.environ.get("FIREBASE_CREDENTIALS_PATH", default_cred_path)
         
         if not os.path.exists(cred_path):
-            logger.error(f"Firebase credentials file not found at: {cred_path}")
+            logger.error("Firebase credentials file not found at: %s", cred_path)
             logger.warning("FCM notifications will not work without valid Firebase credentials")
             return
         
@@ -38,7 +38,7 @@ def initialize_firebase_admin(cred_path=None):
             firebase_admin.initialize_app(cred)
             logger.info("Firebase Admin initialized successfully.")
         except Exception as e:
-            logger.error(f"Failed to initialize Firebase Admin: {e}", exc_info=True)
+            logger.error("Failed to initialize Firebase Admin: %s", e, exc_info=True)
     else:
         logger.debug("Firebase Admin already initialized.")
 
@@ -78,9 +78,9 @@ def send_push_notification(device_token, title, body, data=None):
     try:
         # Send message via Firebase Admin SDK
         response = messaging.send(message)
-        logger.info(f'Successfully sent FCM message: {response}')
+        logger.info('Successfully sent FCM message: %s', response)
         return response
     except Exception as e:
-        logger.error(f'Error sending FCM message: {e}', exc_info=True)
+        logger.error('Error sending FCM message: %s', e, exc_info=True)
         return None
 
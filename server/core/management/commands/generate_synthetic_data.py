@@ -0,0 +1,80 @@
+"""
+Django management command to fill the database with a synthetic dataset:
+users, songs with Zipf-distributed genres, exchanges, activities, reactions,
+comments, friendships and notifications, all written with bulk_create.
+Usage: python manage.py generate_synthetic_data --users 1000 --seed 42
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.synthetic import clear_dataset, generate_dataset
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic dataset for benchmarks and load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Number of users (default: 100)')
+        parser.add_argument(
+            '--songs-per-user', type=int, default=10, help='Average songs per user (default: 10)'
+        )
+        parser.add_argument(
+            '--exchanges-per-user', type=int, default=8, help='Average exchanges sent per user (default: 8)'
+        )
+        parser.add_argument(
+            '--friends-per-user', type=int, default=5, help='Friend requests sent per user (default: 5)'
+        )
+        parser.add_argument(
+            '--reactions-per-activity', type=int, default=2, help='Average reactions per activity (default: 2)'
+        )
+        parser.add_argument(
+            '--comments-per-activity', type=int, default=1, help='Average comments per activity (default: 1)'
+        )
+        parser.add_argument(
+            '--notifications-per-user', type=int, default=20, help='Average notifications per user (default: 20)'
+        )
+        parser.add_argument(
+            '--zipf-exponent', type=float, default=1.1, help='Skew of the genre distribution (default: 1.1)'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+        parser.add_argument(
+            '--prefix',
+            default='synthetic',
+            help='Email prefix of the generated users (default: synthetic)',
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete previously generated users with the same prefix first',
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        start = time.perf_counter()
+
+        with transaction.atomic():
+            if options['clear']:
+                deleted = clear_dataset(prefix)
+                self.stdout.write(f'Deleted {deleted} rows from a previous dataset')
+
+            counts = generate_dataset(
+                users=options['users'],
+                songs_per_user=options['songs_per_user'],
+                exchanges_per_user=options['exchanges_per_user'],
+                friends_per_user=options['friends_per_user'],
+                reactions_per_activity=options['reactions_per_activity'],
+                comments_per_activity=options['comments_per_activity'],
+                notifications_per_user=options['notifications_per_user'],
+                zipf_exponent=options['zipf_exponent'],
+                seed=options['seed'],
+                prefix=prefix,
+            )
+
+        elapsed = time.perf_counter() - start
+        for model, count in counts.items():
+            self.stdout.write(f'  {model}: {count}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Generated {sum(counts.values())} rows in {elapsed:.1f}s')
+        )
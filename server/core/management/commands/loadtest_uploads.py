@@ -0,0 +1,96 @@
+"""
+Django management command that fires concurrent song uploads at a running server
+and reports throughput and latency percentiles.
+
+Run it against the same build once with SERVER_MODE=wsgi and once with
+SERVER_MODE=asgi, with the fake providers and FAKE_PROVIDER_LATENCY_MS set on the
+server, to compare how the two modes cope with uploads waiting on upstream calls.
+Usage: python manage.py loadtest_uploads --email user@example.com --path /api/songs/upload-async/
+"""
+import json
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.management.commands.run_benchmarks import percentile
+from users.choices import UserTypeChoice
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Load test the song upload endpoint of a running server with concurrent requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', required=True, help='User the uploads are made as')
+        parser.add_argument(
+            '--base-url', default='http://127.0.0.1:8000', help='Server to test (default: http://127.0.0.1:8000)'
+        )
+        parser.add_argument(
+            '--path', default='/api/songs/', help='Upload endpoint (default: /api/songs/)'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=200, help='Total uploads to send (default: 200)'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=20, help='Uploads in flight at once (default: 20)'
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=30, help='Per-request timeout in seconds (default: 30)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['email'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['email']} does not exist")
+        # Unlimited uploads so the run never hits the daily limit
+        if user.type != UserTypeChoice.PREMIUM:
+            User.objects.filter(pk=user.pk).update(type=UserTypeChoice.PREMIUM)
+
+        url = options['base_url'].rstrip('/') + options['path']
+        token = str(AccessToken.for_user(user))
+        run_id = uuid.uuid4().hex[:8]
+
+        def upload(i):
+            body = json.dumps({
+                'url': f'https://open.spotify.com/track/load{run_id}{i:06d}',
+                'genre_match': 'true',
+            }).encode()
+            request = urllib.request.Request(url, data=body, method='POST', headers={
+                'Authorization': f'Bearer {token}',
+                'Content-Type': 'application/json',
+            })
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=options['timeout']) as response:
+                    status_code = response.status
+            except urllib.error.HTTPError as e:
+                status_code = e.code
+            except OSError:
+                status_code = None
+            return status_code, (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(upload, range(options['requests'])))
+        elapsed = time.perf_counter() - start
+
+        timings = [ms for status_code, ms in results if status_code == 201]
+        failures = len(results) - len(timings)
+        if not timings:
+            raise CommandError(f'All {failures} uploads failed')
+
+        self.stdout.write(f"{url}: {len(results)} uploads, concurrency {options['concurrency']}")
+        self.stdout.write(f"Throughput  {len(timings) / elapsed:.1f} uploads/s over {elapsed:.1f} s")
+        self.stdout.write(
+            f"Latency     p50 {percentile(timings, 0.5):.1f} ms  p95 {percentile(timings, 0.95):.1f} ms"
+        )
+        if failures:
+            self.stdout.write(self.style.WARNING(f'{failures} uploads failed'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All uploads succeeded.'))
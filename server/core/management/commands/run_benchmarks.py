@@ -0,0 +1,233 @@
+"""
+Django management command that drives the key API endpoints through the Django
+test client and records p50/p95 latency and query counts per endpoint.
+
+By default a synthetic dataset is generated inside a transaction that is rolled
+back afterwards, so the run leaves no data behind. Spotify and Gemini are
+replaced by the fake providers from music.providers, with no injected latency
+unless --upstream-latency-ms is given.
+
+Results are written as JSON. Passing a previous result file as --baseline fails
+the run when a p95 latency or query count regresses beyond the allowed margin.
+Usage: python manage.py run_benchmarks --output benchmarks.json --baseline baseline.json
+"""
+import itertools
+import json
+import math
+import platform
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Activity
+from core.synthetic import generate_dataset
+from music.models import Song
+from users.choices import UserTypeChoice
+from users.models import User
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark key endpoints and compare p95 latency and query counts against a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=20, help='Measured requests per endpoint (default: 20)'
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=2, help='Unmeasured requests per endpoint (default: 2)'
+        )
+        parser.add_argument(
+            '--users', type=int, default=100, help='Users in the generated dataset (default: 100)'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Dataset random seed (default: 0)')
+        parser.add_argument(
+            '--use-existing',
+            action='store_true',
+            help='Benchmark against previously generated data with --prefix instead of generating it',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='benchmark',
+            help='Email prefix of the dataset users (default: benchmark)',
+        )
+        parser.add_argument(
+            '--output', default='benchmark-results.json', help='Result file (default: benchmark-results.json)'
+        )
+        parser.add_argument(
+            '--upstream-latency-ms',
+            type=float,
+            default=0,
+            help='Latency injected into each fake Spotify/Gemini call (default: 0)',
+        )
+        parser.add_argument('--baseline', help='Previous result file to compare against')
+        parser.add_argument(
+            '--max-latency-regression',
+            type=float,
+            default=0.25,
+            help='Allowed relative p95 latency increase over the baseline (default: 0.25)',
+        )
+        parser.add_argument(
+            '--latency-slack-ms',
+            type=float,
+            default=5.0,
+            help='Absolute p95 increase always tolerated, to absorb noise on fast endpoints (default: 5)',
+        )
+        parser.add_argument(
+            '--max-query-increase',
+            type=int,
+            default=0,
+            help='Allowed increase in queries per request over the baseline (default: 0)',
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with transaction.atomic():
+                dataset = self._prepare_dataset(options)
+                results = self._run_scenarios(options)
+                transaction.set_rollback(True)
+        finally:
+            teardown_test_environment()
+            cache.clear()
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'upstream_latency_ms': options['upstream_latency_ms'],
+            'dataset': dataset,
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<20} p50 {result['p50_ms']:>8.1f} ms  p95 {result['p95_ms']:>8.1f} ms  "
+                f"{result['queries']:>4} queries"
+            )
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            self._compare(results, options)
+
+    def _prepare_dataset(self, options):
+        prefix = options['prefix']
+        if options['use_existing']:
+            dataset = {'users': User.objects.filter(email__startswith=f'{prefix}-').count()}
+        else:
+            dataset = generate_dataset(users=options['users'], seed=options['seed'], prefix=prefix)
+        if not dataset['users']:
+            raise CommandError(f'No users with prefix {prefix!r}; run generate_synthetic_data first')
+        return dataset
+
+    def _run_scenarios(self, options):
+        users = User.objects.filter(email__startswith=f"{options['prefix']}-").order_by('pk')
+        actor, target = users[0], users[len(users) // 2]
+        # Unlimited uploads so the song create scenario never hits the daily limit
+        User.objects.filter(pk=actor.pk).update(type=UserTypeChoice.PREMIUM)
+        actor.refresh_from_db()
+
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(actor)}')
+        track_ids = itertools.count()
+        # The first two words of the newest title: a two-word query with a prefix
+        newest_title = Song.objects.order_by('-id').values_list('title', flat=True).first() or 'song'
+        search_query = ' '.join(newest_title.split()[:2])
+        commented_activity = (
+            Activity.objects.annotate(comment_count=Count('comments')).order_by('-comment_count', 'pk').first()
+        )
+
+        scenarios = [
+            ('song_create', lambda: client.post(
+                '/api/songs/',
+                {'url': f'https://open.spotify.com/track/bench{next(track_ids):08d}', 'genre_match': 'true'},
+            )),
+            ('feed', lambda: client.get('/api/feed')),
+            ('activity_comments', lambda: client.get(f'/api/feed/{commented_activity.uid}/comments/list/')),
+            ('statistics', lambda: client.get('/api/statistics')),
+            ('user_statistics', lambda: client.get(f'/api/user-statistics/{target.uid}/')),
+            ('user_profile', lambda: client.get(f'/api/user-profile/{target.uid}/')),
+            ('user_search', lambda: client.get('/api/users/search/', {'q': target.first_name})),
+            ('song_search', lambda: client.get('/api/songs/search/', {'q': search_query})),
+            ('notifications', lambda: client.get('/api/notifications/')),
+            ('unread_count', lambda: client.get('/api/unread-notifications/count/')),
+        ]
+
+        results = {}
+        with override_settings(
+            SONG_METADATA_PROVIDER='music.providers.FakeMetadataProvider',
+            FUN_FACT_PROVIDER='music.providers.FakeFunFactProvider',
+            FAKE_PROVIDER_LATENCY_MS=options['upstream_latency_ms'],
+            FAKE_PROVIDER_LATENCY_JITTER_MS=0,
+            FAKE_PROVIDER_ERROR_RATE=0.0,
+        ):
+            for name, request in scenarios:
+                results[name] = self._measure(name, request, options['warmup'], options['iterations'])
+        return results
+
+    def _measure(self, name, request, warmup, iterations):
+        for _ in range(warmup):
+            request()
+
+        timings, query_counts = [], []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = request()
+                elapsed = time.perf_counter() - start
+            if response.status_code >= 400:
+                raise CommandError(f'{name} returned {response.status_code}: {response.content[:200]}')
+            timings.append(elapsed * 1000)
+            query_counts.append(len(context.captured_queries))
+
+        return {
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'mean_ms': round(sum(timings) / len(timings), 2),
+            'queries': max(query_counts),
+        }
+
+    def _compare(self, results, options):
+        with open(options['baseline']) as f:
+            baseline = json.load(f)['results']
+
+        regressions = []
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if previous is None:
+                continue
+            latency_limit = (
+                previous['p95_ms'] * (1 + options['max_latency_regression']) + options['latency_slack_ms']
+            )
+            if result['p95_ms'] > latency_limit:
+                regressions.append(
+                    f"{name}: p95 {result['p95_ms']} ms > {latency_limit:.1f} ms (baseline {previous['p95_ms']} ms)"
+                )
+            query_limit = previous['queries'] + options['max_query_increase']
+            if result['queries'] > query_limit:
+                regressions.append(
+                    f"{name}: {result['queries']} queries > {query_limit} (baseline {previous['queries']})"
+                )
+
+        if regressions:
+            raise CommandError('Performance regressions:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
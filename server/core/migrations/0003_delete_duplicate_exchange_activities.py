@@ -0,0 +1,47 @@
+# Generated by Django 5.2.1 on 2026-10-19 10:26
+
+from django.db import migrations
+from django.db.models import F, Max, Min, Window
+from django.db.models.functions import RowNumber
+
+CHUNK_SIZE = 10000
+
+
+def delete_duplicates(apps, schema_editor):
+    # The unique constraint of 0004 cannot be added while an exchange has several
+    # activities. It is a separate migration: PostgreSQL does not alter a table
+    # with pending foreign key checks from the deletes in the same transaction.
+    # Keeps the oldest song_exchange activity of each exchange, one range of
+    # exchange ids at a time.
+    Activity = apps.get_model('core', 'Activity')
+    exchange_activities = Activity.objects.filter(activity_type='song_exchange', song_exchange__isnull=False)
+    bounds = exchange_activities.aggregate(first=Min('song_exchange_id'), last=Max('song_exchange_id'))
+    if bounds['first'] is None:
+        return
+
+    for start in range(bounds['first'], bounds['last'] + 1, CHUNK_SIZE):
+        duplicates = list(
+            exchange_activities.filter(song_exchange_id__gte=start, song_exchange_id__lt=start + CHUNK_SIZE)
+            .annotate(
+                position=Window(
+                    RowNumber(),
+                    partition_by=[F('song_exchange_id')],
+                    order_by=[F('created_at').asc(), F('id').asc()],
+                )
+            )
+            .filter(position__gt=1)
+            .values_list('id', flat=True)
+        )
+        if duplicates:
+            Activity.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_activitycomment_activityreaction'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-19 10:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_delete_duplicate_exchange_activities'),
+        ('music', '0013_song_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='activity',
+            constraint=models.UniqueConstraint(condition=models.Q(('activity_type', 'song_exchange')), fields=('song_exchange',), name='unique_song_exchange_activity'),
+        ),
+    ]
@@ -82,6 +82,14 @@ class Activity(UUIDBaseModel, TimeStampModel):
             models.Index(fields=['actor', '-created_at']),
             models.Index(fields=['activity_type', '-created_at']),
         ]
+        constraints = [
+            # One feed entry per matched exchange
+            models.UniqueConstraint(
+                fields=['song_exchange'],
+                condition=models.Q(activity_type='song_exchange'),
+                name='unique_song_exchange_activity',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.actor.display_name} - {self.get_activity_type_display()}"
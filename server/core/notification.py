@@ -5,9 +5,59 @@ from notifications.signals import notify
 from notifications.models import Notification as NotificationModel
 
 from .fcm_notification import send_push_notification
+from soundly.metrics import NOTIFICATION_FANOUT
 User = get_user_model()
 
 
+PUSH_TITLE = "Your song was uploaded successfully"
+PUSH_BODY = "Please check your library to see your match song"
+
+
+def record_notification(
+    sender, recipient, verb, action_object=None, target=None, description=None, target_url=None
+):
+    """
+    Store a notification and return the recipient's device token ('' when they have none).
+    """
+    # Use admin user as fallback sender if not provided
+    if sender is None:
+        try:
+            sender = User.objects.get(email="admin@soundlybeats.com")
+        except User.DoesNotExist:
+            sender, created = User.objects.get_or_create(
+                first_name="system",
+                defaults={"email": "system@soundlybeats.com", "is_active": False}
+            )
+
+    # Prepare extra_data with both song_url and activity_id if target is an Activity
+    extra_data = {}
+    if target_url:
+        extra_data["song_url"] = target_url
+    
+    # If target is an Activity, include its UID for navigation
+    if target and hasattr(target, 'uid'):
+        extra_data["activity_id"] = str(target.uid)
+        # If target_url wasn't provided, create a feed URL
+        if not target_url:
+            extra_data["song_url"] = f"/feed?activity={str(target.uid)}"
+    
+    notifications = notify.send(
+        sender=sender,
+        recipient=recipient,
+        verb=verb,
+        action_object=action_object,
+        target=target,
+        description=description,
+        public=False,
+        extra_data=extra_data
+    )
+    NOTIFICATION_FANOUT.labels(verb=verb).observe(
+        sum(len(created or []) for _, created in notifications)
+    )
+
+    return User.objects.get(email=recipient.email).device_token
+
+
 def send_notification(
     sender, recipient, verb, action_object=None, target=None, description=None,
     send_push=False, target_url=None
@@ -16,51 +66,13 @@ def send_notification(
     Send a notification through Django's notification system and optionally as a push notification.
     """
     try:
-        # Use admin user as fallback sender if not provided
-        if sender is None:
-            try:
-                sender = User.objects.get(email="admin@soundlybeats.com")
-            except User.DoesNotExist:
-                sender, created = User.objects.get_or_create(
-                    first_name="system",
-                    defaults={"email": "system@soundlybeats.com", "is_active": False}
-                )
-
-        # Prepare extra_data with both song_url and activity_id if target is an Activity
-        extra_data = {}
-        if target_url:
-            extra_data["song_url"] = target_url
-        
-        # If target is an Activity, include its UID for navigation
-        if target and hasattr(target, 'uid'):
-            extra_data["activity_id"] = str(target.uid)
-            # If target_url wasn't provided, create a feed URL
-            if not target_url:
-                extra_data["song_url"] = f"/feed?activity={str(target.uid)}"
-        
-        notify.send(
-            sender=sender,
-            recipient=recipient,
-            verb=verb,
-            action_object=action_object,
-            target=target,
-            description=description,
-            public=False,
-            extra_data=extra_data
+        device_token = record_notification(
+            sender, recipient, verb, action_object, target, description, target_url
         )
-
-        device_token = User.objects.get(email=recipient.email).device_token
         if not device_token:
             return False
-        else:
-            if send_push:
-                send_push_notification(
-                    device_token,
-                    "Your song was uploaded successfully",
-                    "Please check your library to see your match song",
-                )
-
-
+        if send_push:
+            send_push_notification(device_token, PUSH_TITLE, PUSH_BODY)
         return True
     except Exception as e:
         return False
@@ -0,0 +1,129 @@
+"""
+Page-number pagination that does not count large result sets exactly.
+
+A page costs an index range read, but its total `count` is a COUNT(*) over
+every matching row. EstimatedCountPaginator counts at most
+PAGINATION_EXACT_COUNT_LIMIT rows; past that, on PostgreSQL, it reports the
+planner's row estimate for the query (EXPLAIN) instead, and the response says
+so with count_is_estimate. Pages of an estimated list fetch one row more than
+they show, so next links stay exact whatever the estimate.
+
+With PAGINATION_COUNT_CACHE_SECONDS set, counts are cached per query (its SQL
+and parameters, so per filter and per user) for that long.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+
+def planner_estimate(queryset):
+    """Rows PostgreSQL expects the query to return, from its statistics"""
+    plan = json.loads(queryset.explain(format='json'))
+    # A list of one plan, or depending on the driver the plan itself
+    if isinstance(plan, list):
+        plan = plan[0]
+    return int(plan['Plan']['Plan Rows'])
+
+
+def count_cache_key(queryset):
+    sql, params = queryset.query.sql_with_params()
+    return 'pagination-count:' + hashlib.md5(f'{sql}|{params!r}'.encode()).hexdigest()
+
+
+class EstimatedPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class EstimatedCountPaginator(Paginator):
+    count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+
+        cache_seconds = settings.PAGINATION_COUNT_CACHE_SECONDS
+        key = count_cache_key(self.object_list) if cache_seconds else None
+        cached = cache.get(key) if key else None
+        if cached is None:
+            cached = self._count()
+            if key:
+                cache.set(key, cached, cache_seconds)
+        count, self.count_is_estimate = cached
+        return count
+
+    def _count(self):
+        """(count, whether it is an estimate)"""
+        limit = settings.PAGINATION_EXACT_COUNT_LIMIT
+        if connections[self.object_list.db].vendor != 'postgresql':
+            return self.object_list.count(), False
+
+        estimate = planner_estimate(self.object_list)
+        if estimate <= limit:
+            # The estimate can be off; counting stops past the limit either way
+            count = self.object_list.order_by()[:limit + 1].count()
+            if count <= limit:
+                return count, False
+        return max(estimate, limit + 1), True
+
+    def validate_number(self, number):
+        if not (self.count and self.count_is_estimate):
+            return super().validate_number(number)
+        # The estimate may be short of the real number of pages, so any page
+        # number is valid; page() finds out whether it has rows
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_estimate:
+            return super().page(number)
+
+        # The row after the page tells whether there is a next one
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        return EstimatedPage(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """Page numbers with an exact count for small lists and an estimate, marked as such, for large ones"""
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_is_estimate': self.page.paginator.count_is_estimate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_estimate'] = {
+            'type': 'boolean',
+            'example': False,
+        }
+        return response_schema
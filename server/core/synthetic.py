@@ -0,0 +1,232 @@
+"""
+Synthetic dataset for benchmarks and local load testing.
+
+Everything is written with bulk_create, so signals (activity creation, cache
+invalidation) do not fire; the rows a signal would have produced are generated
+explicitly instead. Generated users share the email prefix given to
+generate_dataset, which is how clear_dataset finds them again.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+from core.models import Activity, ActivityComment, ActivityReaction
+from music.match_helpers import song_genre_rows
+from music.models import MusicPlatform, Song, SongExchange, SongGenre
+from notifications.models import Notification
+from users.choices import UserTypeChoice
+from users.models import Friendship
+
+User = get_user_model()
+
+GENRE_NAMES = [
+    'pop', 'rock', 'hip hop', 'rap', 'indie', 'edm', 'house', 'techno', 'jazz', 'soul',
+    'r&b', 'funk', 'disco', 'metal', 'punk', 'folk', 'country', 'blues', 'reggae', 'latin',
+    'k-pop', 'j-pop', 'afrobeats', 'ambient', 'classical', 'lo-fi', 'trap', 'drill',
+    'grime', 'dubstep', 'drum and bass', 'garage', 'shoegaze', 'synthwave', 'emo',
+    'grunge', 'gospel', 'bossa nova', 'samba', 'flamenco', 'bhangra', 'qawwali',
+    'baul', 'cumbia', 'salsa', 'bachata', 'dancehall', 'ska', 'trip hop', 'new wave',
+]
+LOCATIONS = [
+    ('Bangladesh', 'Dhaka'), ('United States', 'New York'), ('United Kingdom', 'London'),
+    ('Germany', 'Berlin'), ('Brazil', 'Sao Paulo'), ('India', 'Mumbai'),
+    ('Japan', 'Tokyo'), ('Nigeria', 'Lagos'), ('Mexico', 'Mexico City'), ('France', 'Paris'),
+]
+COMMENTS = ['Love this!', 'Great pick', 'On repeat', 'Never heard this before', 'Classic']
+NOTIFICATION_VERBS = ['song_matched', 'liked', 'commented_on', 'friend_request']
+
+
+class ZipfSampler:
+    """Draws items with probability proportional to 1 / rank ** exponent"""
+
+    def __init__(self, rng, items, exponent):
+        self.rng = rng
+        self.items = items
+        weights = [1 / (rank ** exponent) for rank in range(1, len(items) + 1)]
+        total = 0
+        self.cum_weights = []
+        for weight in weights:
+            total += weight
+            self.cum_weights.append(total)
+
+    def sample(self, k):
+        """Up to `k` distinct items"""
+        picked = self.rng.choices(self.items, cum_weights=self.cum_weights, k=k)
+        return list(dict.fromkeys(picked))
+
+
+def clear_dataset(prefix):
+    """Delete users created by generate_dataset with `prefix`, cascading to their data"""
+    deleted, _ = User.objects.filter(email__startswith=f'{prefix}-').delete()
+    return deleted
+
+
+def generate_dataset(
+    users=100,
+    songs_per_user=10,
+    exchanges_per_user=8,
+    friends_per_user=5,
+    reactions_per_activity=2,
+    comments_per_activity=1,
+    notifications_per_user=20,
+    genres=len(GENRE_NAMES),
+    zipf_exponent=1.1,
+    seed=0,
+    prefix='synthetic',
+    batch_size=1000,
+):
+    """
+    Generate a synthetic dataset and return the number of rows created per model.
+
+    Song genres follow a Zipf distribution over the first `genres` entries of
+    GENRE_NAMES, so a handful of genres dominate as they do in real uploads.
+    Per-user and per-activity counts are averages; the actual numbers vary.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    genre_sampler = ZipfSampler(rng, GENRE_NAMES[:genres], zipf_exponent)
+    platform, _ = MusicPlatform.objects.get_or_create(
+        name='Spotify', defaults={'domain': 'spotify.com'}
+    )
+    password = make_password(f'{prefix}-password')
+
+    user_objs = []
+    for i in range(users):
+        country, city = rng.choice(LOCATIONS)
+        user_objs.append(User(
+            email=f'{prefix}-{i}@example.com',
+            password=password,
+            first_name=f'Synthetic{i}',
+            last_name=rng.choice(['Rahman', 'Smith', 'Garcia', 'Khan', 'Okafor', 'Sato']),
+            profession=rng.choice(['Student', 'Engineer', 'Artist', 'Producer', 'DJ']),
+            country=country,
+            city=city,
+            type=rng.choices(
+                [UserTypeChoice.BASIC, UserTypeChoice.PREMIUM, UserTypeChoice.ARTIST],
+                weights=[8, 1, 1],
+            )[0],
+        ))
+    user_objs = User.objects.bulk_create(user_objs, batch_size=batch_size)
+
+    song_objs = []
+    for user in user_objs:
+        for _ in range(max(0, round(rng.gauss(songs_per_user, songs_per_user / 3)))):
+            n = len(song_objs)
+            song_objs.append(Song(
+                uploader=user,
+                platform=platform,
+                genre=genre_sampler.sample(rng.randint(1, 3)),
+                title=f'Synthetic Song {n}',
+                artist=f'Synthetic Artist {int(rng.paretovariate(1.2)) % 500}',
+                album=f'Synthetic Album {n // 10}',
+                url=f'https://open.spotify.com/track/{prefix}{n:010d}',
+                duration_seconds=rng.randint(90, 420),
+                release_date=str(rng.randint(1960, now.year)),
+            ))
+    song_objs = Song.objects.bulk_create(song_objs, batch_size=batch_size)
+    SongGenre.objects.bulk_create(song_genre_rows(song_objs), batch_size=batch_size)
+
+    songs_by_user = {}
+    for song in song_objs:
+        songs_by_user.setdefault(song.uploader_id, []).append(song)
+
+    exchange_objs = []
+    for user in user_objs:
+        own_songs = songs_by_user.get(user.pk)
+        if not own_songs:
+            continue
+        for _ in range(rng.randint(0, 2 * exchanges_per_user)):
+            partner = rng.choice(user_objs)
+            partner_songs = songs_by_user.get(partner.pk)
+            matched = partner.pk != user.pk and partner_songs and rng.random() < 0.8
+            matched_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+            exchange_objs.append(SongExchange(
+                sender=user,
+                sent_song=rng.choice(own_songs),
+                receiver=partner if matched else None,
+                received_song=rng.choice(partner_songs) if matched else None,
+                status=rng.choice(['matched', 'completed']) if matched else 'pending',
+                match_type=rng.choice(['genre', 'random']) if matched else None,
+                matched_at=matched_at if matched else None,
+            ))
+    exchange_objs = SongExchange.objects.bulk_create(exchange_objs, batch_size=batch_size)
+
+    activity_objs = [
+        Activity(
+            actor_id=exchange.sender_id,
+            activity_type='song_exchange',
+            song_exchange=exchange,
+            extra_data={'match_type': exchange.match_type},
+        )
+        for exchange in exchange_objs if exchange.status != 'pending'
+    ]
+    activity_objs += [
+        Activity(actor_id=song.uploader_id, activity_type='song_discovery', song=song)
+        for song in song_objs
+    ]
+    activity_objs = Activity.objects.bulk_create(activity_objs, batch_size=batch_size)
+
+    reaction_types = [value for value, _ in ActivityReaction.REACTION_TYPES]
+    reaction_objs = []
+    comment_objs = []
+    for activity in activity_objs:
+        reactors = rng.sample(user_objs, min(len(user_objs), rng.randint(0, 2 * reactions_per_activity)))
+        reaction_objs += [
+            ActivityReaction(user=user, activity=activity, reaction_type=rng.choice(reaction_types))
+            for user in reactors
+        ]
+        comment_objs += [
+            ActivityComment(user=rng.choice(user_objs), activity=activity, text=rng.choice(COMMENTS))
+            for _ in range(rng.randint(0, 2 * comments_per_activity))
+        ]
+    reaction_objs = ActivityReaction.objects.bulk_create(
+        reaction_objs, batch_size=batch_size, ignore_conflicts=True
+    )
+    comment_objs = ActivityComment.objects.bulk_create(comment_objs, batch_size=batch_size)
+
+    pairs = set()
+    for user in user_objs:
+        for friend in rng.sample(user_objs, min(len(user_objs), friends_per_user)):
+            if friend.pk != user.pk and (friend.pk, user.pk) not in pairs:
+                pairs.add((user.pk, friend.pk))
+    friendship_objs = Friendship.objects.bulk_create([
+        Friendship(
+            requester_id=requester_id,
+            addressee_id=addressee_id,
+            status='accepted' if rng.random() < 0.8 else 'pending',
+        )
+        for requester_id, addressee_id in pairs
+    ], batch_size=batch_size)
+
+    user_type = ContentType.objects.get_for_model(User)
+    notification_objs = []
+    for user in user_objs:
+        for _ in range(rng.randint(0, 2 * notifications_per_user)):
+            actor = rng.choice(user_objs)
+            unread = rng.random() < 0.3
+            notification_objs.append(Notification(
+                recipient=user,
+                actor_content_type=user_type,
+                actor_object_id=str(actor.pk),
+                verb=rng.choice(NOTIFICATION_VERBS),
+                public=False,
+                unread=unread,
+                timestamp=now - timedelta(minutes=rng.randint(0, 60 * 24 * 120)),
+                data={'extra_data': {'song_url': '/feed'}},
+            ))
+    notification_objs = Notification.objects.bulk_create(notification_objs, batch_size=batch_size)
+
+    return {
+        'users': len(user_objs),
+        'songs': len(song_objs),
+        'exchanges': len(exchange_objs),
+        'activities': len(activity_objs),
+        'reactions': len(reaction_objs),
+        'comments': len(comment_objs),
+        'friendships': len(friendship_objs),
+        'notifications': len(notification_objs),
+    }
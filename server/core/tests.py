@@ -1,3 +1,77 @@
-from django.test import TestCase
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.pagination import EstimatedCountPagination, planner_estimate
+from users.models import User
+
+
+def postgresql_plan(rows):
+    return {"Plan": {"Node Type": "Seq Scan", "Relation Name": "users", "Plan Rows": rows}}
+
+
+@override_settings(PAGINATION_EXACT_COUNT_LIMIT=3, PAGINATION_COUNT_CACHE_SECONDS=0)
+class EstimatedCountPaginationTests(TestCase):
+    """The SQLite suite never plans a query, so EXPLAIN answers the way PostgreSQL does"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(5):
+            User.objects.create_user(f"user{number}@example.com", "password", first_name=f"User {number}")
+
+    def explain(self, output):
+        return mock.patch.object(QuerySet, "explain", return_value=output)
+
+    def on_postgresql(self):
+        connections = mock.MagicMock()
+        connections.__getitem__.return_value.vendor = "postgresql"
+        return mock.patch("core.pagination.connections", connections)
+
+    def paginate(self, page):
+        paginator = EstimatedCountPagination()
+        paginator.page_size = 2
+        request = Request(APIRequestFactory().get("/", {"page": page}))
+        rows = paginator.paginate_queryset(User.objects.order_by("id"), request)
+        return rows, paginator.get_paginated_response([user.id for user in rows]).data
+
+    def test_planner_estimate_of_either_plan_shape(self):
+        for output in (json.dumps([postgresql_plan(1234)]), json.dumps(postgresql_plan(1234))):
+            with self.subTest(output=output), self.explain(output):
+                self.assertEqual(planner_estimate(User.objects.all()), 1234)
+
+    def test_large_list_reports_the_estimate(self):
+        with self.on_postgresql(), self.explain(json.dumps(postgresql_plan(50000))):
+            rows, data = self.paginate(2)
+
+        self.assertEqual(data["count"], 50000)
+        self.assertTrue(data["count_is_estimate"])
+        self.assertEqual(len(rows), 2)
+        self.assertIn("page=3", data["next"])
+
+    def test_last_page_of_an_estimated_list_has_no_next(self):
+        with self.on_postgresql(), self.explain(json.dumps([postgresql_plan(50000)])):
+            rows, data = self.paginate(3)
+
+        self.assertTrue(data["count_is_estimate"])
+        self.assertEqual(len(rows), 1)
+        self.assertIsNone(data["next"])
+
+    def test_underestimated_list_is_counted_up_to_the_limit(self):
+        with self.on_postgresql(), self.explain(json.dumps(postgresql_plan(2))):
+            rows, data = self.paginate(1)
+
+        # 5 rows is past the limit of 3, so the count stays an estimate, above the limit
+        self.assertEqual(data["count"], 4)
+        self.assertTrue(data["count_is_estimate"])
+
+    def test_small_list_is_counted_exactly(self):
+        User.objects.filter(email__in=["user3@example.com", "user4@example.com"]).delete()
+        with self.on_postgresql(), self.explain(json.dumps(postgresql_plan(2))):
+            rows, data = self.paginate(1)
+
+        self.assertEqual(data["count"], 3)
+        self.assertFalse(data["count_is_estimate"])
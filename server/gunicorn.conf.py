@@ -0,0 +1,21 @@
+"""
+Gunicorn settings and hooks. Picked up automatically from the working directory.
+"""
+import os
+
+# SERVER_MODE=asgi serves soundly.asgi with uvicorn workers, so requests waiting on
+# Spotify, Gemini or FCM in the async views do not tie up a worker. The default
+# is sync WSGI workers.
+if os.environ.get("SERVER_MODE", "wsgi") == "asgi":
+    wsgi_app = "soundly.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "soundly.wsgi:application"
+
+
+def child_exit(server, worker):
+    # Drop the live samples of an exited worker from the shared Prometheus directory
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
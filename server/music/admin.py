@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import MusicPlatform, Song, SongExchange
+from .models import MusicPlatform, Song, SongExchange, Track
 
 
 @admin.register(MusicPlatform)
@@ -10,6 +10,14 @@ class MusicPlatformAdmin(admin.ModelAdmin):
     ordering = ('name',)
 
 
+@admin.register(Track)
+class TrackAdmin(admin.ModelAdmin):
+    list_display = ('title', 'artist', 'spotify_id', 'created_at')
+    search_fields = ('spotify_id', 'title', 'artist', 'album')
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at', 'updated_at')
+
+
 @admin.register(Song)
 class SongAdmin(admin.ModelAdmin):
     list_display = ('title', 'artist', 'platform', 'genre', 'release_date', 'created_at')
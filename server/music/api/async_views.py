@@ -0,0 +1,126 @@
+"""
+Async versions of the I/O-bound music endpoints.
+
+They behave exactly like their sync counterparts. Under ASGI (SERVER_MODE=asgi)
+a request waiting on Spotify, Gemini or FCM only parks a coroutine instead of
+holding a worker; under WSGI they still work, running in a per-request event loop.
+"""
+import asyncio
+import logging
+
+from adrf.decorators import api_view
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.decorators import permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from music.ingest import (
+    IngestError,
+    UploadDeadline,
+    build_upload_response,
+    fetch_fun_fact,
+    fetch_track_info,
+    get_executor,
+    match_song,
+    needs_fun_fact,
+    push_match_notification,
+    record_match_notifications,
+    save_fun_fact,
+    save_song,
+    store_track,
+    unexpected_error_response,
+)
+from music.permissions import CanUploadSong
+from music.tracks import stored_track, track_info
+
+logger = logging.getLogger(__name__)
+
+
+def run_external(func, *args):
+    """
+    Run an external call on the upload pool; it holds no database state, so it
+    stays out of the request's sync thread.
+    """
+    return asyncio.get_running_loop().run_in_executor(get_executor(), func, *args)
+
+
+async def result_by_deadline(future, deadline, default, description):
+    """Async counterpart of music.ingest.result_by_deadline"""
+    try:
+        return await asyncio.wait_for(future, timeout=deadline.remaining())
+    except asyncio.TimeoutError:
+        logger.warning("%s missed the upload deadline", description)
+        return default
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, CanUploadSong])
+async def song_upload(request):
+    """
+    Create a new song from Spotify URL; same request and response as POST songs/
+    """
+    try:
+        spotify_url = request.data.get('url')
+        genre_match = str(request.data.get('genre_match', 'false')).lower()
+        logger.info("Song upload request - URL: %s, genre_match: %s, user: %s", spotify_url, genre_match, request.user.email)
+
+        if not spotify_url:
+            logger.warning("Song upload failed: Missing URL for user %s", request.user.email)
+            return Response({'error': 'Spotify URL is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        deadline = UploadDeadline()
+        try:
+            track = await sync_to_async(stored_track)(spotify_url)
+            if track is None:
+                info = await run_external(fetch_track_info, spotify_url)
+                track = await sync_to_async(store_track)(info)
+            info = track_info(track)
+            own_fun_fact = None
+            if not track.fun_fact:
+                # The fun fact only needs the metadata; generate it while the song is stored and matched
+                own_fun_fact = run_external(fetch_fun_fact, track.title, track.artist, spotify_url)
+            song = await sync_to_async(save_song)(request.user, spotify_url, info, track.fun_fact, track)
+        except IngestError as e:
+            return Response(e.data, status=e.status_code)
+
+        matched_song, matched_user, match_type = await sync_to_async(match_song)(
+            request.user, song, genre_match
+        )
+
+        matched_fun_fact = None
+        pushes = []
+        if matched_song and matched_user:
+            # Generate fun fact for received song if it doesn't have one
+            if await sync_to_async(needs_fun_fact)(matched_song):
+                matched_fun_fact = run_external(
+                    fetch_fun_fact, matched_song.title, matched_song.artist, matched_song.url
+                )
+
+            # Only send notifications for genre matches (not random matches)
+            if match_type == 'automatic':
+                device_tokens = await sync_to_async(record_match_notifications)(
+                    request.user, matched_user, matched_song
+                )
+                pushes = [run_external(push_match_notification, device_token) for device_token in device_tokens]
+
+        if own_fun_fact:
+            await sync_to_async(save_fun_fact)(
+                song, await result_by_deadline(own_fun_fact, deadline, '', 'Fun fact')
+            )
+        if matched_fun_fact:
+            await sync_to_async(save_fun_fact)(
+                matched_song,
+                await result_by_deadline(matched_fun_fact, deadline, '', 'Fun fact for received song'),
+            )
+        for push in pushes:
+            await result_by_deadline(push, deadline, None, 'Match push notification')
+
+        response_data = await sync_to_async(build_upload_response)(
+            request, song, info, genre_match, matched_song, matched_user
+        )
+        return Response(response_data, status=status.HTTP_201_CREATED)
+
+    except Exception as e:
+        # Catch any unexpected errors
+        return Response(unexpected_error_response(e), status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,47 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+
+from music.match_helpers import serialize_original_song, top_genre_matches
+from music.models import Song
+
+MATCH_PREVIEW_DEFAULT_LIMIT = 10
+MATCH_PREVIEW_MAX_LIMIT = 50
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def song_match_preview(request, song_uid):
+    """
+    The songs of other users most genre-similar to a song, best first, without
+    creating or changing any exchange. ?limit= sets how many (default 10, max 50).
+    """
+    try:
+        song = Song.objects.only('id', 'uid', 'title', 'artist', 'genre', 'uploader_id').get(uid=song_uid)
+    except Song.DoesNotExist:
+        return Response(
+            {'error': 'Song not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    try:
+        limit = int(request.query_params.get('limit', MATCH_PREVIEW_DEFAULT_LIMIT))
+    except ValueError:
+        return Response(
+            {'error': 'limit must be an integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    limit = max(1, min(limit, MATCH_PREVIEW_MAX_LIMIT))
+
+    try:
+        return Response({
+            'song': serialize_original_song(song),
+            'results': top_genre_matches(song, limit),
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response(
+            {'error': f'An error occurred while ranking matches: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
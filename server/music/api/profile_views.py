@@ -0,0 +1,80 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from django.contrib.auth import get_user_model
+
+from music.api.serializers import MatchedSongExchangeListSerializer
+from music.api.song_statistics import compute_user_statistics, connected_partners, serialize_connected_users
+from music.api.views import SongExchangePagination, exchange_list_queryset
+from music.profile_cache import get_cached_profile, set_cached_profile
+from soundly.metrics import record_cache_lookup
+from users.api.serializers import UserSerializer
+
+User = get_user_model()
+
+
+def first_page(queryset, serialize):
+    """`count` and first-page `results` in the shape of the paginated list endpoints"""
+    page_size = SongExchangePagination.page_size
+    return {
+        'count': queryset.count(),
+        'results': serialize(list(queryset[:page_size])),
+    }
+
+
+def build_user_profile(request, target_user):
+    """Everything a profile screen needs, as separate endpoints would return it"""
+    context = {'request': request}
+
+    def serialize_exchanges(exchanges):
+        return MatchedSongExchangeListSerializer(exchanges, many=True, context=context).data
+
+    return {
+        'user': UserSerializer(target_user, context=context).data,
+        'statistics': compute_user_statistics(target_user),
+        'received_songs': first_page(
+            exchange_list_queryset(receiver=target_user), serialize_exchanges
+        ),
+        'sent_songs': first_page(
+            exchange_list_queryset(sender=target_user), serialize_exchanges
+        ),
+        'connected_users': first_page(
+            connected_partners(target_user),
+            lambda rows: serialize_connected_users(request, rows),
+        ),
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def user_profile_by_uid(request, user_uid):
+    """
+    Profile header, statistics and the first page of received songs, sent songs and
+    connected users in one response. The payload is the same for every viewer and is
+    served from cache until an exchange, song or profile change invalidates it.
+    """
+    base_url = request.build_absolute_uri('/')
+    data = get_cached_profile(user_uid, base_url)
+    record_cache_lookup('user_profile', data is not None)
+    if data is not None:
+        return Response(data, status=status.HTTP_200_OK)
+
+    try:
+        target_user = User.objects.get(uid=user_uid)
+    except User.DoesNotExist:
+        return Response(
+            {'error': 'User not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    try:
+        data = build_user_profile(request, target_user)
+        set_cached_profile(user_uid, base_url, data)
+        return Response(data, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response(
+            {'error': f'An error occurred while fetching the profile: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
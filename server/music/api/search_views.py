@@ -0,0 +1,69 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+
+from music.api.serializers import SongSearchResultSerializer
+from music.search import decode_cursor, search_songs
+
+SONG_SEARCH_DEFAULT_LIMIT = 20
+SONG_SEARCH_MAX_LIMIT = 50
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def song_search(request):
+    """
+    Songs whose title, artist or album match every word of ?q=, best first.
+    ?limit= sets the page size (default 20, max 50); the next page is requested
+    with ?cursor= set to the next_cursor of the previous one.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response(
+            {'error': 'Search query is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(query) < 2:
+        return Response(
+            {'error': 'Search query must be at least 2 characters'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(query) > 100:
+        return Response(
+            {'error': 'Search query must be less than 100 characters'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        limit = int(request.query_params.get('limit', SONG_SEARCH_DEFAULT_LIMIT))
+    except ValueError:
+        return Response(
+            {'error': 'limit must be an integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    limit = max(1, min(limit, SONG_SEARCH_MAX_LIMIT))
+
+    after = None
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            return Response(
+                {'error': 'Invalid cursor'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    try:
+        songs, next_cursor = search_songs(query, limit, after)
+        return Response({
+            'results': SongSearchResultSerializer(songs, many=True).data,
+            'next_cursor': next_cursor,
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response(
+            {'error': f'An error occurred while searching songs: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
@@ -56,17 +56,42 @@ class SongSerializer(serializers.ModelSerializer):
 
     def get_remaining_uploads(self, obj):
         if obj.uploader and obj.uploader.type == UserTypeChoice.BASIC:
+            # A list passes the counts of all its uploaders instead of one query per song
+            uploaded_today = self.context.get('uploaded_today')
+            if uploaded_today is not None:
+                return Song.remaining_uploads_for(uploaded_today.get(obj.uploader_id, 0))
             return obj.remaining_uploads
         return None
 
 
+class SongSearchResultSerializer(serializers.ModelSerializer):
+    platform = MusicPlatformSerializer(read_only=True)
+    uploader = serializers.SerializerMethodField()
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Song
+        fields = [
+            'uid', 'title', 'artist', 'album', 'genre', 'url', 'duration_seconds',
+            'cover_image_url', 'platform', 'uploader', 'rank', 'created_at'
+        ]
+
+    def get_uploader(self, obj):
+        if not obj.uploader:
+            return None
+        return {
+            'uid': str(obj.uploader.uid),
+            'name': f"{obj.uploader.first_name} {obj.uploader.last_name}",
+        }
+
+
 class SongCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Song
         fields = [
             'title', 'artist', 'album', 'genre', 'url', 'fun_fact',
             'duration_seconds', 'release_date', 'cover_image_url',
-            'platform', 'uploader'
+            'platform', 'uploader', 'track'
         ]
 
 
@@ -95,3 +120,29 @@ class MatchedSongExchangeSerializer(serializers.ModelSerializer):
     class Meta:
         model = SongExchange
         fields = ['id', 'sent_song', 'received_song', 'matched_at', 'sender', 'receiver']
+
+
+class ExchangeListSongSerializer(SongSerializer):
+    """
+    SongSerializer for exchange lists. ``remaining_uploads`` is computed from the
+    ``uploads_today`` count annotated on the exchange queryset instead of a COUNT per song.
+    """
+
+    def get_remaining_uploads(self, obj):
+        if obj.uploader and obj.uploader.type == UserTypeChoice.BASIC:
+            return Song.remaining_uploads_for(obj.uploads_today)
+        return None
+
+
+class MatchedSongExchangeListSerializer(MatchedSongExchangeSerializer):
+    """
+    Same payload as MatchedSongExchangeSerializer, rendered without per-row queries.
+    Expects a queryset prepared by ``music.api.views.exchange_list_queryset``.
+    """
+    received_song = ExchangeListSongSerializer(read_only=True)
+    sent_song = ExchangeListSongSerializer(read_only=True)
+
+    def to_representation(self, instance):
+        instance.sent_song.uploads_today = instance.sent_song_uploads_today
+        instance.received_song.uploads_today = instance.received_song_uploads_today
+        return super().to_representation(instance)
@@ -2,11 +2,12 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q, Count
+from django.db.models import Case, Count, F, Q, When
 from django.contrib.auth import get_user_model
 from django.utils.timezone import now
 
 from music.models import SongExchange
+from music.api.views import SongExchangePagination
 from users.api.serializers import UserSerializer
 
 User = get_user_model()
@@ -167,56 +168,58 @@ def user_summary_statistics(request):
         )
 
 
+def connected_partners(user):
+    """
+    Exchange partners of `user` with their exchange counts, most exchanged first.
+
+    One grouped query: each exchange involving the user is mapped to the other
+    side (the receiver when the user sent it, the sender otherwise) and the rows
+    are counted per partner, so sorting and pagination happen in the database.
+    """
+    return (
+        SongExchange.objects.filter(Q(sender=user) | Q(receiver=user))
+        .annotate(
+            partner=Case(
+                When(sender=user, then=F('receiver')),
+                default=F('sender'),
+            )
+        )
+        # No partner: still pending, or the other side's account was deleted
+        .exclude(partner=None)
+        .exclude(partner=user.id)
+        .values('partner')
+        .annotate(songs_exchanged=Count('id'))
+        .order_by('-songs_exchanged', 'partner')
+    )
+
+
+def connected_users_response(request, user):
+    """Paginated connected users; User rows are only loaded for the visible page"""
+    paginator = SongExchangePagination()
+    page = paginator.paginate_queryset(connected_partners(user), request)
+    return paginator.get_paginated_response(serialize_connected_users(request, page))
+
+
+def serialize_connected_users(request, rows):
+    """Serialize `connected_partners` rows, loading all their users in one query"""
+    partners = User.objects.in_bulk([row['partner'] for row in rows])
+    users_data = []
+    for row in rows:
+        partner = partners.get(row['partner'])
+        if partner is None:
+            continue
+        user_data = UserSerializer(partner, context={'request': request}).data
+        user_data['songs_exchanged'] = row['songs_exchanged']
+        users_data.append(user_data)
+    return users_data
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def connected_users_list(request):
     """Return list of users that the current user has exchanged songs with"""
-    user = request.user
-
     try:
-        # Get all exchanges where user is sender or receiver
-        user_exchanges = SongExchange.objects.filter(
-            Q(sender=user) | Q(receiver=user)
-        ).exclude(
-            Q(sender=user, receiver=None) | Q(receiver=user, sender=None)
-        ).select_related('sender', 'receiver')
-
-        # Collect unique partner IDs and count exchanges
-        partner_ids = set()
-        partner_exchange_counts = {}
-        
-        for exchange in user_exchanges:
-            if exchange.sender == user and exchange.receiver:
-                partner_id = exchange.receiver.id
-            elif exchange.receiver == user and exchange.sender:
-                partner_id = exchange.sender.id
-            else:
-                continue
-            
-            if partner_id != user.id:
-                partner_ids.add(partner_id)
-                partner_exchange_counts[partner_id] = partner_exchange_counts.get(partner_id, 0) + 1
-
-        # Fetch partner users
-        partners = User.objects.filter(id__in=partner_ids)
-
-        # Serialize users
-        serializer = UserSerializer(partners, many=True, context={'request': request})
-        users_data = serializer.data
-
-        # Add exchange count to each user
-        for user_data in users_data:
-            user_id = user_data.get('pk') or user_data.get('id')
-            if user_id:
-                user_data['songs_exchanged'] = partner_exchange_counts.get(user_id, 0)
-
-        # Sort by songs exchanged (descending)
-        users_data.sort(key=lambda x: x.get('songs_exchanged', 0), reverse=True)
-
-        return Response({
-            'count': len(users_data),
-            'results': users_data
-        }, status=status.HTTP_200_OK)
+        return connected_users_response(request, request.user)
 
     except Exception as e:
         return Response(
@@ -225,6 +228,82 @@ def connected_users_list(request):
         )
 
 
+def compute_user_statistics(target_user):
+    """Exchange statistics shown on a user's public profile"""
+    # Fetch relevant exchanges for the target user
+    user_exchanges = SongExchange.objects.filter(
+        Q(receiver=target_user) |
+        Q(sender=target_user, status='completed')
+    ).select_related('sender', 'receiver')
+
+    # Count stats
+    songs_shared = SongExchange.objects.filter(sender=target_user).count()
+    songs_received = SongExchange.objects.filter(receiver=target_user).count()
+    received_or_completed = user_exchanges
+
+    # Track data
+    exchange_partners = set()
+    countries = set()
+    cities = set()
+    country_stats = {}
+    city_stats = {}
+
+    for exchange in received_or_completed:
+        partner = exchange.sender if exchange.receiver == target_user else exchange.receiver
+        if not partner:
+            continue
+
+        exchange_partners.add(partner.id)
+
+        if partner.country:
+            countries.add(partner.country)
+            stats = country_stats.setdefault(partner.country, {'users': set(), 'exchanges': 0})
+            stats['users'].add(partner.id)
+            stats['exchanges'] += 1
+
+        if partner.city:
+            cities.add(partner.city)
+            stats = city_stats.setdefault(partner.city, {
+                'users': set(),
+                'exchanges': 0,
+                'country': partner.country or 'Unknown'
+            })
+            stats['users'].add(partner.id)
+            stats['exchanges'] += 1
+
+    def summarize_stats(stats_dict):
+        return {
+            key: {
+                'users_count': len(value['users']),
+                'songs_exchanged': value['exchanges'],
+                **({'country': value['country']} if 'country' in value else {})
+            }
+            for key, value in stats_dict.items()
+        }
+
+    country_breakdown = summarize_stats(country_stats)
+    city_breakdown = summarize_stats(city_stats)
+    top_countries = sorted(country_breakdown.items(), key=lambda x: x[1]['users_count'], reverse=True)[:10]
+    top_cities = sorted(city_breakdown.items(), key=lambda x: x[1]['users_count'], reverse=True)[:10]
+
+    response_data = {
+        'songs_shared': songs_shared,
+        'songs_received': songs_received,
+        'users_exchanged_with': len(exchange_partners),
+        'countries_involved': len(countries),
+        'top_locations': {
+            'countries': [
+                {'country': c, **stats} for c, stats in top_countries
+            ] if top_countries else [],
+            'cities': [
+                {'city': c, **stats} for c, stats in top_cities
+            ] if top_cities else []
+        }
+    }
+
+    return response_data
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_statistics_by_uid(request, user_uid):
@@ -238,77 +317,7 @@ def user_statistics_by_uid(request, user_uid):
         )
     
     try:
-        # Fetch relevant exchanges for the target user
-        user_exchanges = SongExchange.objects.filter(
-            Q(receiver=target_user) |
-            Q(sender=target_user, status='completed')
-        ).select_related('sender', 'receiver')
-
-        # Count stats
-        songs_shared = SongExchange.objects.filter(sender=target_user).count()
-        songs_received = SongExchange.objects.filter(receiver=target_user).count()
-        received_or_completed = user_exchanges
-
-        # Track data
-        exchange_partners = set()
-        countries = set()
-        cities = set()
-        country_stats = {}
-        city_stats = {}
-
-        for exchange in received_or_completed:
-            partner = exchange.sender if exchange.receiver == target_user else exchange.receiver
-            if not partner:
-                continue
-
-            exchange_partners.add(partner.id)
-
-            if partner.country:
-                countries.add(partner.country)
-                stats = country_stats.setdefault(partner.country, {'users': set(), 'exchanges': 0})
-                stats['users'].add(partner.id)
-                stats['exchanges'] += 1
-
-            if partner.city:
-                cities.add(partner.city)
-                stats = city_stats.setdefault(partner.city, {
-                    'users': set(),
-                    'exchanges': 0,
-                    'country': partner.country or 'Unknown'
-                })
-                stats['users'].add(partner.id)
-                stats['exchanges'] += 1
-
-        def summarize_stats(stats_dict):
-            return {
-                key: {
-                    'users_count': len(value['users']),
-                    'songs_exchanged': value['exchanges'],
-                    **({'country': value['country']} if 'country' in value else {})
-                }
-                for key, value in stats_dict.items()
-            }
-
-        country_breakdown = summarize_stats(country_stats)
-        city_breakdown = summarize_stats(city_stats)
-        top_countries = sorted(country_breakdown.items(), key=lambda x: x[1]['users_count'], reverse=True)[:10]
-        top_cities = sorted(city_breakdown.items(), key=lambda x: x[1]['users_count'], reverse=True)[:10]
-
-        response_data = {
-            'songs_shared': songs_shared,
-            'songs_received': songs_received,
-            'users_exchanged_with': len(exchange_partners),
-            'countries_involved': len(countries),
-            'top_locations': {
-                'countries': [
-                    {'country': c, **stats} for c, stats in top_countries
-                ] if top_countries else [],
-                'cities': [
-                    {'city': c, **stats} for c, stats in top_cities
-                ] if top_cities else []
-            }
-        }
-
+        response_data = compute_user_statistics(target_user)
         return Response(response_data, status=status.HTTP_200_OK)
 
     except Exception as e:
@@ -331,49 +340,7 @@ def connected_users_list_by_uid(request, user_uid):
         )
 
     try:
-        # Get all exchanges where target user is sender or receiver
-        user_exchanges = SongExchange.objects.filter(
-            Q(sender=target_user) | Q(receiver=target_user)
-        ).exclude(
-            Q(sender=target_user, receiver=None) | Q(receiver=target_user, sender=None)
-        ).select_related('sender', 'receiver')
-
-        # Collect unique partner IDs and count exchanges
-        partner_ids = set()
-        partner_exchange_counts = {}
-        
-        for exchange in user_exchanges:
-            if exchange.sender == target_user and exchange.receiver:
-                partner_id = exchange.receiver.id
-            elif exchange.receiver == target_user and exchange.sender:
-                partner_id = exchange.sender.id
-            else:
-                continue
-            
-            if partner_id != target_user.id:
-                partner_ids.add(partner_id)
-                partner_exchange_counts[partner_id] = partner_exchange_counts.get(partner_id, 0) + 1
-
-        # Fetch partner users
-        partners = User.objects.filter(id__in=partner_ids)
-
-        # Serialize users
-        serializer = UserSerializer(partners, many=True, context={'request': request})
-        users_data = serializer.data
-
-        # Add exchange count to each user
-        for user_data in users_data:
-            user_id = user_data.get('pk') or user_data.get('id')
-            if user_id:
-                user_data['songs_exchanged'] = partner_exchange_counts.get(user_id, 0)
-
-        # Sort by songs exchanged (descending)
-        users_data.sort(key=lambda x: x.get('songs_exchanged', 0), reverse=True)
-
-        return Response({
-            'count': len(users_data),
-            'results': users_data
-        }, status=status.HTTP_200_OK)
+        return connected_users_response(request, target_user)
 
     except Exception as e:
         return Response(
@@ -1,6 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from music.api.song_statistics import song_exchange_statistics, user_summary_statistics, connected_users_list, user_statistics_by_uid, connected_users_list_by_uid
+from music.api.async_views import song_upload
+from music.api.match_views import song_match_preview
+from music.api.profile_views import user_profile_by_uid
+from music.api.search_views import song_search
 from . import views
 from .views import UserReceivedSongsView
 
@@ -9,6 +13,9 @@ router.register(r'platforms', views.MusicPlatformViewSet)
 router.register(r'songs', views.SongViewSet)
 
 urlpatterns = [
+    path('songs/upload-async/', song_upload, name='song-upload-async'),
+    path('songs/search/', song_search, name='song-search'),
+    path('songs/<uuid:song_uid>/match-preview/', song_match_preview, name='song-match-preview'),
     path('', include(router.urls)),
     path('received-songs', views.ReceivedSongsMatchedView.as_view(), name='received-songs'),
     path('user-received-songs/<uuid:user_uid>/', views.UserReceivedSongsView.as_view(), name='user-received-songs'),
@@ -18,5 +25,6 @@ urlpatterns = [
     path('connected-users', connected_users_list, name='connected-users'),
     path('connected-users/<uuid:user_uid>/', connected_users_list_by_uid, name='connected-users-by-uid'),
     path('user-statistics/<uuid:user_uid>/', user_statistics_by_uid, name='user-statistics-by-uid'),
+    path('user-profile/<uuid:user_uid>/', user_profile_by_uid, name='user-profile-by-uid'),
     path('genre-distribution', views.GenreDistributionAPIView.as_view(), name='genre-distribution'),
 ]
@@ -1,8 +1,8 @@
 import re
 import logging
-from django.conf import settings
 
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 
 logger = logging.getLogger(__name__)
 from rest_framework import generics
@@ -10,32 +10,107 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from collections import Counter
-from rest_framework.pagination import PageNumberPagination
-from music.models import Song, MusicPlatform, SongExchange
-from music.match_helpers import find_and_create_automatic_match, find_and_create_random_match
+from datetime import datetime, time, timedelta
+from uuid import UUID
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localdate, make_aware
+from rest_framework.pagination import CursorPagination
+from music.models import Song, SongGenre, MusicPlatform, SongExchange
+from music.bulk_import import build_bulk_response, fetch_tracks, notify_matches, resolve_track_ids, store_and_match
+from music.ingest import (
+    IngestError,
+    UploadDeadline,
+    build_upload_response,
+    fetch_fun_fact,
+    fetch_track,
+    get_executor,
+    match_song,
+    needs_fun_fact,
+    push_match_notification,
+    record_match_notifications,
+    result_by_deadline,
+    save_fun_fact,
+    save_song,
+    unexpected_error_response,
+)
 from music.permissions import CanUploadSong
-from music.gen_ai import GenFunFact, generate_fun_fact
+from users.choices import UserTypeChoice
+from music.tracks import track_info
 from core.decorators import handle_api_errors, validate_uuid
+from core.pagination import EstimatedCountPagination
 from .serializers import (
-    MatchedSongExchangeSerializer,
+    MatchedSongExchangeListSerializer,
     SongSerializer,
     MusicPlatformSerializer,
-    SongCreateSerializer,
 )
 
 from rest_framework.permissions import IsAuthenticated
-from music.spotify_utils import get_song_category_from_url
 
-from core.notification import send_notification
 
 
-class SongExchangePagination(PageNumberPagination):
+class SongExchangePagination(EstimatedCountPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
     max_page_size_query_param = "max_page_size"
 
 
+class SongCursorPagination(CursorPagination):
+    """Newest first without counting the songs: every page is an index range read from the previous one"""
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "-created_at"
+
+    def decode_cursor(self, request):
+        # An empty ?cursor= asks for the first page
+        if not request.query_params.get(self.cursor_query_param):
+            return None
+        return super().decode_cursor(request)
+
+
+def start_of_day(value, param):
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValueError(f'{param} must be a date (YYYY-MM-DD)')
+    return make_aware(datetime.combine(day, time.min))
+
+
+def filter_song_list(queryset, params):
+    """
+    Songs matching the list filters: genre, artist (exact), uploader (user uid)
+    and created_from/created_to (dates, both included). Raises ValueError on an
+    invalid filter value.
+    """
+    genre = params.get('genre', '').lower().strip()
+    if genre:
+        queryset = queryset.filter(id__in=SongGenre.objects.filter(genre=genre).values('song_id'))
+
+    artist = params.get('artist', '').strip()
+    if artist:
+        queryset = queryset.filter(artist=artist)
+
+    uploader = params.get('uploader')
+    if uploader:
+        try:
+            queryset = queryset.filter(uploader__uid=UUID(uploader))
+        except ValueError:
+            raise ValueError('uploader must be a user uid')
+
+    if params.get('created_from'):
+        queryset = queryset.filter(created_at__gte=start_of_day(params['created_from'], 'created_from'))
+    if params.get('created_to'):
+        queryset = queryset.filter(
+            created_at__lt=start_of_day(params['created_to'], 'created_to') + timedelta(days=1)
+        )
+    return queryset
+
+
 class MusicPlatformViewSet(viewsets.ModelViewSet):
     """ViewSet for managing music platforms"""
 
@@ -48,13 +123,39 @@ class SongViewSet(viewsets.ModelViewSet):
 
     queryset = Song.objects.all()
     permission_classes = [IsAuthenticated, CanUploadSong]
-    pagination_class = SongExchangePagination
+
+    @property
+    def pagination_class(self):
+        # Cursor pages are opt-in with ?cursor= (empty for the first page); by
+        # default the list keeps numbered pages with a (possibly estimated) count
+        if SongCursorPagination.cursor_query_param in self.request.query_params:
+            return SongCursorPagination
+        return SongExchangePagination
 
     def get_serializer_class(self):
         return SongSerializer
 
     def get_queryset(self):
-        return Song.objects.select_related("platform").order_by("-created_at")
+        return Song.objects.select_related("platform", "uploader").defer("search_vector").order_by("-created_at")
+
+    def list(self, request, *args, **kwargs):
+        """
+        Songs, newest first, filtered by ?genre=, ?artist=, ?uploader= (user uid)
+        and ?created_from=/?created_to= (YYYY-MM-DD). Pages are numbered (?page=)
+        by default; ?cursor= switches to next and previous cursors without a count.
+        """
+        try:
+            queryset = filter_song_list(self.get_queryset(), request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        page = self.paginate_queryset(queryset)
+        context = self.get_serializer_context()
+        context['uploaded_today'] = Song.uploaded_today_by(
+            {song.uploader_id for song in page if song.uploader and song.uploader.type == UserTypeChoice.BASIC}
+        )
+        serializer = SongSerializer(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
 
     def create(self, request, *args, **kwargs):
         """
@@ -66,237 +167,166 @@ class SongViewSet(viewsets.ModelViewSet):
 
             spotify_url = request.data.get('url')
             genre_match = str(request.data.get('genre_match', 'false')).lower()
-            logger.info(f"Song upload request - URL: {spotify_url}, genre_match: {genre_match}, user: {request.user.email}")
-            logger.debug(f"Request data: {request.data}")
+            logger.info("Song upload request - URL: %s, genre_match: %s, user: %s", spotify_url, genre_match, request.user.email)
+            logger.debug("Request data: %s", request.data)
 
             if not spotify_url:
-                logger.warning(f"Song upload failed: Missing URL for user {request.user.email}")
+                logger.warning("Song upload failed: Missing URL for user %s", request.user.email)
                 return Response({'error': 'Spotify URL is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
+            deadline = UploadDeadline()
+            executor = get_executor()
             try:
-                info = get_song_category_from_url(spotify_url)
-                if not info:
-                    logger.warning(f"Failed to fetch song info - URL: {spotify_url}")
-                    return Response({
-                        'error': 'Invalid Spotify URL or unable to fetch song information. Please check the URL and try again.'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-            except ValueError as e:
-                # Spotify credentials missing
-                logger.error(f"Spotify credentials error: {str(e)}")
-                return Response({
-                    'error': 'Spotify API is not configured. Please contact support.'
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            except Exception as e:
-                logger.error(f"Error fetching song info from Spotify URL: {str(e)}", exc_info=True)
-                error_msg = str(e)
-                if '401' in error_msg or 'Unauthorized' in error_msg:
-                    return Response({
-                        'error': 'Spotify API authentication failed. Please check API credentials.'
-                    }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-                return Response({
-                    'error': f'Failed to fetch song information: {error_msg}'
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-            spotify_platform, _ = MusicPlatform.objects.get_or_create(
-                name='Spotify',
-                defaults={'domain': 'spotify.com'}
+                track = fetch_track(spotify_url)
+                info = track_info(track)
+                own_fun_fact = None
+                if not track.fun_fact:
+                    # The fun fact only needs the metadata; generate it while the song is stored and matched
+                    own_fun_fact = executor.submit(fetch_fun_fact, track.title, track.artist, spotify_url)
+                song = save_song(request.user, spotify_url, info, track.fun_fact, track)
+            except IngestError as e:
+                return Response(e.data, status=e.status_code)
+
+            matched_song, matched_user, match_type = match_song(request.user, song, genre_match)
+
+            matched_fun_fact = None
+            pushes = []
+            if matched_song and matched_user:
+                # Generate fun fact for received song if it doesn't have one
+                if needs_fun_fact(matched_song):
+                    matched_fun_fact = executor.submit(
+                        fetch_fun_fact, matched_song.title, matched_song.artist, matched_song.url
+                    )
+
+                # Only send notifications for genre matches (not random matches)
+                if match_type == 'automatic':
+                    pushes = [
+                        executor.submit(push_match_notification, device_token)
+                        for device_token in record_match_notifications(request.user, matched_user, matched_song)
+                    ]
+
+            if own_fun_fact:
+                save_fun_fact(song, result_by_deadline(own_fun_fact, deadline, '', 'Fun fact'))
+            if matched_fun_fact:
+                save_fun_fact(
+                    matched_song,
+                    result_by_deadline(matched_fun_fact, deadline, '', 'Fun fact for received song'),
+                )
+            for push in pushes:
+                result_by_deadline(push, deadline, None, 'Match push notification')
+
+            response_data = build_upload_response(
+                request, song, info, genre_match, matched_song, matched_user
             )
+            return Response(response_data, status=status.HTTP_201_CREATED)
+
+        except Exception as e:
+            # Catch any unexpected errors
+            return Response(unexpected_error_response(e), status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            # Generate fun fact with error handling
-            fun_fact_text = ""
+    @action(detail=False, methods=['post'], url_path='bulk-import')
+    def bulk_import(self, request):
+        """
+        Import a Spotify playlist or album, or a list of track URLs, in one request
+        {
+            "url": "<playlist, album or track url>" or "urls": ["<track url>", ...],
+            "genre_match": "true"/"false"
+        }
+        """
+        try:
+            genre_match = str(request.data.get('genre_match', 'false')).lower()
+            deadline = UploadDeadline()
             try:
-                song = GenFunFact(
-                    title=info.get('title', 'Unknown Title'),
-                    artist=info.get('artists', 'Unknown Artist'),
-                    url=spotify_url
+                track_ids, over_max = resolve_track_ids(request.data)
+                tracks = fetch_tracks(track_ids)
+                results, over_limit = store_and_match(
+                    request.user, [tracks[track_id] for track_id in track_ids if track_id in tracks], genre_match
                 )
-                logger.info(f"Generating fun fact for song: {song.title} by {song.artist}")
-                fun_fact = generate_fun_fact(song)
-                fun_fact_text = fun_fact.get('fact', '') if isinstance(fun_fact, dict) else str(fun_fact)
-                if fun_fact_text:
-                    logger.info(f"Successfully generated fun fact for '{song.title}': {fun_fact_text[:50]}...")
-                else:
-                    logger.warning(f"Fun fact generation returned empty result for '{song.title}'")
-            except ValueError as e:
-                # API key not configured
-                logger.error(f"GOOGLE_API_KEY not configured: {str(e)}")
-                fun_fact_text = ""
-            except Exception as e:
-                logger.error(f"Failed to generate fun fact for song '{info.get('title', 'Unknown')}': {str(e)}", exc_info=True)
-                # Continue without fun fact - it's not critical
-                fun_fact_text = ""
-
-            # Safely extract info with defaults
-            song_data = {
-                'title': info.get('title', 'Unknown Title'),
-                'artist': info.get('artists', 'Unknown Artist'),
-                'url': spotify_url,
-                'spotify_track_id': info.get('track_id', ''),
-                'album': info.get('album', ''),
-                'cover_image_url': info.get('cover_image_url', ''),
-                'platform': spotify_platform.id,
-                'duration_seconds': info.get('duration_seconds'),
-                'release_date': info.get('release_date', ''),
-                'genre': info.get('genres', []) if info.get('genres') and len(info.get('genres', [])) > 0 else ["unknown"],
-                'uploader': request.user.id,
-                'fun_fact': fun_fact_text
-            }
-
-            song_serializer = SongCreateSerializer(data=song_data)
-            if song_serializer.is_valid():
-                try:
-                    song = song_serializer.save()
-                except Exception as e:
-                    logger.error(f"Error saving song: {str(e)}", exc_info=True)
-                    return Response({
-                        'error': 'Failed to save song. Please try again.'
-                    }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-                # Initialize variables
-                matched_song = None
-                matched_user = None
-                match_type = None
+            except IngestError as e:
+                return Response(e.data, status=e.status_code)
+            logger.info(
+                "Bulk import by %s: %d of %d tracks imported",
+                request.user.email, len(results), len(track_ids)
+            )
 
+            # Only send notifications for genre matches (not random matches)
+            if genre_match == 'true':
                 try:
-                    if genre_match == 'true':
-                        matched_song, matched_user = find_and_create_automatic_match(request.user, song)
-                        match_type = 'automatic'
-
-                    elif genre_match == 'false':
-                        matched_song, matched_user = find_and_create_random_match(request.user, song)
-                        match_type = 'random'
+                    notify_matches(request.user, results, deadline)
                 except Exception as e:
-                    logger.error(f"Error during song matching: {str(e)}", exc_info=True)
-                    # Continue without match - song is still saved
-                    matched_song = None
-                    matched_user = None
-                    match_type = None
+                    logger.warning("Failed to send match notifications: %s", e)
+
+            unavailable = [track_id for track_id in track_ids if track_id not in tracks]
+            return Response(
+                build_bulk_response(request.user, results, unavailable, over_limit, over_max),
+                status=status.HTTP_201_CREATED,
+            )
 
-                try:
-                    song_serialized = SongSerializer(song, context={'request': request}).data
-                except Exception as e:
-                    logger.error(f"Error serializing song: {str(e)}", exc_info=True)
-                    # Fallback to basic song data
-                    song_serialized = {
-                        'uid': str(song.uid),
-                        'title': song.title,
-                        'artist': song.artist,
-                        'url': song.url,
-                    }
-                
-                response_data = {
-                    'message': 'Song imported successfully',
-                    'song': song_serialized
-                }
-
-                if not info.get('genres') or len(info.get('genres', [])) == 0 and genre_match == 'true':
-                    response_data['message'] += '.This song does not have a genre set by the artist. It will be exchanged in the Random Match pool'
-
-                if matched_song and matched_user:
-                    # Generate fun fact for received song if it doesn't have one
-                    if not matched_song.fun_fact or not matched_song.fun_fact.strip():
-                        try:
-                            logger.info(f"Generating fun fact for received song: {matched_song.title} by {matched_song.artist}")
-                            received_song_fun_fact = GenFunFact(
-                                title=matched_song.title,
-                                artist=matched_song.artist,
-                                url=matched_song.url
-                            )
-                            fun_fact_result = generate_fun_fact(received_song_fun_fact)
-                            fun_fact_text = fun_fact_result.get('fact', '') if isinstance(fun_fact_result, dict) else str(fun_fact_result)
-                            
-                            if fun_fact_text and fun_fact_text.strip():
-                                matched_song.fun_fact = fun_fact_text.strip()
-                                matched_song.save(update_fields=['fun_fact'])
-                                logger.info(f"Successfully generated and saved fun fact for received song '{matched_song.title}'")
-                            else:
-                                logger.warning(f"Fun fact generation returned empty result for received song '{matched_song.title}'")
-                        except ValueError as e:
-                            # API key not configured
-                            logger.error(f"GOOGLE_API_KEY not configured, cannot generate fun fact for received song: {str(e)}")
-                        except Exception as e:
-                            logger.error(f"Failed to generate fun fact for received song '{matched_song.title}': {str(e)}", exc_info=True)
-                            # Continue without fun fact - it's not critical
-                    
-                    # Only send notifications for genre matches (not random matches)
-                    if match_type == 'automatic':
-                        try:
-                            send_notification(
-                                None, request.user, 'song_matched', matched_song,
-                                description=f'Your song was matched with another user\'s song.',
-                                send_push=True, target_url=matched_song.url if matched_song else None
-                            )
-
-                            send_notification(
-                                None, matched_user, 'song_matched', matched_song,
-                                description=f'Your song was matched with another user\'s song.',
-                                send_push=True, target_url=matched_song.url if matched_song else None
-                            )
-                        except Exception as e:
-                            logger.warning(f"Failed to send match notifications: {str(e)}")
-
-                    # Get profile image URL
-                    if matched_user.profile_image and hasattr(matched_user.profile_image, 'url'):
-                        profile_image_url = request.build_absolute_uri(matched_user.profile_image.url)
-                    else:
-                        profile_image_url = None
-
-                    # Serialize matched song (refresh from DB to get updated fun_fact)
-                    matched_song.refresh_from_db()
-                    try:
-                        matched_song_data = SongSerializer(matched_song, context={'request': request}).data
-                    except Exception as e:
-                        logger.warning(f"Error serializing matched song: {str(e)}")
-                        matched_song_data = {
-                            'uid': str(matched_song.uid),
-                            'title': matched_song.title,
-                            'artist': matched_song.artist,
-                            'url': matched_song.url,
-                            'fun_fact': getattr(matched_song, 'fun_fact', '') or '',
-                        }
-                    
-                    # Update response based on match type
-                    response_data.update({
-                        'matched_with': {
-                            'song': matched_song_data,
-                            'user': {
-                                'id': str(matched_user.id),
-                                'uid': str(matched_user.uid),
-                                'email': matched_user.email,
-                                'name': matched_user.first_name,
-                                'profile_image_url': profile_image_url,
-                                'profession': matched_user.profession or "",
-                                'country': matched_user.country or "",
-                                'city': matched_user.city or "",
-                            }
-                        }
-                    })
-                else:
-                    if genre_match:
-                        response_data['message'] += '. No songs available for genre match, added to matching pool.'
-                    else:
-                        response_data['message'] += '. No songs available for random match, added to matching pool.'
-                return Response(response_data, status=status.HTTP_201_CREATED)
-            else:
-                logger.warning(f"Song serializer validation failed: {song_serializer.errors}")
-                return Response({
-                    'error': 'Invalid song data.',
-                    'details': song_serializer.errors
-                }, status=status.HTTP_400_BAD_REQUEST)
-        
         except Exception as e:
             # Catch any unexpected errors
-            logger.error(f"Unexpected error in song creation: {str(e)}", exc_info=True)
-            return Response({
-                'error': 'An unexpected error occurred while uploading the song. Please try again.',
-                'details': str(e) if settings.DEBUG else None
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-class SentSongsMatchedView(generics.ListAPIView):
-    serializer_class = MatchedSongExchangeSerializer
+            return Response(unexpected_error_response(e), status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def uploads_today_subquery(uploader_field):
+    """Number of songs the uploader referenced by `uploader_field` has uploaded today"""
+    return Coalesce(
+        Subquery(
+            Song.objects.filter(uploader=OuterRef(uploader_field), created_at__date=localdate())
+            .order_by()
+            .values('uploader')
+            .annotate(count=Count('id'))
+            .values('count')[:1],
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def exchange_list_queryset(**filters):
+    """
+    Matched exchanges with everything MatchedSongExchangeListSerializer renders
+    loaded by the initial query: both songs, their platforms and uploaders, both
+    users, and each uploader's upload count for today.
+    """
+    return (
+        SongExchange.objects.filter(
+            status__in=["matched", "completed"],
+            received_song__isnull=False,
+            **filters,
+        )
+        .select_related(
+            "sent_song",
+            "received_song",
+            "sender",
+            "receiver",
+            "sent_song__platform",
+            "received_song__platform",
+            "sent_song__uploader",
+            "received_song__uploader",
+        )
+        .annotate(
+            sent_song_uploads_today=uploads_today_subquery("sent_song__uploader"),
+            received_song_uploads_today=uploads_today_subquery("received_song__uploader"),
+        )
+        .order_by("-created_at")
+    )
+
+
+class MatchedExchangeListView(generics.ListAPIView):
+    """Base view for the paginated lists of matched song exchanges"""
+    serializer_class = MatchedSongExchangeListSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = SongExchangePagination
 
+    def get_serializer_context(self):
+        """Pass request context to serializer for building absolute URLs"""
+        context = super().get_serializer_context()
+        context['request'] = self.request
+        return context
+
+
+class SentSongsMatchedView(MatchedExchangeListView):
+
     def get_queryset(self):
         # Check if user_uid is provided in query params
         user_uid = self.request.query_params.get('user_uid')
@@ -311,68 +341,18 @@ class SentSongsMatchedView(generics.ListAPIView):
         else:
             sender_user = self.request.user
         
-        return (
-            SongExchange.objects.filter(
-                sender=sender_user,
-                status__in=["matched", "completed"],
-                received_song__isnull=False,
-            )
-            .select_related(
-                "sent_song",
-                "received_song",
-                "sender",
-                "receiver",
-                "sent_song__platform",
-                "received_song__platform",
-                "sent_song__uploader",
-                "received_song__uploader",
-            )
-            .order_by("-created_at")
-        )
-    
-    def get_serializer_context(self):
-        """Pass request context to serializer for building absolute URLs"""
-        context = super().get_serializer_context()
-        context['request'] = self.request
-        return context
+        return exchange_list_queryset(sender=sender_user)
 
 
-class ReceivedSongsMatchedView(generics.ListAPIView):
+class ReceivedSongsMatchedView(MatchedExchangeListView):
     """View for songs received by the current user"""
-    serializer_class = MatchedSongExchangeSerializer
-    permission_classes = [IsAuthenticated]
-    pagination_class = SongExchangePagination
 
     def get_queryset(self):
-        return (
-            SongExchange.objects.filter(
-                receiver=self.request.user,
-                status__in=["matched", "completed"],
-                received_song__isnull=False,
-            )
-            .select_related(
-                "sent_song",
-                "received_song",
-                "sender",
-                "sent_song__platform",
-                "received_song__platform",
-                "received_song__uploader",
-            )
-            .order_by("-created_at")
-        )
-    
-    def get_serializer_context(self):
-        """Pass request context to serializer for building absolute URLs"""
-        context = super().get_serializer_context()
-        context['request'] = self.request
-        return context
+        return exchange_list_queryset(receiver=self.request.user)
 
 
-class UserReceivedSongsView(generics.ListAPIView):
+class UserReceivedSongsView(MatchedExchangeListView):
     """View for songs received by a specific user (by UID)"""
-    serializer_class = MatchedSongExchangeSerializer
-    permission_classes = [IsAuthenticated]
-    pagination_class = SongExchangePagination
     lookup_field = 'uid'
     lookup_url_kwarg = 'user_uid'
 
@@ -385,28 +365,7 @@ class UserReceivedSongsView(generics.ListAPIView):
         except User.DoesNotExist:
             return SongExchange.objects.none()
         
-        return (
-            SongExchange.objects.filter(
-                receiver=target_user,
-                status__in=["matched", "completed"],
-                received_song__isnull=False,
-            )
-            .select_related(
-                "sent_song",
-                "received_song",
-                "sender",
-                "sent_song__platform",
-                "received_song__platform",
-                "received_song__uploader",
-            )
-            .order_by("-created_at")
-        )
-    
-    def get_serializer_context(self):
-        """Pass request context to serializer for building absolute URLs"""
-        context = super().get_serializer_context()
-        context['request'] = self.request
-        return context
+        return exchange_list_queryset(receiver=target_user)
 
 
 class GenreDistributionAPIView(APIView):
@@ -447,16 +406,16 @@ class GenreDistributionAPIView(APIView):
                 try:
                     limit = int(limit_param)
                     if limit < 1 or limit > 100:
-                        logger.warning(f"Invalid limit parameter: {limit}")
+                        logger.warning("Invalid limit parameter: %s", limit)
                         limit = 50  # Default to 50 if invalid
                     response_data = response_data[:limit]
                 except ValueError:
-                    logger.warning(f"Invalid limit parameter format: {limit_param}")
+                    logger.warning("Invalid limit parameter format: %s", limit_param)
                     pass
 
             return Response(response_data)
         except Exception as e:
-            logger.error(f"Error in genre distribution: {str(e)}", exc_info=True)
+            logger.error("Error in genre distribution: %s", e, exc_info=True)
             return Response(
                 {"error": "Failed to fetch genre distribution"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
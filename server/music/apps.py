@@ -6,3 +6,6 @@ class MusicConfig(AppConfig):
     name = 'music'
     verbose_name = "Music"
     verbose_name_plural = "Music"
+
+    def ready(self):
+        import music.signals  # noqa
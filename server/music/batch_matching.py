@@ -0,0 +1,196 @@
+"""
+Periodic matching of the pending exchange pool.
+
+find_and_create_automatic_match only runs when a song is uploaded, so pending
+exchanges that could be paired with each other stay pending until one of their
+senders uploads again. The batch matcher pairs them directly:
+
+- load: the pool is read with one query into parallel lists of IDF-weighted
+  genre vectors (music/genre_vectors.py, weighted over this pool), with
+  features interned to ints and an inverted index of feature -> pool positions;
+- score: each exchange only visits the buckets of its own features, so pairs
+  with nothing in common are never scored; similarity is the cosine of their
+  vectors as a percentage, as the upload matcher ranks by, and only the best
+  candidates of each exchange are kept to bound memory;
+- pair: a greedy maximum-weight matching over the candidates, best first,
+  repeated over the exchanges left unpaired until no pair remains;
+- commit: in one transaction, both exchanges of each pair are re-checked under
+  a row lock (an upload may have claimed one since the pool was loaded) and
+  updated to point at each other, and their feed activities are bulk-created.
+
+Run by the match_pending_exchanges management command.
+"""
+import heapq
+from bisect import bisect_right
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.activities import create_song_exchange_activities
+from core.notification import send_notification
+from music.genre_vectors import feature_idf, genre_vector, normalize_genres
+from music.models import SongExchange
+from music.profile_cache import invalidate_profiles
+
+
+def pending_exchanges():
+    return SongExchange.objects.filter(
+        status='pending',
+        received_song__isnull=True,
+        receiver__isnull=True
+    )
+
+
+class PendingPool:
+    """Pending exchanges as parallel lists, oldest first, with an index of feature -> positions"""
+
+    def __init__(self, rows):
+        self.ids = []
+        self.senders = []
+        genre_lists = []
+        for exchange_id, sender_id, genre in rows:
+            self.ids.append(exchange_id)
+            self.senders.append(sender_id)
+            genre_lists.append(normalize_genres(genre))
+
+        idf = feature_idf(genre_lists)
+        feature_ids = {}
+        self.vectors = [
+            {
+                feature_ids.setdefault(feature, len(feature_ids)): weight
+                for feature, weight in genre_vector(genres, idf, 1.0).items()
+            }
+            for genres in genre_lists
+        ]
+
+        # Positions are appended in order, so every bucket is sorted
+        self.buckets = defaultdict(list)
+        for position, vector in enumerate(self.vectors):
+            for feature_id in vector:
+                self.buckets[feature_id].append(position)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def load_pending_pool(limit=None):
+    rows = pending_exchanges().order_by('created_at', 'id').values_list('id', 'sender_id', 'sent_song__genre')
+    if limit:
+        rows = rows[:limit]
+    return PendingPool(rows)
+
+
+def score_candidates(pool, min_similarity=0, max_candidates=20, taken=frozenset()):
+    """
+    Candidate pairs (similarity, i, j) of pool positions i < j with different
+    senders and at least one genre feature in common, keeping the
+    `max_candidates` most similar partners of each exchange. Positions in
+    `taken` are left out.
+    """
+    candidates = []
+    for i, vector in enumerate(pool.vectors):
+        if i in taken:
+            continue
+        dot = defaultdict(float)
+        for feature_id, weight in vector.items():
+            bucket = pool.buckets[feature_id]
+            for j in bucket[bisect_right(bucket, i):]:
+                dot[j] += weight * pool.vectors[j][feature_id]
+
+        scored = []
+        sender = pool.senders[i]
+        for j, similarity in dot.items():
+            if j in taken or pool.senders[j] == sender:
+                continue
+            similarity *= 100
+            if similarity >= min_similarity:
+                # -j: on equal similarity the older partner wins
+                scored.append((similarity, -j))
+        candidates += [(similarity, i, -j) for similarity, j in heapq.nlargest(max_candidates, scored)]
+    return candidates
+
+
+def greedy_pairs(pool, min_similarity=0, max_candidates=20):
+    """
+    Exchange id pairs (a, b, similarity), taking the most similar free pairs
+    first. Exchanges whose kept candidates were all taken are scored again
+    against the rest of the pool until no pair is left.
+    Returns (pairs, number of candidate pairs scored).
+    """
+    taken = set()
+    pairs = []
+    scored = 0
+    while True:
+        candidates = score_candidates(pool, min_similarity, max_candidates, taken)
+        candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+        scored += len(candidates)
+        found = len(pairs)
+        for similarity, i, j in candidates:
+            if i in taken or j in taken:
+                continue
+            taken.update((i, j))
+            pairs.append((pool.ids[i], pool.ids[j], similarity))
+        if len(pairs) == found:
+            return pairs, scored
+
+
+def commit_pairs(pairs, batch_size=500):
+    """
+    Match both exchanges of each pair with each other in one transaction.
+    Pairs where either exchange is no longer pending are skipped.
+    Returns the matched (exchange, partner) pairs.
+    """
+    matched = []
+    with transaction.atomic():
+        for start in range(0, len(pairs), batch_size):
+            chunk = pairs[start:start + batch_size]
+            exchanges = {
+                exchange.id: exchange
+                for exchange in pending_exchanges()
+                .filter(id__in=[exchange_id for pair in chunk for exchange_id in pair[:2]])
+                .select_related('sent_song', 'sender')
+                .select_for_update(of=('self',))
+            }
+
+            now = timezone.now()
+            updated = []
+            for a_id, b_id, _ in chunk:
+                a, b = exchanges.get(a_id), exchanges.get(b_id)
+                if a is None or b is None:
+                    continue
+                for exchange, partner in ((a, b), (b, a)):
+                    exchange.receiver = partner.sender
+                    exchange.received_song = partner.sent_song
+                    exchange.status = 'matched'
+                    exchange.match_type = 'genre'
+                    exchange.matched_at = now
+                    exchange.updated_at = now
+                    updated.append(exchange)
+                matched.append((a, b))
+
+            # Only the partner columns differ per row; the rest is one plain UPDATE
+            SongExchange.objects.bulk_update(updated, ['receiver', 'received_song'])
+            SongExchange.objects.filter(id__in=[exchange.id for exchange in updated]).update(
+                status='matched', match_type='genre', matched_at=now, updated_at=now
+            )
+            create_song_exchange_activities(updated)
+
+        user_ids = {exchange.sender_id for pair in matched for exchange in pair}
+        transaction.on_commit(lambda: invalidate_profiles(*user_ids))
+    return matched
+
+
+def notify_pairs(matched):
+    """Tell both senders of each pair which song they received"""
+    for pair in matched:
+        for exchange in pair:
+            send_notification(
+                None,
+                exchange.sender,
+                verb='song_matched',
+                action_object=exchange.received_song,
+                description='Your song was matched with another user\'s song.',
+                send_push=True,
+                target_url=exchange.received_song.url,
+            )
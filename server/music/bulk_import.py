@@ -0,0 +1,242 @@
+"""
+Bulk song import from a Spotify playlist or album URL, or a list of track URLs.
+
+Compared with one POST songs/ per track, the collection is resolved and the
+metadata of tracks not stored yet is fetched with the provider's batch calls
+(50 tracks or artists per Spotify request), the songs and their feed activities
+are stored with bulk_create, and the whole batch is matched in one pass.
+Imported songs get no fun fact up front unless their track already has one;
+like any pooled song, a song gets one when a later upload is matched with it.
+
+The daily upload limit is checked while holding a lock on the user's row
+(music.ingest.reserve_uploads, as for single uploads), so concurrent imports
+and uploads of the same user cannot exceed it together.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import status
+
+from core.activities import song_discovery_activity
+from core.models import Activity
+from music.ingest import (
+    IngestError,
+    get_executor,
+    push_match_notification,
+    record_match_notifications,
+    reserve_uploads,
+    result_by_deadline,
+)
+from music.match_helpers import create_automatic_matches_in_bulk, create_random_matches_in_bulk, song_genre_rows
+from music.models import MusicPlatform, Song, SongGenre, Track
+from music.profile_cache import invalidate_profiles, invalidate_uploader_profiles
+from music.providers import TRACK_URL, get_metadata_provider, parse_spotify_url
+from music.tracks import store_tracks
+from soundly.metrics import INGEST_STAGE_SECONDS, MATCH_OUTCOMES
+from users.choices import UserTypeChoice
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_track_ids(data):
+    """
+    Track ids to import from the request body, without duplicates and capped at
+    BULK_IMPORT_MAX_TRACKS. Returns (track_ids, number of ids left out by the cap).
+    """
+    url = data.get('url')
+    urls = data.get('urls')
+    if url and urls:
+        raise IngestError({'error': 'Provide either url or urls, not both.'}, status.HTTP_400_BAD_REQUEST)
+
+    if url:
+        parsed = parse_spotify_url(url)
+        if not parsed:
+            raise IngestError({
+                'error': 'Invalid Spotify URL. Use a playlist, album or track URL.'
+            }, status.HTTP_400_BAD_REQUEST)
+        kind, spotify_id = parsed
+        if kind == 'track':
+            track_ids = [spotify_id]
+        else:
+            try:
+                with INGEST_STAGE_SECONDS.labels(stage='spotify').time():
+                    track_ids = get_metadata_provider().get_collection_track_ids(kind, spotify_id)
+            except Exception as e:
+                logger.error("Error fetching Spotify %s %s: %s", kind, spotify_id, e, exc_info=True)
+                raise IngestError({
+                    'error': f'Unable to fetch the {kind} from Spotify. Please check the URL and try again.'
+                }, status.HTTP_400_BAD_REQUEST)
+    elif urls:
+        if not isinstance(urls, list):
+            raise IngestError({'error': 'urls must be a list of Spotify track URLs.'}, status.HTTP_400_BAD_REQUEST)
+        track_ids, invalid_urls = [], []
+        for track_url in urls:
+            parsed = parse_spotify_url(track_url) if isinstance(track_url, str) else None
+            if parsed and parsed[0] == 'track':
+                track_ids.append(parsed[1])
+            else:
+                invalid_urls.append(track_url)
+        if invalid_urls:
+            raise IngestError({
+                'error': 'Only Spotify track URLs can be listed in urls.',
+                'invalid_urls': invalid_urls
+            }, status.HTTP_400_BAD_REQUEST)
+    else:
+        raise IngestError({
+            'error': 'A Spotify playlist or album url, or a list of track urls, is required.'
+        }, status.HTTP_400_BAD_REQUEST)
+
+    track_ids = list(dict.fromkeys(track_ids))
+    if not track_ids:
+        raise IngestError({'error': 'No tracks found to import.'}, status.HTTP_400_BAD_REQUEST)
+
+    max_tracks = settings.BULK_IMPORT_MAX_TRACKS
+    return track_ids[:max_tracks], max(0, len(track_ids) - max_tracks)
+
+
+def fetch_tracks(track_ids):
+    """
+    Tracks by id, with the same error responses as a single upload. Only
+    tracks not imported or uploaded before are fetched from Spotify.
+    """
+    tracks = Track.objects.in_bulk(track_ids, field_name='spotify_id')
+    missing = [track_id for track_id in track_ids if track_id not in tracks]
+    if not missing:
+        return tracks
+    try:
+        with INGEST_STAGE_SECONDS.labels(stage='spotify').time():
+            infos = get_metadata_provider().get_tracks(missing)
+    except ValueError as e:
+        # Spotify credentials missing
+        logger.error("Spotify credentials error: %s", e)
+        raise IngestError({
+            'error': 'Spotify API is not configured. Please contact support.'
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+    except Exception as e:
+        logger.error("Error fetching %d tracks from Spotify: %s", len(missing), e, exc_info=True)
+        raise IngestError({
+            'error': f'Failed to fetch song information: {str(e)}'
+        }, status.HTTP_400_BAD_REQUEST)
+    tracks.update(store_tracks(list(infos.values())))
+    return tracks
+
+
+def new_song(user, platform, track):
+    return Song(
+        uploader=user,
+        platform=platform,
+        track=track,
+        title=track.title,
+        artist=track.artist,
+        album=track.album,
+        url=TRACK_URL.format(track.spotify_id),
+        duration_seconds=track.duration_seconds,
+        release_date=track.release_date,
+        cover_image_url=track.cover_image_url,
+        genre=track.genre or ["unknown"],
+        fun_fact=track.fun_fact,
+    )
+
+
+def store_and_match(user, tracks, genre_match):
+    """
+    Store songs of the `tracks` that fit in today's upload limit and match them.
+    Returns (results, number of tracks left out by the limit), with one
+    (song, matched_song, matched_user) per stored song.
+    """
+    if not tracks:
+        raise IngestError({
+            'error': 'None of the tracks could be found on Spotify.'
+        }, status.HTTP_400_BAD_REQUEST)
+
+    spotify_platform, _ = MusicPlatform.objects.get_or_create(
+        name='Spotify',
+        defaults={'domain': 'spotify.com'}
+    )
+
+    with transaction.atomic():
+        allowed = reserve_uploads(user, len(tracks))
+        if not allowed:
+            raise IngestError({'error': 'Upload limit reached. You have 0 uploads remaining.'},
+                              status.HTTP_403_FORBIDDEN)
+
+        songs = Song.objects.bulk_create([new_song(user, spotify_platform, track) for track in tracks[:allowed]])
+        SongGenre.objects.bulk_create(song_genre_rows(songs))
+
+        Activity.objects.bulk_create([song_discovery_activity(song) for song in songs])
+
+        if genre_match == 'true':
+            results = create_automatic_matches_in_bulk(user, songs)
+        elif genre_match == 'false':
+            results = create_random_matches_in_bulk(user, songs)
+        else:
+            results = [(song, None, None) for song in songs]
+
+        partner_ids = {matched_user.pk for _, _, matched_user in results if matched_user}
+        transaction.on_commit(lambda: invalidate_profiles(user.pk, *partner_ids))
+        # bulk_create sends no post_save: the uploads change the remaining count
+        # shown with the user's songs in their existing partners' profiles too
+        transaction.on_commit(lambda: invalidate_uploader_profiles(user))
+
+    if genre_match in ('true', 'false'):
+        match_type = 'automatic' if genre_match == 'true' else 'random'
+        for _, matched_song, _ in results:
+            MATCH_OUTCOMES.labels(match_type=match_type, outcome='matched' if matched_song else 'pooled').inc()
+
+    return results, len(tracks) - allowed
+
+
+def notify_matches(user, results, deadline):
+    """Match notifications for a genre-matched import, with the pushes sent concurrently"""
+    pushes = []
+    for _, matched_song, matched_user in results:
+        if matched_song:
+            pushes += [
+                get_executor().submit(push_match_notification, device_token)
+                for device_token in record_match_notifications(user, matched_user, matched_song)
+            ]
+    for push in pushes:
+        result_by_deadline(push, deadline, None, 'Match push notification')
+
+
+def song_summary(song):
+    return {
+        'uid': str(song.uid),
+        'title': song.title,
+        'artist': song.artist,
+        'url': song.url,
+        'genre': song.genre,
+    }
+
+
+def build_bulk_response(user, results, unavailable, over_limit, over_max):
+    songs = []
+    for song, matched_song, matched_user in results:
+        summary = song_summary(song)
+        summary['matched_with'] = {
+            'song': song_summary(matched_song),
+            'user': {
+                'uid': str(matched_user.uid),
+                'name': matched_user.first_name,
+            },
+        } if matched_song else None
+        songs.append(summary)
+
+    matched = sum(1 for _, matched_song, _ in results if matched_song)
+    remaining_uploads = None
+    if user.type == UserTypeChoice.BASIC:
+        remaining_uploads = Song(uploader=user).remaining_uploads
+
+    return {
+        'message': f'Imported {len(results)} songs, {matched} matched.',
+        'imported': len(results),
+        'matched': matched,
+        'skipped': {
+            'unavailable': unavailable,
+            'over_daily_limit': over_limit,
+            'over_import_limit': over_max,
+        },
+        'remaining_uploads': remaining_uploads,
+        'songs': songs,
+    }
@@ -0,0 +1,208 @@
+"""
+IDF-weighted genre vectors for automatic matching.
+
+Jaccard over genre strings treats "pop" and "dance pop" as unrelated, and a
+shared "pop" counts as much as a shared "shoegaze". Here a song is a sparse
+vector over its genres and the words in them ("dance pop" -> dance pop, ~dance,
+~pop). Each feature is weighted by how rare it is in the pending pool (IDF) and
+the vector is normalized to unit length, so candidates are ranked by cosine
+similarity.
+
+The pending pool is kept in memory per process as an inverted index of feature
+-> {exchange id: weight}. Ranking an upload only touches the exchanges that
+share a feature with it, and loads no rows. Each refresh adds the exchanges
+created since the previous one, reaching GENRE_INDEX_COMMIT_MARGIN_SECONDS
+further back so that an upload committed after a newer one is still picked up.
+Every GENRE_INDEX_REFRESH_SECONDS the index, IDF weights included, is rebuilt
+in a background thread and swapped in, so no request waits on a full load.
+Exchanges matched by another process are dropped when they fail to be claimed.
+The match previews score songs with the same weights.
+"""
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from music.models import SongExchange
+
+GENRE_WEIGHT = 1.0
+WORD_WEIGHT = 0.5
+WORD_PATTERN = re.compile(r'\w\w+')
+
+
+def normalize_genres(genres):
+    if not genres:
+        return []
+    return [g.lower().strip() for g in genres if g.strip()]
+
+
+def genre_features(genres):
+    """Raw weights of the features of normalized genres: each genre, and each word in it"""
+    features = Counter()
+    for genre in genres:
+        features[genre] += GENRE_WEIGHT
+        for word in WORD_PATTERN.findall(genre):
+            features['~' + word] += WORD_WEIGHT
+    return features
+
+
+def feature_idf(genre_lists):
+    """Smoothed IDF of the features of normalized genre lists: a feature all of them have still weighs 1"""
+    document_frequency = Counter()
+    for genres in genre_lists:
+        document_frequency.update(genre_features(genres).keys())
+    return {
+        feature: math.log((1 + len(genre_lists)) / (1 + count)) + 1
+        for feature, count in document_frequency.items()
+    }
+
+
+def genre_vector(genres, idf, default_idf):
+    """Unit vector of the features of normalized genres weighted by `idf`, `default_idf` for the others"""
+    weights = {
+        feature: weight * idf.get(feature, default_idf)
+        for feature, weight in genre_features(genres).items()
+    }
+    norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+    return {feature: weight / norm for feature, weight in weights.items()} if norm else {}
+
+
+def pending_exchange_rows():
+    return SongExchange.objects.filter(
+        status='pending',
+        received_song__isnull=True,
+        receiver__isnull=True
+    ).values_list('id', 'sender_id', 'sent_song__genre')
+
+
+class PendingGenreIndex:
+    """Unit genre vectors of the pending exchanges, with an inverted index of feature -> weights"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.built_at = None
+        self.rebuilding = False
+        self._reset({}, 0)
+
+    def _reset(self, idf, pool_size):
+        self.idf = idf
+        # Features unseen when the weights were computed are as rare as can be
+        self.unseen_idf = math.log(1 + pool_size) + 1
+        self.senders = {}
+        self.vectors = {}
+        self.postings = defaultdict(dict)
+        # Exchanges created from then on, less the commit margin, are loaded by the next refresh
+        self.loaded_since = None
+
+    def vector(self, genres):
+        return genre_vector(genres, self.idf, self.unseen_idf)
+
+    def _add(self, rows):
+        for exchange_id, sender_id, genres in rows:
+            if exchange_id in self.vectors:
+                continue
+            vector = self.vector(normalize_genres(genres))
+            self.senders[exchange_id] = sender_id
+            self.vectors[exchange_id] = vector
+            for feature, weight in vector.items():
+                self.postings[feature][exchange_id] = weight
+
+    def _build(self):
+        """Load the whole pending pool and weigh it, into this index"""
+        loaded_since = timezone.now()
+        rows = list(pending_exchange_rows())
+        self._reset(feature_idf([normalize_genres(genres) for _, _, genres in rows]), len(rows))
+        self._add(rows)
+        self.loaded_since = loaded_since
+        self.built_at = time.monotonic()
+
+    def _rebuild_in_background(self):
+        try:
+            fresh = PendingGenreIndex()
+            fresh._build()
+            with self.lock:
+                self.idf, self.unseen_idf = fresh.idf, fresh.unseen_idf
+                self.senders, self.vectors, self.postings = fresh.senders, fresh.vectors, fresh.postings
+                # Exchanges loaded meanwhile are in the window of the next refresh again
+                self.loaded_since = fresh.loaded_since
+                self.built_at = fresh.built_at
+        finally:
+            self.rebuilding = False
+            connection.close()
+
+    def refresh(self):
+        """
+        Load the exchanges created since the last refresh, and start a rebuild
+        if the index is older than GENRE_INDEX_REFRESH_SECONDS. The first
+        refresh of a process builds the index in the request.
+        """
+        with self.lock:
+            if self.built_at is None:
+                self._build()
+                return
+            stale = not self.rebuilding and time.monotonic() - self.built_at > settings.GENRE_INDEX_REFRESH_SECONDS
+            if stale:
+                self.rebuilding = True
+            since = self.loaded_since - timedelta(seconds=settings.GENRE_INDEX_COMMIT_MARGIN_SECONDS)
+        if stale:
+            threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+
+        loaded_since = timezone.now()
+        rows = list(pending_exchange_rows().filter(created_at__gte=since))
+        with self.lock:
+            self._add(rows)
+            self.loaded_since = max(self.loaded_since, loaded_since)
+
+    def rank(self, genres, exclude_sender=None):
+        """
+        (similarity, exchange id) of the exchanges sharing a feature with the
+        normalized `genres`, most similar first and oldest first on equal similarity
+        """
+        with self.lock:
+            scores = defaultdict(float)
+            for feature, weight in self.vector(genres).items():
+                for exchange_id, exchange_weight in self.postings.get(feature, {}).items():
+                    scores[exchange_id] += weight * exchange_weight
+            ranked = [
+                (similarity, exchange_id) for exchange_id, similarity in scores.items()
+                if self.senders[exchange_id] != exclude_sender
+            ]
+        ranked.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+        return ranked
+
+    def similarities(self, genres, candidates):
+        """Cosine similarity of the normalized `genres` with each of `candidates`, {key: normalized genres}"""
+        with self.lock:
+            vector = self.vector(genres)
+            return {
+                key: sum(vector.get(feature, 0) * weight for feature, weight in self.vector(other).items())
+                for key, other in candidates.items()
+            }
+
+    def discard(self, exchange_ids):
+        with self.lock:
+            for exchange_id in exchange_ids:
+                vector = self.vectors.pop(exchange_id, None)
+                if vector is None:
+                    continue
+                del self.senders[exchange_id]
+                for feature in vector:
+                    del self.postings[feature][exchange_id]
+
+    def prune(self, exchange_ids):
+        """Discard those of the exchanges that are no longer pending, rather than locked by another matcher"""
+        if exchange_ids:
+            self.discard(
+                SongExchange.objects.filter(id__in=exchange_ids)
+                .exclude(status='pending', received_song__isnull=True, receiver__isnull=True)
+                .values_list('id', flat=True)
+            )
+
+
+pending_genre_index = PendingGenreIndex()
@@ -0,0 +1,364 @@
+"""
+Steps of the song upload flow, shared by SongViewSet.create and the async upload
+view.
+
+External calls (Spotify, Gemini, FCM) touch no database state. Once the track
+metadata is known, the ones that do not depend on each other (the new song's fun
+fact, the matched song's fun fact and the match pushes) run concurrently on a
+bounded thread pool while the request thread does the ORM work, and every wait
+is capped by one deadline shared by the whole upload (UPLOAD_DEADLINE_SECONDS).
+A call that misses the deadline is dropped: the song is returned without that
+fun fact, as when Gemini fails.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.timezone import localdate
+from rest_framework import status
+
+from core.fcm_notification import send_push_notification
+from core.notification import PUSH_BODY, PUSH_TITLE, record_notification
+from music.api.serializers import SongCreateSerializer, SongSerializer
+from music.gen_ai import GenFunFact, generate_fun_fact
+from music.match_helpers import find_and_create_automatic_match, find_and_create_random_match
+from music.models import MusicPlatform, Song
+from music.spotify_utils import get_song_category_from_url
+from music.tracks import share_fun_fact, store_tracks, stored_track
+from soundly.metrics import INGEST_STAGE_SECONDS, MATCH_OUTCOMES
+from users.choices import UserTypeChoice
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Thread pool for the external calls of uploads, created on first use in each worker process"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.UPLOAD_EXECUTOR_WORKERS, thread_name_prefix='ingest'
+            )
+    return _executor
+
+
+class UploadDeadline:
+    """Time budget shared by all the external calls of one upload"""
+
+    def __init__(self, seconds=None):
+        if seconds is None:
+            seconds = settings.UPLOAD_DEADLINE_SECONDS
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+
+def result_by_deadline(future, deadline, default, description):
+    """Result of a future submitted to get_executor(), or `default` once the deadline has passed"""
+    try:
+        return future.result(timeout=deadline.remaining())
+    except FutureTimeoutError:
+        future.cancel()
+        logger.warning("%s missed the upload deadline", description)
+        return default
+
+
+class IngestError(Exception):
+    """Ends an upload early with the given response body and status"""
+
+    def __init__(self, data, status_code):
+        super().__init__(data.get('error'))
+        self.data = data
+        self.status_code = status_code
+
+
+def fetch_track_info(spotify_url):
+    """Track metadata for the upload, or IngestError with the response to return"""
+    try:
+        info = get_song_category_from_url(spotify_url)
+        if not info:
+            logger.warning("Failed to fetch song info - URL: %s", spotify_url)
+            raise IngestError({
+                'error': 'Invalid Spotify URL or unable to fetch song information. Please check the URL and try again.'
+            }, status.HTTP_400_BAD_REQUEST)
+    except ValueError as e:
+        # Spotify credentials missing
+        logger.error("Spotify credentials error: %s", e)
+        raise IngestError({
+            'error': 'Spotify API is not configured. Please contact support.'
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+    except IngestError:
+        raise
+    except Exception as e:
+        logger.error("Error fetching song info from Spotify URL: %s", e, exc_info=True)
+        error_msg = str(e)
+        if '401' in error_msg or 'Unauthorized' in error_msg:
+            raise IngestError({
+                'error': 'Spotify API authentication failed. Please check API credentials.'
+            }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        raise IngestError({
+            'error': f'Failed to fetch song information: {error_msg}'
+        }, status.HTTP_400_BAD_REQUEST)
+    return info
+
+
+def store_track(info):
+    """Track for freshly fetched metadata; a concurrent upload of the same track may have stored it first"""
+    return store_tracks([info])[info['track_id']]
+
+
+def fetch_track(spotify_url):
+    """The stored Track of the URL, else one fetched from Spotify and stored, or IngestError"""
+    return stored_track(spotify_url) or store_track(fetch_track_info(spotify_url))
+
+
+def fetch_fun_fact(title, artist, url):
+    """Fun fact text for a song; failures are logged and give an empty string"""
+    try:
+        song = GenFunFact(title=title, artist=artist, url=url)
+        logger.info("Generating fun fact for song: %s by %s", song.title, song.artist)
+        fun_fact = generate_fun_fact(song)
+        fun_fact_text = fun_fact.get('fact', '') if isinstance(fun_fact, dict) else str(fun_fact)
+        if fun_fact_text:
+            logger.info("Successfully generated fun fact for '%s': %s...", song.title, fun_fact_text[:50])
+        else:
+            logger.warning("Fun fact generation returned empty result for '%s'", song.title)
+        return fun_fact_text
+    except ValueError as e:
+        # API key not configured
+        logger.error("GOOGLE_API_KEY not configured: %s", e)
+    except Exception as e:
+        logger.error("Failed to generate fun fact for song '%s': %s", title, e, exc_info=True)
+        # Continue without fun fact - it's not critical
+    return ""
+
+
+def reserve_uploads(user, requested):
+    """
+    Number of the `requested` uploads the user may still make today. Must run in
+    a transaction: the user's row stays locked until it ends, so the songs stored
+    in the same transaction are counted by the next upload or import.
+    """
+    locked_user = User.objects.select_for_update().only('type').get(pk=user.pk)
+    if locked_user.type != UserTypeChoice.BASIC:
+        return requested
+    uploaded_today = Song.objects.filter(uploader=user, created_at__date=localdate()).count()
+    return min(requested, Song.remaining_uploads_for(uploaded_today))
+
+
+def save_song(user, spotify_url, info, fun_fact_text, track=None):
+    """Validate and store the uploaded song"""
+    spotify_platform, _ = MusicPlatform.objects.get_or_create(
+        name='Spotify',
+        defaults={'domain': 'spotify.com'}
+    )
+
+    # Safely extract info with defaults
+    song_data = {
+        'title': info.get('title', 'Unknown Title'),
+        'artist': info.get('artists', 'Unknown Artist'),
+        'url': spotify_url,
+        'track': track.id if track else None,
+        'album': info.get('album', ''),
+        'cover_image_url': info.get('cover_image_url', ''),
+        'platform': spotify_platform.id,
+        'duration_seconds': info.get('duration_seconds'),
+        'release_date': info.get('release_date', ''),
+        'genre': info.get('genres', []) if info.get('genres') and len(info.get('genres', [])) > 0 else ["unknown"],
+        'uploader': user.id,
+        'fun_fact': fun_fact_text
+    }
+
+    song_serializer = SongCreateSerializer(data=song_data)
+    if not song_serializer.is_valid():
+        logger.warning("Song serializer validation failed: %s", song_serializer.errors)
+        raise IngestError({
+            'error': 'Invalid song data.',
+            'details': song_serializer.errors
+        }, status.HTTP_400_BAD_REQUEST)
+
+    try:
+        with transaction.atomic():
+            # CanUploadSong only turns away users already at the limit; the
+            # locked count makes concurrent uploads and imports wait their turn
+            if not reserve_uploads(user, 1):
+                raise IngestError({
+                    'error': 'Upload limit reached. You have 0 uploads remaining.'
+                }, status.HTTP_403_FORBIDDEN)
+            return song_serializer.save()
+    except IngestError:
+        raise
+    except Exception as e:
+        logger.error("Error saving song: %s", e, exc_info=True)
+        raise IngestError({
+            'error': 'Failed to save song. Please try again.'
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def match_song(user, song, genre_match):
+    """
+    Match the new song against the pool.
+    Returns (matched_song, matched_user, match_type); all None when there is no match.
+    """
+    matched_song = None
+    matched_user = None
+    match_type = None
+
+    try:
+        if genre_match == 'true':
+            matched_song, matched_user = find_and_create_automatic_match(user, song)
+            match_type = 'automatic'
+
+        elif genre_match == 'false':
+            matched_song, matched_user = find_and_create_random_match(user, song)
+            match_type = 'random'
+        if match_type:
+            MATCH_OUTCOMES.labels(
+                match_type=match_type, outcome='matched' if matched_song else 'pooled'
+            ).inc()
+    except Exception as e:
+        logger.error("Error during song matching: %s", e, exc_info=True)
+        MATCH_OUTCOMES.labels(
+            match_type='automatic' if genre_match == 'true' else 'random', outcome='error'
+        ).inc()
+        # Continue without match - song is still saved
+        return None, None, None
+
+    return matched_song, matched_user, match_type
+
+
+def needs_fun_fact(song):
+    """
+    Whether a fun fact has to be generated for the song. A song without one
+    takes its track's when another upload of the track already got one.
+    """
+    if song.fun_fact and song.fun_fact.strip():
+        return False
+    if song.track_id and song.track.fun_fact:
+        song.fun_fact = song.track.fun_fact
+        song.save(update_fields=['fun_fact'])
+        return False
+    return True
+
+
+def save_fun_fact(song, fun_fact_text):
+    if fun_fact_text and fun_fact_text.strip():
+        song.fun_fact = fun_fact_text.strip()
+        song.save(update_fields=['fun_fact'])
+        share_fun_fact(song, song.fun_fact)
+        logger.info("Successfully saved fun fact for song '%s'", song.title)
+    else:
+        logger.warning("No fun fact saved for song '%s'", song.title)
+
+
+def record_match_notifications(user, matched_user, matched_song):
+    """
+    Store the match notification for both sides of a genre match.
+    Returns the device tokens to push to; the pushes themselves are left to the caller.
+    """
+    device_tokens = []
+    with INGEST_STAGE_SECONDS.labels(stage='notifications').time():
+        for recipient in (user, matched_user):
+            try:
+                device_token = record_notification(
+                    None,
+                    recipient,
+                    verb='song_matched',
+                    action_object=matched_song,
+                    description='Your song was matched with another user\'s song.',
+                    target_url=matched_song.url,
+                )
+            except Exception as e:
+                logger.warning("Failed to send match notification to %s: %s", recipient.email, e)
+                continue
+            if device_token:
+                device_tokens.append(device_token)
+    return device_tokens
+
+
+def push_match_notification(device_token):
+    with INGEST_STAGE_SECONDS.labels(stage='notifications').time():
+        return send_push_notification(device_token, PUSH_TITLE, PUSH_BODY)
+
+
+def build_upload_response(request, song, info, genre_match, matched_song=None, matched_user=None):
+    """Response body for a stored upload, with the match details when there is one"""
+    try:
+        song_serialized = SongSerializer(song, context={'request': request}).data
+    except Exception as e:
+        logger.error("Error serializing song: %s", e, exc_info=True)
+        # Fallback to basic song data
+        song_serialized = {
+            'uid': str(song.uid),
+            'title': song.title,
+            'artist': song.artist,
+            'url': song.url,
+        }
+
+    response_data = {
+        'message': 'Song imported successfully',
+        'song': song_serialized
+    }
+
+    if not info.get('genres') or len(info.get('genres', [])) == 0 and genre_match == 'true':
+        response_data['message'] += '.This song does not have a genre set by the artist. It will be exchanged in the Random Match pool'
+
+    if not (matched_song and matched_user):
+        if genre_match:
+            response_data['message'] += '. No songs available for genre match, added to matching pool.'
+        else:
+            response_data['message'] += '. No songs available for random match, added to matching pool.'
+        return response_data
+
+    # Get profile image URL
+    if matched_user.profile_image and hasattr(matched_user.profile_image, 'url'):
+        profile_image_url = request.build_absolute_uri(matched_user.profile_image.url)
+    else:
+        profile_image_url = None
+
+    # Serialize matched song (refresh from DB to get updated fun_fact)
+    matched_song.refresh_from_db()
+    try:
+        matched_song_data = SongSerializer(matched_song, context={'request': request}).data
+    except Exception as e:
+        logger.warning("Error serializing matched song: %s", e)
+        matched_song_data = {
+            'uid': str(matched_song.uid),
+            'title': matched_song.title,
+            'artist': matched_song.artist,
+            'url': matched_song.url,
+            'fun_fact': getattr(matched_song, 'fun_fact', '') or '',
+        }
+
+    response_data['matched_with'] = {
+        'song': matched_song_data,
+        'user': {
+            'id': str(matched_user.id),
+            'uid': str(matched_user.uid),
+            'email': matched_user.email,
+            'name': matched_user.first_name,
+            'profile_image_url': profile_image_url,
+            'profession': matched_user.profession or "",
+            'country': matched_user.country or "",
+            'city': matched_user.city or "",
+        }
+    }
+    return response_data
+
+
+def unexpected_error_response(e):
+    logger.error("Unexpected error in song creation: %s", e, exc_info=True)
+    return {
+        'error': 'An unexpected error occurred while uploading the song. Please try again.',
+        'details': str(e) if settings.DEBUG else None
+    }
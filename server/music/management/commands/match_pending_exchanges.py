@@ -0,0 +1,76 @@
+"""
+Django management command that pairs compatible pending song exchanges in one
+batch instead of waiting for their senders' next upload (see music/batch_matching.py).
+Meant to run periodically, e.g. from cron.
+Usage: python manage.py match_pending_exchanges [--min-similarity 20] [--dry-run]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from music.batch_matching import commit_pairs, greedy_pairs, load_pending_pool, notify_pairs
+from soundly.metrics import MATCH_OUTCOMES
+
+
+class Command(BaseCommand):
+    help = 'Match compatible pending song exchanges with each other in one batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-similarity',
+            type=float,
+            default=0,
+            help='Lowest genre similarity (percent) a pair may have (default: any shared genre)',
+        )
+        parser.add_argument(
+            '--max-candidates',
+            type=int,
+            default=20,
+            help='Most similar partners kept per exchange while pairing (default: 20)',
+        )
+        parser.add_argument(
+            '--limit', type=int, help='Only consider this many of the oldest pending exchanges'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500, help='Pairs written per statement (default: 500)'
+        )
+        parser.add_argument(
+            '--no-notify',
+            dest='notify',
+            action='store_false',
+            help='Do not send match notifications to the paired users',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many pairs would be matched without writing them',
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        pool = load_pending_pool(options['limit'])
+        loaded = time.perf_counter()
+        pairs, candidates = greedy_pairs(pool, options['min_similarity'], options['max_candidates'])
+        scored = time.perf_counter()
+
+        self.stdout.write(
+            f'Loaded {len(pool)} pending exchanges in {loaded - start:.2f}s; '
+            f'{candidates} candidate pairs, {len(pairs)} chosen in {scored - loaded:.2f}s'
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'DRY RUN: Would match {len(pairs)} pairs.'))
+            return
+
+        matched = commit_pairs(pairs, options['batch_size'])
+        elapsed = time.perf_counter() - start
+        MATCH_OUTCOMES.labels(match_type='batch', outcome='matched').inc(len(matched))
+        if len(matched) < len(pairs):
+            self.stdout.write(f'  {len(pairs) - len(matched)} pairs skipped: claimed by an upload meanwhile')
+
+        if options['notify']:
+            notify_pairs(matched)
+
+        rate = len(matched) / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(f'Matched {len(matched)} pairs in {elapsed:.2f}s ({rate:.0f} pairs/s)')
+        )
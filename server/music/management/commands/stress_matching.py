@@ -0,0 +1,160 @@
+"""
+Django management command that runs concurrent automatic matchers against a
+shared pending pool and checks that every exchange is paired at most once.
+
+For each worker count, a fresh pool of pending exchanges and a set of uploads
+from other users are created, and the uploads are matched by that many worker
+processes at once with find_and_create_automatic_match. The run then verifies
+that no pending exchange was handed to two uploads and that every matched
+exchange has exactly one reciprocal, and reports matches per second.
+
+Needs PostgreSQL: SQLite has no row locks and serializes all writers.
+The data it creates is deleted afterwards.
+Usage: python manage.py stress_matching --workers 1,2,4,8 --pool 2000 --uploads 1000
+"""
+import multiprocessing
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Q
+
+from music.match_helpers import find_and_create_automatic_match
+from music.models import MusicPlatform, Song, SongExchange
+
+User = get_user_model()
+
+GENRES = ['pop', 'rock', 'indie', 'edm', 'jazz', 'hip hop']
+
+
+def match_uploads(uploads):
+    """Worker: match (user id, song id) uploads; returns [(song id, matched song id or None)]"""
+    users = User.objects.in_bulk({user_id for user_id, _ in uploads})
+    songs = Song.objects.in_bulk([song_id for _, song_id in uploads])
+    results = []
+    for user_id, song_id in uploads:
+        matched_song, _ = find_and_create_automatic_match(users[user_id], songs[song_id])
+        results.append((song_id, matched_song.id if matched_song else None))
+    return results
+
+
+class Command(BaseCommand):
+    help = 'Stress test concurrent automatic matching and verify one-to-one pairing'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', default='1,2,4,8', help='Comma-separated worker process counts (default: 1,2,4,8)'
+        )
+        parser.add_argument('--pool', type=int, default=1000, help='Pending exchanges in the pool (default: 1000)')
+        parser.add_argument('--uploads', type=int, default=500, help='Uploads matched per run (default: 500)')
+        parser.add_argument('--users', type=int, default=50, help='Users on each side (default: 50)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+        parser.add_argument(
+            '--prefix', default='stress', help='Email prefix of the users it creates (default: stress)'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('stress_matching needs PostgreSQL (row locks and concurrent writers)')
+        try:
+            worker_counts = [int(count) for count in options['workers'].split(',')]
+        except ValueError:
+            raise CommandError('--workers must be comma-separated integers')
+
+        self._clear(options['prefix'])
+        failures = []
+        baseline_rate = None
+        try:
+            for workers in worker_counts:
+                uploads = self._prepare(options)
+                elapsed, results = self._run(workers, uploads)
+                problems = self._verify(results)
+                matched = sum(1 for _, matched_song_id in results if matched_song_id)
+
+                rate = matched / elapsed if elapsed else 0
+                baseline_rate = baseline_rate or rate
+                line = (
+                    f'{workers:>3} workers: {matched} of {len(results)} uploads matched in {elapsed:.2f}s '
+                    f'({rate:.0f} matches/s, x{rate / baseline_rate if baseline_rate else 0:.2f})'
+                )
+                if problems:
+                    failures.append(f'{workers} workers: ' + '; '.join(problems))
+                    self.stdout.write(self.style.ERROR(f'{line}  {"; ".join(problems)}'))
+                else:
+                    self.stdout.write(line)
+                self._clear(options['prefix'])
+        finally:
+            self._clear(options['prefix'])
+
+        if failures:
+            raise CommandError('Pairing violations:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS('Every exchange was paired at most once.'))
+
+    def _clear(self, prefix):
+        User.objects.filter(email__startswith=f'{prefix}-').delete()
+
+    def _prepare(self, options):
+        """Create the pending pool and the songs to upload; returns [(user id, song id)]"""
+        rng = random.Random(options['seed'])
+        prefix = options['prefix']
+        platform, _ = MusicPlatform.objects.get_or_create(name='Spotify', defaults={'domain': 'spotify.com'})
+        pool_users = User.objects.bulk_create([
+            User(email=f'{prefix}-pool-{i}@example.com', first_name=f'Pool {i}') for i in range(options['users'])
+        ])
+        upload_users = User.objects.bulk_create([
+            User(email=f'{prefix}-upload-{i}@example.com', first_name=f'Upload {i}') for i in range(options['users'])
+        ])
+
+        def songs_for(users, count, label):
+            return Song.objects.bulk_create([
+                Song(
+                    uploader=rng.choice(users),
+                    platform=platform,
+                    title=f'{label} {i}',
+                    artist=f'Artist {i % 97}',
+                    url=f'https://open.spotify.com/track/{prefix}{label}{i:07d}',
+                    genre=rng.sample(GENRES, 2),
+                )
+                for i in range(count)
+            ], batch_size=1000)
+
+        pool_songs = songs_for(pool_users, options['pool'], 'pool')
+        SongExchange.objects.bulk_create([
+            SongExchange(sender_id=song.uploader_id, sent_song=song, status='pending') for song in pool_songs
+        ], batch_size=1000)
+        return [(song.uploader_id, song.id) for song in songs_for(upload_users, options['uploads'], 'upload')]
+
+    def _run(self, workers, uploads):
+        # Forked workers must open their own connections
+        connections.close_all()
+        chunks = [uploads[i::workers] for i in range(workers)]
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=connections.close_all) as pool:
+            start = time.perf_counter()
+            results = [result for chunk in pool.map(match_uploads, chunks) for result in chunk]
+            elapsed = time.perf_counter() - start
+        return elapsed, results
+
+    def _verify(self, results):
+        problems = []
+        claimed = Counter(matched_song_id for _, matched_song_id in results if matched_song_id)
+        taken_twice = [song_id for song_id, count in claimed.items() if count > 1]
+        if taken_twice:
+            problems.append(f'{len(taken_twice)} pool songs handed to more than one upload')
+
+        song_ids = [song_id for song_id, _ in results]
+        exchanges = SongExchange.objects.filter(
+            Q(sent_song_id__in=song_ids) | Q(received_song_id__in=song_ids), status='matched'
+        ).values_list('sender_id', 'receiver_id', 'sent_song_id', 'received_song_id')
+        pairs = Counter(exchanges)
+        unreciprocated = sum(
+            1 for (sender, receiver, sent, received), count in pairs.items()
+            if count != 1 or pairs[(receiver, sender, received, sent)] != 1
+        )
+        if unreciprocated:
+            problems.append(f'{unreciprocated} matched exchanges without exactly one reciprocal')
+        return problems
@@ -1,33 +1,104 @@
+import heapq
+import math
+from collections import Counter, defaultdict
+from functools import partial
+
 from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
-from music.models import Song, SongExchange
+from core.activities import create_song_exchange_activities
+from music.genre_vectors import normalize_genres, pending_genre_index
+from music.models import Song, SongExchange, SongGenre
+from music.profile_cache import invalidate_profiles
 import random
 
+from soundly.metrics import INGEST_STAGE_SECONDS
+
+
+# Candidates locked per claim attempt; rows left unused are released when the match commits
+CLAIM_WINDOW = 10
+
 
 def get_song_with_platform(uid):
     return get_object_or_404(Song.objects.select_related('platform'), uid=uid)
 
 
-def normalize_genres(genres):
-    if not genres:
-        return []
-    return [g.lower().strip() for g in genres if g.strip()]
-
+def claim_pending_exchanges(exchange_ids):
+    """
+    Ids of the given exchanges that are still pending, locked until the
+    surrounding transaction ends. Rows another matcher has locked are skipped
+    instead of waited for, so concurrent matchers never block on, or both take,
+    the same exchange.
+    """
+    return set(
+        SongExchange.objects.select_for_update(skip_locked=True)
+        .filter(id__in=exchange_ids, status='pending', received_song__isnull=True, receiver__isnull=True)
+        .values_list('id', flat=True)
+    )
 
-def get_potential_matches(original_song, genre_list):
-    genre_query = Q()
-    for genre in genre_list:
-        genre_query |= Q(genre__icontains=genre)
 
-    qs = Song.objects.filter(genre_query).exclude(uid=original_song.uid)
+def song_genre_rows(songs):
+    """Unsaved SongGenre rows for the normalized genres of `songs`, for bulk_create"""
+    rows = []
+    for song in songs:
+        genres = list(dict.fromkeys(normalize_genres(song.genre)))
+        rows += [
+            SongGenre(song=song, genre=genre[:SongGenre.GENRE_MAX_LENGTH], genre_count=len(genres))
+            for genre in genres
+        ]
+    return rows
 
-    if hasattr(original_song, 'uploader') and original_song.uploader:
-        qs = qs.exclude(uploader=original_song.uploader)
 
-    return qs.select_related('platform').distinct()
+def index_song_genres(songs):
+    """Replace the SongGenre rows of `songs` with their current genres"""
+    SongGenre.objects.filter(song__in=songs).delete()
+    SongGenre.objects.bulk_create(song_genre_rows(songs))
 
 
+def get_potential_matches(original_song, genre_list, candidates):
+    """
+    (similarity, song id, overlap) of the songs most similar to `original_song`,
+    best first and newest first on equal similarity.
+
+    Candidates are the latest `candidates` songs sharing each of its genres,
+    read from the (genre, song, genre_count) index of SongGenre so the cost
+    does not grow with how common a genre is. The MATCH_PREVIEW_SCORED of them
+    closest on shared genres alone have their genres loaded from SongGenre,
+    no song row is touched, and are scored by the IDF cosine of
+    pending_genre_index, the same similarity uploads are matched by. Its
+    weights are used as they are: a preview neither refreshes nor builds it.
+    """
+    overlaps = Counter()
+    genre_counts = {}
+    for genre in genre_list:
+        latest = SongGenre.objects.filter(genre=genre).order_by('-song_id').values_list('song_id', 'genre_count')
+        for song_id, genre_count in latest[:candidates]:
+            overlaps[song_id] += 1
+            genre_counts[song_id] = genre_count
+    overlaps.pop(original_song.id, None)
+
+    # A song among the latest `candidates` overall is among the latest of each
+    # of its genres too, so its overlap is counted in full. The cosine of the
+    # genres alone, unweighted, is then known from the index.
+    shortlist = heapq.nlargest(
+        settings.MATCH_PREVIEW_SCORED,
+        heapq.nlargest(candidates, overlaps),
+        key=lambda song_id: (overlaps[song_id] / math.sqrt(genre_counts[song_id]), song_id)
+    )
+    candidate_genres = defaultdict(list)
+    for song_id, genre in SongGenre.objects.filter(song_id__in=shortlist).values_list('song_id', 'genre'):
+        candidate_genres[song_id].append(genre)
+    similarities = pending_genre_index.similarities(genre_list, candidate_genres)
+    potential_matches = [
+        (similarity * 100, song_id, overlaps[song_id]) for song_id, similarity in similarities.items()
+    ]
+    potential_matches.sort(reverse=True)
+    return potential_matches
+
+
+@INGEST_STAGE_SECONDS.labels(stage='matching').time()
 def find_and_create_automatic_match(current_user, new_song):
     """
     Find an automatic match for a new song and create bidirectional exchanges
@@ -38,63 +109,58 @@ def find_and_create_automatic_match(current_user, new_song):
     if not genre_list:
         return None, None
 
-    pending_exchanges = SongExchange.objects.filter(
-        status='pending',
-        received_song__isnull=True,
-        receiver__isnull=True
-    ).exclude(sender=current_user).select_related('sent_song', 'sender')
-
-    compatible_exchanges = []
-    for exchange in pending_exchanges:
-        exchange_genres = normalize_genres(exchange.sent_song.genre)
-        overlapping_genres = set(genre_list) & set(exchange_genres)
-
-        if overlapping_genres:
-            match_score = len(overlapping_genres)
-            total_unique = len(set(genre_list) | set(exchange_genres))
-            similarity = (match_score / total_unique) * 100 if total_unique else 0
-
-            compatible_exchanges.append({
-                'exchange': exchange,
-                'similarity': similarity,
-                'overlapping_genres': list(overlapping_genres)
-            })
-
-    if not compatible_exchanges:
-        SongExchange.objects.create(
+    pending_genre_index.refresh()
+    ranked = pending_genre_index.rank(genre_list, exclude_sender=current_user.pk)
+
+    with transaction.atomic():
+        # The index may be behind: claim the most similar candidate nobody else holds or took meanwhile
+        original_exchange = None
+        for start in range(0, len(ranked), CLAIM_WINDOW):
+            window = [exchange_id for _, exchange_id in ranked[start:start + CLAIM_WINDOW]]
+            claimed = claim_pending_exchanges(window)
+            pending_genre_index.prune(set(window) - claimed)
+            exchange_id = next((exchange_id for exchange_id in window if exchange_id in claimed), None)
+            if exchange_id:
+                original_exchange = SongExchange.objects.select_related('sent_song', 'sender').get(id=exchange_id)
+                # Only once the match is committed: on rollback the exchange is still pending
+                transaction.on_commit(partial(pending_genre_index.discard, [exchange_id]))
+                break
+
+        if original_exchange is None:
+            SongExchange.objects.create(
+                sender=current_user,
+                sent_song=new_song,
+                status='pending'
+            )
+            return None, None
+
+        matched_song = original_exchange.sent_song
+        matched_user = original_exchange.sender
+
+        original_exchange.receiver = current_user
+        original_exchange.received_song = new_song
+        original_exchange.status = 'matched'
+        original_exchange.match_type = 'genre'
+        original_exchange.matched_at = timezone.now()
+        original_exchange.save(
+            update_fields=['receiver', 'received_song', 'status', 'match_type', 'matched_at', 'updated_at']
+        )
+
+        reciprocal_exchange = SongExchange.objects.create(
             sender=current_user,
+            receiver=matched_user,
             sent_song=new_song,
-            status='pending'
+            received_song=matched_song,
+            status='matched',
+            match_type='genre',
+            matched_at=timezone.now()
         )
-        return None, None
-
-    compatible_exchanges.sort(key=lambda x: x['similarity'], reverse=True)
-    best_match = compatible_exchanges[0]
-
-    original_exchange = best_match['exchange']
-    matched_song = original_exchange.sent_song
-    matched_user = original_exchange.sender
-
-    original_exchange.receiver = current_user
-    original_exchange.received_song = new_song
-    original_exchange.status = 'matched'
-    original_exchange.match_type = 'genre'
-    original_exchange.matched_at = timezone.now()
-    original_exchange.save()
-
-    reciprocal_exchange = SongExchange.objects.create(
-        sender=current_user,
-        receiver=matched_user,
-        sent_song=new_song,
-        received_song=matched_song,
-        status='matched',
-        match_type='genre',
-        matched_at=timezone.now()
-    )
+        create_song_exchange_activities([original_exchange, reciprocal_exchange])
 
     return matched_song, matched_user
 
 
+@INGEST_STAGE_SECONDS.labels(stage='matching').time()
 def find_and_create_random_match(current_user, new_song):
     """
     Find a random song match and create exchanges.
@@ -141,71 +207,233 @@ def find_and_create_random_match(current_user, new_song):
     matched_song = random.choice(songs_list)
     matched_user = matched_song.uploader
 
-    # Create the original exchange
-    SongExchange.objects.create(
-        sender=current_user,
-        receiver=matched_user,
-        sent_song=new_song,
-        received_song=matched_song,
-        status='matched',
-        match_type='random',
-        matched_at=timezone.now()
-    )
-
-    # Create the reciprocal exchange
-    SongExchange.objects.create(
-        sender=matched_user,
-        receiver=current_user,
-        sent_song=matched_song,
-        received_song=new_song,
-        status='matched',
-        match_type='random',
-        matched_at=timezone.now()
-    )
+    now = timezone.now()
+    with transaction.atomic():
+        # Create the original and the reciprocal exchange
+        exchanges = SongExchange.objects.bulk_create([
+            SongExchange(
+                sender=current_user,
+                receiver=matched_user,
+                sent_song=new_song,
+                received_song=matched_song,
+                status='matched',
+                match_type='random',
+                matched_at=now
+            ),
+            SongExchange(
+                sender=matched_user,
+                receiver=current_user,
+                sent_song=matched_song,
+                received_song=new_song,
+                status='matched',
+                match_type='random',
+                matched_at=now
+            ),
+        ])
+        create_song_exchange_activities(exchanges)
+        transaction.on_commit(lambda: invalidate_profiles(current_user.pk, matched_user.pk))
 
     return matched_song, matched_user
 
 
-def process_matches(user, original_song, genre_list, potential_matches):
-    results = []
-    seen = set()
+@INGEST_STAGE_SECONDS.labels(stage='matching').time()
+def create_automatic_matches_in_bulk(current_user, new_songs):
+    """
+    find_and_create_automatic_match for many songs of one user in a single pass:
+    each song is ranked against the pending genre index, takes the most similar exchange
+    not already taken by an earlier song of the batch, the picks are claimed
+    together, and all exchanges are written with one bulk_update and one bulk_create.
+    The feed activities of the matched exchanges are created with them.
+    Returns one (song, matched_song, matched_user) per new song, with None for
+    pooled songs.
+    """
+    genres_by_song = [normalize_genres(new_song.genre) for new_song in new_songs]
+    pending_genre_index.refresh()
+    ranked_by_song = [
+        pending_genre_index.rank(genres, exclude_sender=current_user.pk) if genres else []
+        for genres in genres_by_song
+    ]
+
+    positions = [0] * len(new_songs)
+    taken = set()
+    chosen = {}
+    searching = list(range(len(new_songs)))
+    with transaction.atomic():
+        while searching:
+            proposals = []
+            for index in searching:
+                ranked = ranked_by_song[index]
+                while positions[index] < len(ranked) and ranked[positions[index]][1] in taken:
+                    positions[index] += 1
+                if positions[index] == len(ranked):
+                    chosen[index] = None
+                    continue
+                exchange_id = ranked[positions[index]][1]
+                taken.add(exchange_id)
+                proposals.append((index, exchange_id))
+
+            # Songs whose pick was claimed by a concurrent matcher try their next best
+            claimed = claim_pending_exchanges([exchange_id for _, exchange_id in proposals])
+            pending_genre_index.prune({exchange_id for _, exchange_id in proposals} - claimed)
+            searching = []
+            for index, exchange_id in proposals:
+                if exchange_id in claimed:
+                    chosen[index] = exchange_id
+                else:
+                    searching.append(index)
+
+        exchanges = SongExchange.objects.select_related('sent_song', 'sender').in_bulk(
+            [exchange_id for exchange_id in chosen.values() if exchange_id]
+        )
+        transaction.on_commit(partial(pending_genre_index.discard, list(exchanges)))
+
+        now = timezone.now()
+        results, matched_exchanges, new_exchanges = [], [], []
+        for index, new_song in enumerate(new_songs):
+            original_exchange = exchanges.get(chosen[index])
+            if original_exchange is None:
+                if genres_by_song[index]:
+                    new_exchanges.append(SongExchange(sender=current_user, sent_song=new_song, status='pending'))
+                results.append((new_song, None, None))
+                continue
+
+            original_exchange.receiver = current_user
+            original_exchange.received_song = new_song
+            original_exchange.status = 'matched'
+            original_exchange.match_type = 'genre'
+            original_exchange.matched_at = now
+            original_exchange.updated_at = now
+            matched_exchanges.append(original_exchange)
+            new_exchanges.append(SongExchange(
+                sender=current_user,
+                receiver=original_exchange.sender,
+                sent_song=new_song,
+                received_song=original_exchange.sent_song,
+                status='matched',
+                match_type='genre',
+                matched_at=now
+            ))
+            results.append((new_song, original_exchange.sent_song, original_exchange.sender))
+
+        SongExchange.objects.bulk_update(
+            matched_exchanges, ['receiver', 'received_song', 'status', 'match_type', 'matched_at', 'updated_at']
+        )
+        SongExchange.objects.bulk_create(new_exchanges)
+        create_song_exchange_activities(
+            matched_exchanges + [exchange for exchange in new_exchanges if exchange.status == 'matched']
+        )
+    return results
 
-    for match in potential_matches:
-        match_genres = normalize_genres(match.genre)
-        overlapping = list(set(genre_list) & set(match_genres))
-        if not overlapping:
-            continue
 
-        key = (match.title, match.artist)
-        if key in seen:
+@INGEST_STAGE_SECONDS.labels(stage='matching').time()
+def create_random_matches_in_bulk(current_user, new_songs):
+    """
+    find_and_create_random_match for many songs of one user in a single pass.
+    A song of another user is handed out at most once per batch, as it would be
+    across consecutive single uploads.
+    Creates the feed activities and returns the same results as
+    create_automatic_matches_in_bulk.
+    """
+    excluded_song_ids = {song.id for song in new_songs}
+    for sent_song_id, received_song_id in SongExchange.objects.filter(
+        Q(sender=current_user) | Q(receiver=current_user),
+        status__in=['matched', 'completed']
+    ).values_list('sent_song_id', 'received_song_id'):
+        excluded_song_ids.update((sent_song_id, received_song_id))
+
+    available_songs = list(
+        Song.objects.exclude(uploader=current_user)
+        .exclude(uploader__isnull=True)
+        .exclude(id__in=excluded_song_ids)
+        .select_related('uploader')
+    )
+    random.shuffle(available_songs)
+
+    now = timezone.now()
+    results, new_exchanges = [], []
+    for new_song in new_songs:
+        if not available_songs:
+            new_exchanges.append(SongExchange(sender=current_user, sent_song=new_song, status='pending'))
+            results.append((new_song, None, None))
             continue
-        seen.add(key)
-
-        match_score = len(overlapping)
-        total_unique = len(set(genre_list) | set(match_genres))
-        similarity = (match_score / total_unique) * 100 if total_unique else 0
-
-        exchange = SongExchange.objects.filter(
-            sender=user,
-            sent_song=original_song,
-            received_song=match
-        ).first()
-
-        if not exchange:
-            exchange = SongExchange.objects.create(
-                sender=user,
-                sent_song=original_song,
-                received_song=match,
-                status='pending'
-            )
 
-        results.append(serialize_match(match, overlapping, match_score, similarity, exchange))
+        matched_song = available_songs.pop()
+        matched_user = matched_song.uploader
+        new_exchanges += [
+            SongExchange(
+                sender=current_user,
+                receiver=matched_user,
+                sent_song=new_song,
+                received_song=matched_song,
+                status='matched',
+                match_type='random',
+                matched_at=now
+            ),
+            SongExchange(
+                sender=matched_user,
+                receiver=current_user,
+                sent_song=matched_song,
+                received_song=new_song,
+                status='matched',
+                match_type='random',
+                matched_at=now
+            ),
+        ]
+        results.append((new_song, matched_song, matched_user))
+
+    with transaction.atomic():
+        SongExchange.objects.bulk_create(new_exchanges)
+        create_song_exchange_activities([exchange for exchange in new_exchanges if exchange.status == 'matched'])
+    return results
+
+
+def top_genre_matches(original_song, limit=10, candidates=None):
+    """
+    The `limit` songs of other users most genre-similar to `original_song`, best
+    first, one per title and artist, as serialize_match dicts. Read-only: no
+    exchange is created or changed.
+
+    Only the latest MATCH_PREVIEW_CANDIDATES songs sharing a genre are
+    considered, and the MATCH_PREVIEW_SCORED closest of them scored.
+    """
+    genre_list = list(dict.fromkeys(normalize_genres(original_song.genre)))
+    if not genre_list:
+        return []
+    if candidates is None:
+        candidates = settings.MATCH_PREVIEW_CANDIDATES
+
+    return process_matches(original_song, genre_list, get_potential_matches(original_song, genre_list, candidates), limit)
+
 
-    results.sort(key=lambda x: (x['match_info']['match_score'], x['match_info']['similarity_percentage']), reverse=True)
+def process_matches(original_song, genre_list, potential_matches, limit):
+    """
+    Load the ranked potential matches best first, a few at a time, skipping the
+    original uploader's songs and repeats of a title and artist, until `limit`
+    are found
+    """
+    genres = set(genre_list)
+    chunk_size = max(2 * limit, 20)
+    results = []
+    seen = set()
+    for start in range(0, len(potential_matches), chunk_size):
+        chunk = potential_matches[start:start + chunk_size]
+        songs = Song.objects.select_related('platform', 'uploader').in_bulk([song_id for _, song_id, _ in chunk])
+        for similarity, song_id, overlap in chunk:
+            match = songs.get(song_id)
+            if match is None or (original_song.uploader_id and match.uploader_id == original_song.uploader_id):
+                continue
+            key = (match.title.lower(), match.artist.lower())
+            if key in seen:
+                continue
+            seen.add(key)
+            overlapping = sorted(genres & set(normalize_genres(match.genre)))
+            results.append(serialize_match(match, overlapping, overlap, similarity))
+            if len(results) == limit:
+                return results
     return results
 
 
-def serialize_match(match, overlapping_genres, score, similarity, exchange):
+def serialize_match(match, overlapping_genres, score, similarity):
     return {
         'uid': str(match.uid),
         'title': match.title,
@@ -225,7 +453,6 @@ def serialize_match(match, overlapping_genres, score, similarity, exchange):
             'match_score': score,
             'similarity_percentage': round(similarity, 2)
         },
-        'exchange_status': exchange.status,
         'uploader_info': {
             'id': str(match.uploader.id),
             'email': match.uploader.email
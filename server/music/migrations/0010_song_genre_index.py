@@ -0,0 +1,44 @@
+# Generated by Django 5.2.1 on 2026-10-19 09:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 5000
+
+
+def index_existing_songs(apps, schema_editor):
+    """Fill song_genres from the genre lists of existing songs"""
+    Song = apps.get_model('music', 'Song')
+    SongGenre = apps.get_model('music', 'SongGenre')
+    rows = []
+    for song_id, genres in Song.objects.values_list('id', 'genre').iterator(chunk_size=BATCH_SIZE):
+        normalized = list(dict.fromkeys(g.lower().strip() for g in genres or [] if g.strip()))
+        rows += [SongGenre(song_id=song_id, genre=genre[:100], genre_count=len(normalized)) for genre in normalized]
+        if len(rows) >= BATCH_SIZE:
+            SongGenre.objects.bulk_create(rows)
+            rows = []
+    SongGenre.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0009_add_match_type_to_songexchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SongGenre',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('genre', models.CharField(max_length=100)),
+                ('genre_count', models.PositiveSmallIntegerField()),
+                ('song', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='genre_entries', to='music.song')),
+            ],
+            options={
+                'db_table': 'song_genres',
+                'indexes': [models.Index(fields=['genre', '-song', 'genre_count'], name='song_genres_genre_0e2b4e_idx')],
+            },
+        ),
+        migrations.RunPython(index_existing_songs, migrations.RunPython.noop),
+    ]
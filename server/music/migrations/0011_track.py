@@ -0,0 +1,102 @@
+# Generated by Django 5.2.1 on 2026-10-19 09:51
+
+import re
+import django.db.models.deletion
+import uuid
+from collections import defaultdict
+from django.db import migrations, models
+
+SPOTIFY_TRACK_PATTERN = re.compile(r'track/([a-zA-Z0-9]+)')
+SPOTIFY_ID_SQL = "left(substring(songs.url from 'track/([a-zA-Z0-9]+)'), 64)"
+
+# One track per Spotify id, from its newest song with a fun fact, else its newest song
+POSTGRES_CREATE_TRACKS = f"""
+INSERT INTO tracks (uid, created_at, updated_at, spotify_id, title, artist, album, genre,
+                    duration_seconds, release_date, cover_image_url, fun_fact)
+SELECT DISTINCT ON (spotify_id) gen_random_uuid(), now(), now(), spotify_id, title, artist, album, genre,
+       duration_seconds, release_date, cover_image_url, fun_fact
+FROM (SELECT {SPOTIFY_ID_SQL} AS spotify_id, songs.* FROM songs) songs
+WHERE spotify_id IS NOT NULL
+ORDER BY spotify_id, fun_fact <> '' DESC, id DESC
+"""
+POSTGRES_LINK_SONGS = f"""
+UPDATE songs SET track_id = tracks.id
+FROM tracks
+WHERE tracks.spotify_id = {SPOTIFY_ID_SQL}
+"""
+
+
+def backfill_tracks(apps, schema_editor):
+    """Create a track for every Spotify track id in song URLs and link the songs to it"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_CREATE_TRACKS)
+        schema_editor.execute(POSTGRES_LINK_SONGS)
+        return
+
+    Song = apps.get_model('music', 'Song')
+    Track = apps.get_model('music', 'Track')
+    sources = {}
+    song_ids = defaultdict(list)
+    for song in Song.objects.order_by('id').iterator(chunk_size=2000):
+        match = SPOTIFY_TRACK_PATTERN.search(song.url or '')
+        if not match:
+            continue
+        spotify_id = match.group(1)[:64]
+        song_ids[spotify_id].append(song.id)
+        source = sources.get(spotify_id)
+        if source is None or song.fun_fact or not source.fun_fact:
+            sources[spotify_id] = song
+
+    Track.objects.bulk_create([
+        Track(
+            spotify_id=spotify_id,
+            title=song.title,
+            artist=song.artist,
+            album=song.album,
+            genre=song.genre,
+            duration_seconds=song.duration_seconds,
+            release_date=song.release_date,
+            cover_image_url=song.cover_image_url,
+            fun_fact=song.fun_fact,
+        )
+        for spotify_id, song in sources.items()
+    ], batch_size=2000)
+    for spotify_id, track_id in Track.objects.values_list('spotify_id', 'id'):
+        Song.objects.filter(id__in=song_ids[spotify_id]).update(track_id=track_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0010_song_genre_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Track',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uid', models.UUIDField(default=uuid.uuid4, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('spotify_id', models.CharField(max_length=64, unique=True)),
+                ('title', models.CharField(max_length=200)),
+                ('artist', models.CharField(max_length=200)),
+                ('album', models.CharField(blank=True, max_length=200)),
+                ('genre', models.JSONField(blank=True, default=list)),
+                ('duration_seconds', models.PositiveIntegerField(blank=True, null=True)),
+                ('release_date', models.CharField(blank=True, null=True)),
+                ('cover_image_url', models.URLField(blank=True)),
+                ('fun_fact', models.TextField(blank=True)),
+            ],
+            options={
+                'db_table': 'tracks',
+            },
+        ),
+        migrations.AddField(
+            model_name='song',
+            name='track',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='songs', to='music.track'),
+        ),
+        migrations.RunPython(backfill_tracks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.1 on 2026-10-19 10:00
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Title weighs most, then artist, then album. The 'simple' configuration only
+# lowercases, so names are matched as written rather than stemmed as English.
+SEARCH_VECTOR = """
+    setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(NEW.artist, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(NEW.album, '')), 'C')
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f"""
+        CREATE FUNCTION songs_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    schema_editor.execute("""
+        CREATE TRIGGER songs_search_vector_update
+        BEFORE INSERT OR UPDATE OF title, artist, album, search_vector ON songs
+        FOR EACH ROW EXECUTE FUNCTION songs_search_vector_update()
+    """)
+    # Setting the column fires the trigger for the existing rows
+    schema_editor.execute("UPDATE songs SET search_vector = NULL")
+    schema_editor.execute("CREATE INDEX songs_search_vector_gin ON songs USING gin (search_vector)")
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS songs_search_vector_gin")
+    schema_editor.execute("DROP TRIGGER IF EXISTS songs_search_vector_update ON songs")
+    schema_editor.execute("DROP FUNCTION IF EXISTS songs_search_vector_update()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0011_track'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='song',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
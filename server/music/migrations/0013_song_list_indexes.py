@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-19 10:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('music', '0012_song_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='song',
+            name='songs_artist_e25abe_idx',
+        ),
+        migrations.AddIndex(
+            model_name='song',
+            index=models.Index(fields=['artist', '-created_at'], name='songs_artist_010d9b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='song',
+            index=models.Index(fields=['uploader', '-created_at'], name='songs_uploade_2513cb_idx'),
+        ),
+    ]
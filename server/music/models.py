@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import URLValidator
 from django.contrib.auth import get_user_model
 from django.conf import settings
@@ -28,8 +29,31 @@ class MusicPlatform(UUIDBaseModel):
         return self.name
 
 
+class Track(UUIDBaseModel, TimeStampModel):
+    """
+    A Spotify track, shared by every song uploading it. Metadata and the fun
+    fact are fetched once per track and copied to the songs of it.
+    """
+    spotify_id = models.CharField(max_length=64, unique=True)
+    title = models.CharField(max_length=200)
+    artist = models.CharField(max_length=200)
+    album = models.CharField(max_length=200, blank=True)
+    genre = models.JSONField(default=list, blank=True)
+    duration_seconds = models.PositiveIntegerField(null=True, blank=True)
+    release_date = models.CharField(null=True, blank=True)
+    cover_image_url = models.URLField(blank=True)
+    fun_fact = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'tracks'
+
+    def __str__(self):
+        return f"{self.title} by {self.artist}"
+
+
 class Song(UUIDBaseModel, TimeStampModel):
     uploader = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    track = models.ForeignKey(Track, related_name='songs', on_delete=models.SET_NULL, null=True, blank=True)
     platform = models.ForeignKey(MusicPlatform, on_delete=models.CASCADE)
     genre = models.JSONField(default=list, blank=True)
     title = models.CharField(max_length=200)
@@ -40,6 +64,9 @@ class Song(UUIDBaseModel, TimeStampModel):
     duration_seconds = models.PositiveIntegerField(null=True, blank=True)
     release_date = models.CharField(null=True, blank=True)
     cover_image_url = models.URLField(blank=True)
+    # Title, artist and album for full-text search, kept up to date by a database
+    # trigger on PostgreSQL (see migration 0012); unused elsewhere
+    search_vector = SearchVectorField(null=True, editable=False)
 
 
     def __str__(self):
@@ -49,7 +76,9 @@ class Song(UUIDBaseModel, TimeStampModel):
         db_table = 'songs'
         indexes = [
             models.Index(fields=['genre']),
-            models.Index(fields=['artist']),
+            # The song list filtered by artist or uploader, newest first
+            models.Index(fields=['artist', '-created_at']),
+            models.Index(fields=['uploader', '-created_at']),
             models.Index(fields=['created_at']),
         ]
 
@@ -69,9 +98,49 @@ class Song(UUIDBaseModel, TimeStampModel):
                 uploader=self.uploader, created_at__date=today
             ).count()
 
-            return max(0, int(settings.SONG_UPLOAD_LIMIT) - uploaded_today)
+            return Song.remaining_uploads_for(uploaded_today)
         return float("inf")
 
+    @staticmethod
+    def remaining_uploads_for(uploaded_today):
+        """Remaining daily uploads of a BASIC user who already uploaded `uploaded_today` songs"""
+        return max(0, int(settings.SONG_UPLOAD_LIMIT) - uploaded_today)
+
+    @staticmethod
+    def uploaded_today_by(uploader_ids):
+        """Songs uploaded today per uploader id, in one query; uploaders with none are left out"""
+        if not uploader_ids:
+            return {}
+        return dict(
+            Song.objects.filter(uploader_id__in=uploader_ids, created_at__date=localdate())
+            .values('uploader_id')
+            .annotate(count=models.Count('id'))
+            .values_list('uploader_id', 'count')
+        )
+
+
+class SongGenre(models.Model):
+    """
+    One row per normalized genre of a song, kept in sync by index_song_genres,
+    so the latest songs of a genre are an index range scan instead of a search
+    through every song's genre list
+    """
+    GENRE_MAX_LENGTH = 100
+
+    song = models.ForeignKey(Song, related_name='genre_entries', on_delete=models.CASCADE)
+    genre = models.CharField(max_length=GENRE_MAX_LENGTH)
+    # Number of genres of the song, so candidates can be shortlisted from the index alone
+    genre_count = models.PositiveSmallIntegerField()
+
+    class Meta:
+        db_table = 'song_genres'
+        indexes = [
+            models.Index(fields=['genre', '-song', 'genre_count']),
+        ]
+
+    def __str__(self):
+        return f"{self.genre} - {self.song_id}"
+
 
 class SongExchange(UUIDBaseModel, TimeStampModel):
     """
@@ -0,0 +1,89 @@
+"""
+Read-through cache for the public profile aggregate.
+
+A profile screen shows the same data to every viewer, so the assembled payload is
+cached per profile owner and dropped by the signals in music.signals whenever an
+exchange, song or the owner's profile changes.
+
+The songs in a payload show their BASIC uploaders' remaining uploads for the
+day: a new upload drops the profiles that show the uploader's songs, and
+entries expire at midnight at the latest, when the daily counts start over.
+Profiles are only cached in a cache shared by all workers (soundly.caching).
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.timezone import localtime, make_aware
+
+from music.models import SongExchange
+from soundly.caching import shared_cache
+from users.choices import UserTypeChoice
+
+logger = logging.getLogger(__name__)
+
+PROFILE_CACHE_TIMEOUT = getattr(settings, 'PROFILE_CACHE_TIMEOUT', 300)
+
+
+def profile_cache_key(user_uid):
+    return f'user_profile:{user_uid}'
+
+
+def get_cached_profile(user_uid, base_url):
+    """
+    Cached payload for `user_uid`, or None on a miss.
+
+    Payloads contain absolute media URLs, so an entry built for another host is
+    treated as a miss.
+    """
+    if not shared_cache():
+        return None
+    entry = cache.get(profile_cache_key(user_uid))
+    if entry is None or entry.get('base_url') != base_url:
+        return None
+    return entry['data']
+
+
+def seconds_until_midnight():
+    now = localtime()
+    midnight = make_aware(datetime.combine(now.date() + timedelta(days=1), time.min))
+    return max(1, int((midnight - now).total_seconds()))
+
+
+def set_cached_profile(user_uid, base_url, data):
+    if not shared_cache():
+        return
+    cache.set(
+        profile_cache_key(user_uid),
+        {'base_url': base_url, 'data': data},
+        min(PROFILE_CACHE_TIMEOUT, seconds_until_midnight()),
+    )
+
+
+def invalidate_profiles(*user_ids):
+    """Drop the cached profiles of the given user primary keys"""
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+    uids = get_user_model().objects.filter(pk__in=user_ids).values_list('uid', flat=True)
+    keys = [profile_cache_key(uid) for uid in uids]
+    if keys:
+        cache.delete_many(keys)
+        logger.debug("Invalidated cached profiles: %s", keys)
+
+
+def invalidate_uploader_profiles(user):
+    """
+    Drop the profiles showing songs of `user` after they uploaded some: their own
+    and their exchange partners'. Only BASIC users' remaining uploads are shown.
+    """
+    if not user or user.type != UserTypeChoice.BASIC:
+        return
+    partner_ids = set()
+    exchanges = SongExchange.objects.filter(Q(sender=user) | Q(receiver=user))
+    for sender_id, receiver_id in exchanges.values_list('sender_id', 'receiver_id'):
+        partner_ids.update((sender_id, receiver_id))
+    invalidate_profiles(user.pk, *partner_ids)
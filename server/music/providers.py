@@ -0,0 +1,171 @@
+"""
+Pluggable backends for the external services used by the song upload path.
+
+SONG_METADATA_PROVIDER and FUN_FACT_PROVIDER hold the dotted path of the class
+to use. Production uses the Spotify and Gemini backends; the fakes below answer
+deterministically without network access and can inject latency and failures
+(FAKE_PROVIDER_LATENCY_MS, FAKE_PROVIDER_LATENCY_JITTER_MS and
+FAKE_PROVIDER_ERROR_RATE, read on every call) so the upload path can be load
+tested offline.
+"""
+import abc
+import hashlib
+import logging
+import random
+import re
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SPOTIFY_URL_PATTERN = re.compile(r'(track|album|playlist)/([a-zA-Z0-9]+)')
+TRACK_URL = 'https://open.spotify.com/track/{}'
+
+FAKE_GENRES = [
+    'pop', 'rock', 'hip hop', 'indie', 'edm', 'jazz', 'r&b', 'folk', 'metal', 'latin',
+    'k-pop', 'afrobeats', 'classical', 'lo-fi', 'country', 'reggae',
+]
+
+
+class ProviderError(Exception):
+    """Raised by a provider when the upstream service fails"""
+
+
+def parse_spotify_url(url):
+    """(kind, id) of a Spotify track, album or playlist URL, or None"""
+    match = SPOTIFY_URL_PATTERN.search(url or '')
+    return match.groups() if match else None
+
+
+class SongMetadataProvider(abc.ABC):
+    """Looks up track metadata for a song URL"""
+
+    @abc.abstractmethod
+    def get_track(self, song_url):
+        """
+        Return a dict with title, artists, album, duration_seconds, track_id,
+        genres, cover_image_url and release_date, or None if the URL is not a
+        track this provider knows about.
+        """
+
+    def get_tracks(self, track_ids):
+        """
+        Metadata for many tracks at once, as a dict of track id to the get_track
+        dict; ids the provider does not know are left out. The default makes
+        one get_track call per id, for backends without a batch API.
+        """
+        tracks = {}
+        for track_id in track_ids:
+            info = self.get_track(TRACK_URL.format(track_id))
+            if info:
+                tracks[track_id] = info
+        return tracks
+
+    @abc.abstractmethod
+    def get_collection_track_ids(self, kind, collection_id):
+        """Track ids of an 'album' or 'playlist', in order"""
+
+
+class FunFactProvider(abc.ABC):
+    """Generates a short fun fact about a song"""
+
+    @abc.abstractmethod
+    def generate(self, song):
+        """Return a dict with a 'fact' key for a music.gen_ai.GenFunFact"""
+
+
+@lru_cache(maxsize=None)
+def load_provider(path):
+    return import_string(path)()
+
+
+def get_metadata_provider():
+    return load_provider(settings.SONG_METADATA_PROVIDER)
+
+
+def get_fun_fact_provider():
+    return load_provider(settings.FUN_FACT_PROVIDER)
+
+
+def stable_hash(value):
+    return int(hashlib.sha256(value.encode()).hexdigest()[:12], 16)
+
+
+class FakeUpstream:
+    """Latency and failure injection shared by the fake providers"""
+
+    name = 'fake'
+
+    def __init__(self):
+        self.random = random.Random()
+
+    def simulate_call(self):
+        latency = getattr(settings, 'FAKE_PROVIDER_LATENCY_MS', 0)
+        jitter = getattr(settings, 'FAKE_PROVIDER_LATENCY_JITTER_MS', 0)
+        delay = max(0.0, latency + self.random.uniform(-jitter, jitter)) if latency or jitter else 0
+        if delay:
+            time.sleep(delay / 1000)
+        if self.random.random() < getattr(settings, 'FAKE_PROVIDER_ERROR_RATE', 0.0):
+            raise ProviderError(f'Injected {self.name} failure')
+
+
+class FakeMetadataProvider(FakeUpstream, SongMetadataProvider):
+    """Spotify stand-in deriving stable metadata from the track id"""
+
+    name = 'metadata'
+
+    # Page sizes of the Spotify endpoints the fake stands in for
+    TRACKS_PER_CALL = 50
+    ITEMS_PER_PAGE = 100
+
+    def get_track(self, song_url):
+        track_id = song_url.split('?')[0].rstrip('/').rsplit('/', 1)[-1]
+        if not track_id:
+            return None
+        self.simulate_call()
+        return self.track_info(track_id)
+
+    def get_tracks(self, track_ids):
+        tracks = {}
+        for start in range(0, len(track_ids), self.TRACKS_PER_CALL):
+            # tracks, then artists for the genres
+            self.simulate_call()
+            self.simulate_call()
+            for track_id in track_ids[start:start + self.TRACKS_PER_CALL]:
+                tracks[track_id] = self.track_info(track_id)
+        return tracks
+
+    def get_collection_track_ids(self, kind, collection_id):
+        count = 5 + stable_hash(collection_id) % 46
+        for _ in range(0, count, self.ITEMS_PER_PAGE):
+            self.simulate_call()
+        return [f'{collection_id[:12]}{kind[0]}{i:04d}' for i in range(count)]
+
+    def track_info(self, track_id):
+        seed = stable_hash(track_id)
+        genre_count = 1 + seed % 3
+        return {
+            'title': f'Fake Track {track_id[:12]}',
+            'artists': f'Fake Artist {seed % 200}',
+            'album': f'Fake Album {seed % 1000}',
+            'duration_seconds': 120 + seed % 240,
+            'track_id': track_id,
+            'genres': list(dict.fromkeys(
+                FAKE_GENRES[(seed >> (4 * i)) % len(FAKE_GENRES)] for i in range(genre_count)
+            )),
+            'cover_image_url': '',
+            'release_date': str(1970 + seed % 55),
+        }
+
+
+class FakeFunFactProvider(FakeUpstream, FunFactProvider):
+    """Gemini stand-in returning a canned fact"""
+
+    name = 'fun fact'
+
+    def generate(self, song):
+        self.simulate_call()
+        return {'fact': f'{song.title} by {song.artist} was generated offline for a load test.'}
@@ -0,0 +1,88 @@
+"""
+Full-text song search over title, artist and album.
+
+On PostgreSQL, songs.search_vector is a tsvector with the title, artist and
+album weighted A, B and C, kept up to date by a trigger and indexed with GIN
+(migration 0012). Every word of a query must match, the last one as a prefix
+so results follow what is being typed, and matches are ranked with ts_rank.
+A GIN index cannot return matches in rank order, and a common word can match a
+good part of the catalog, so only the SONG_SEARCH_CANDIDATES most recent
+matches are ranked.
+
+Pages are keyset-paginated on (rank, id): the cursor holds the rank and id of
+the last result of a page, so a deep page costs the same as the first one.
+
+Elsewhere (SQLite in development and tests), every word must be contained in
+the title, artist or album, and matches come most recent first with rank 0.
+"""
+import base64
+import binascii
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Cast
+
+from music.models import Song
+
+SEARCH_WORD_PATTERN = re.compile(r'\w+')
+
+
+def search_words(query):
+    return SEARCH_WORD_PATTERN.findall(query.lower())
+
+
+def encode_cursor(song):
+    return base64.urlsafe_b64encode(f'{song.rank!r}:{song.id}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(rank, id) of a cursor from encode_cursor; raises ValueError if it is not one"""
+    try:
+        rank, song_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        return float(rank), int(song_id)
+    except (UnicodeError, binascii.Error) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+
+
+def ranked_matches(words):
+    if connection.vendor == 'postgresql':
+        # Words only contain \w characters, so they are safe in a raw tsquery
+        query = SearchQuery(' & '.join(words[:-1] + [f'{words[-1]}:*']), search_type='raw', config='simple')
+        candidates = Song.objects.filter(search_vector=query).order_by('-id').values('id')
+        # ts_rank is a real, whose text form does not read back as the same
+        # value; as a double precision the rank in a cursor compares equal
+        return Song.objects.filter(id__in=candidates[:settings.SONG_SEARCH_CANDIDATES]).annotate(
+            rank=Cast(SearchRank(F('search_vector'), query), FloatField())
+        )
+
+    matches = Song.objects.all()
+    for word in words:
+        matches = matches.filter(Q(title__icontains=word) | Q(artist__icontains=word) | Q(album__icontains=word))
+    return matches.annotate(rank=Value(0.0, output_field=FloatField()))
+
+
+def search_songs(query, limit, after=None):
+    """
+    Songs matching every word of `query`, best first, and the cursor of the next
+    page or None. `after` is the (rank, id) of the last song of the previous page.
+    """
+    words = search_words(query)
+    if not words:
+        return [], None
+
+    songs = ranked_matches(words)
+    if after:
+        rank, song_id = after
+        songs = songs.filter(Q(rank__lt=rank) | Q(rank=rank, id__lt=song_id))
+    songs = list(
+        songs.select_related('platform', 'uploader')
+        .defer('search_vector', 'fun_fact')
+        .order_by('-rank', '-id')[:limit + 1]
+    )
+
+    if len(songs) > limit:
+        return songs[:limit], encode_cursor(songs[limit - 1])
+    return songs, None
@@ -0,0 +1,69 @@
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from music.match_helpers import index_song_genres
+from music.models import Song, SongExchange
+from music.profile_cache import invalidate_profiles, invalidate_uploader_profiles, profile_cache_key
+
+User = get_user_model()
+
+# User fields rendered by UserSerializer; saves touching only other fields
+# (e.g. last_login) leave cached profiles valid.
+PROFILE_FIELDS = {
+    'uid', 'email', 'first_name', 'last_name', 'profession',
+    'country', 'city', 'profile_image', 'type',
+}
+
+
+def exchange_user_ids(exchanges):
+    user_ids = set()
+    for sender_id, receiver_id in exchanges.values_list('sender_id', 'receiver_id'):
+        user_ids.update((sender_id, receiver_id))
+    return user_ids
+
+
+@receiver(post_save, sender=SongExchange)
+@receiver(post_delete, sender=SongExchange)
+def invalidate_exchange_profiles(sender, instance, **kwargs):
+    """Both sides of an exchange show it in their profile lists and stats"""
+    invalidate_profiles(instance.sender_id, instance.receiver_id)
+
+
+@receiver(post_save, sender=Song)
+def invalidate_song_profiles(sender, instance, created, **kwargs):
+    """
+    An edited song is rendered in the profiles of everyone it was exchanged with;
+    a new one changes the remaining uploads shown with its uploader's songs
+    """
+    if created:
+        invalidate_uploader_profiles(instance.uploader)
+        return
+    exchanges = SongExchange.objects.filter(Q(sent_song=instance) | Q(received_song=instance))
+    invalidate_profiles(instance.uploader_id, *exchange_user_ids(exchanges))
+
+
+@receiver(post_save, sender=Song)
+def index_saved_song_genres(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the song's SongGenre rows in step with its genre list"""
+    if update_fields is not None and 'genre' not in update_fields:
+        return
+    index_song_genres([instance])
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_profiles(sender, instance, created, update_fields=None, **kwargs):
+    """A user's header appears on their own profile and in their partners' lists"""
+    if created:
+        return
+    if update_fields is not None and not PROFILE_FIELDS.intersection(update_fields):
+        return
+    exchanges = SongExchange.objects.filter(Q(sender=instance) | Q(receiver=instance))
+    invalidate_profiles(instance.pk, *exchange_user_ids(exchanges))
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user_profile(sender, instance, **kwargs):
+    cache.delete(profile_cache_key(instance.uid))
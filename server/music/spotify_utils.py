@@ -4,6 +4,9 @@ from spotipy.oauth2 import SpotifyClientCredentials
 import re
 from django.conf import settings
 
+from music.providers import SongMetadataProvider, get_metadata_provider
+from soundly.metrics import INGEST_STAGE_SECONDS
+
 logger = logging.getLogger(__name__)
 
 def get_spotify_client():
@@ -21,49 +24,112 @@ def get_spotify_client():
     )
     return spotipy.Spotify(client_credentials_manager=client_credentials_manager)
 
+@INGEST_STAGE_SECONDS.labels(stage='spotify').time()
 def get_song_category_from_url(song_url):
     """Enhanced function to get song details from Spotify URL"""
     try:
-        match = re.search(r'track/([a-zA-Z0-9]+)', song_url)
-        if not match:
+        return get_metadata_provider().get_track(song_url)
+    except Exception as e:
+        logger.error("Error fetching song details: %s", e, exc_info=True)
+        return None
+
+
+# Most ids the tracks and artists endpoints accept per call
+SPOTIFY_BATCH_SIZE = 50
+
+
+def track_to_info(track, genres):
+    """get_track dict for a Spotify track object and the genres of its artists"""
+    duration_ms = track['duration_ms']
+    cover_image_url = ''
+    if track['album']['images']:
+        cover_image_url = track['album']['images'][0]['url']
+
+    return {
+        'title': track['name'],
+        'artists': ", ".join(artist['name'] for artist in track['artists']),
+        'album': track['album']['name'],
+        'duration_seconds': duration_ms // 1000 if duration_ms else None,
+        'track_id': track['id'],
+        'genres': list(genres),
+        'cover_image_url': cover_image_url,
+        'release_date': track['album']['release_date']
+    }
+
+
+class SpotifyMetadataProvider(SongMetadataProvider):
+    """Song metadata from the Spotify Web API"""
+
+    def get_track(self, song_url):
+        try:
+            match = re.search(r'track/([a-zA-Z0-9]+)', song_url)
+            if not match:
+                return None
+
+            track_id = match.group(1)
+            sp = get_spotify_client()
+
+            # Get track details
+            track = sp.track(track_id)
+
+            all_genres = set()
+            for artist in track['artists']:
+                artist_data = sp.artist(artist['uri'])
+                all_genres.update(artist_data.get('genres', []))
+
+            info = track_to_info(track, all_genres)
+            info['track_id'] = track_id
+            logger.debug("Retrieved artist names: %s", info['artists'])
+            return info
+
+        except Exception as e:
+            logger.error("Error fetching song details from Spotify: %s", e, exc_info=True)
             return None
 
-        track_id = match.group(1)
+    def get_tracks(self, track_ids):
         sp = get_spotify_client()
 
-        # Get track details
-        track = sp.track(track_id)
-
-        song_title = track['name']
-        album_name = track['album']['name']
-        duration_ms = track['duration_ms']
-        release_date = track['album']['release_date']
-
-        cover_image_url = ''
-        if track['album']['images']:
-            cover_image_url = track['album']['images'][0]['url']
-
-        all_genres = set()
-        artist_names = []
-        for artist in track['artists']:
-            artist_names.append(artist['name'])
-            artist_data = sp.artist(artist['uri'])
-            all_genres.update(artist_data.get('genres', []))
-
-        artist_names_str = ", ".join(artist_names)
-        logger.debug(f"Retrieved artist names: {artist_names_str}")
-
-        return {
-            'title': song_title,
-            'artists': artist_names_str,
-            'album': album_name,
-            'duration_seconds': duration_ms // 1000 if duration_ms else None,
-            'track_id': track_id,
-            'genres': list(all_genres),
-            'cover_image_url': cover_image_url,
-            'release_date': release_date
-        }
+        tracks = {}
+        for start in range(0, len(track_ids), SPOTIFY_BATCH_SIZE):
+            chunk = track_ids[start:start + SPOTIFY_BATCH_SIZE]
+            # Results come back in request order, with None for unknown ids
+            for track_id, track in zip(chunk, sp.tracks(chunk)['tracks']):
+                if track:
+                    tracks[track_id] = track
 
-    except Exception as e:
-        logger.error(f"Error fetching song details from Spotify: {e}", exc_info=True)
-        return None
+        artist_ids = list(dict.fromkeys(
+            artist['id'] for track in tracks.values() for artist in track['artists'] if artist.get('id')
+        ))
+        artist_genres = {}
+        for start in range(0, len(artist_ids), SPOTIFY_BATCH_SIZE):
+            for artist in sp.artists(artist_ids[start:start + SPOTIFY_BATCH_SIZE])['artists']:
+                if artist:
+                    artist_genres[artist['id']] = artist.get('genres', [])
+
+        infos = {}
+        for track_id, track in tracks.items():
+            genres = set()
+            for artist in track['artists']:
+                genres.update(artist_genres.get(artist.get('id'), []))
+            infos[track_id] = track_to_info(track, genres)
+            infos[track_id]['track_id'] = track_id
+        return infos
+
+    def get_collection_track_ids(self, kind, collection_id):
+        sp = get_spotify_client()
+        if kind == 'album':
+            page = sp.album_tracks(collection_id, limit=50)
+        else:
+            page = sp.playlist_items(
+                collection_id, fields='items(track(id,type)),next', limit=100, additional_types=('track',)
+            )
+
+        track_ids = []
+        while page:
+            for item in page['items']:
+                # Playlist items wrap the track, which is None for removed or local tracks
+                track = item.get('track') if kind == 'playlist' else item
+                if track and track.get('id') and track.get('type', 'track') == 'track':
+                    track_ids.append(track['id'])
+            page = sp.next(page) if page.get('next') else None
+        return track_ids
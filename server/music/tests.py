@@ -1,14 +1,409 @@
 import re
 
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
 
-pattern = (
-    r"^(https:\/\/)?open\.spotify\.com\/track\/[a-zA-Z0-9]+(\?si=[a-zA-Z0-9_\-]+)?$"
+from core.models import Activity
+from music.batch_matching import PendingPool, commit_pairs, greedy_pairs
+from music.genre_vectors import feature_idf, genre_vector, pending_genre_index
+from music.match_helpers import (
+    claim_pending_exchanges,
+    create_automatic_matches_in_bulk,
+    create_random_matches_in_bulk,
+    find_and_create_automatic_match,
+    find_and_create_random_match,
 )
+from music.models import MusicPlatform, Song, SongExchange
+from users.choices import UserTypeChoice
+from users.models import User
 
-spotify_url = (
-    "https://open.spotify.com/track/2RdEC8Ff83WkX7kDVCHseE?si=3ea50b2737a44d04"
+SPOTIFY_TRACK_PATTERN = (
+    r"^(https:\/\/)?open\.spotify\.com\/track\/[a-zA-Z0-9]+(\?si=[a-zA-Z0-9_\-]+)?$"
 )
 
-c = re.match(pattern, spotify_url)
 
-print(c)
+class SpotifyUrlPatternTests(TestCase):
+    def test_track_url_with_share_id(self):
+        spotify_url = "https://open.spotify.com/track/2RdEC8Ff83WkX7kDVCHseE?si=3ea50b2737a44d04"
+        self.assertIsNotNone(re.match(SPOTIFY_TRACK_PATTERN, spotify_url))
+
+
+class MusicAPITestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.platform = MusicPlatform.objects.create(name="Spotify", domain="spotify.com")
+        cls.user = User.objects.create_user("listener@example.com", "password", first_name="Listener")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @classmethod
+    def create_song(cls, uploader, number, **fields):
+        return Song.objects.create(
+            uploader=uploader,
+            platform=cls.platform,
+            title=f"Song {number}",
+            artist=f"Artist {number % 3}",
+            url=f"https://open.spotify.com/track/test{number}",
+            **fields,
+        )
+
+
+class SongListTests(MusicAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.premium = User.objects.create_user(
+            "premium@example.com", "password", first_name="Premium", type=UserTypeChoice.PREMIUM
+        )
+        for number in range(3):
+            cls.create_song(cls.user, number)
+        cls.create_song(cls.premium, 3)
+        cls.create_song(None, 4)
+
+    def test_page_with_a_song_without_uploader(self):
+        response = self.client.get("/api/songs/")
+
+        self.assertEqual(response.status_code, 200)
+        songs = {song["title"]: song for song in response.data["results"]}
+        self.assertEqual(len(songs), 5)
+        self.assertIsNone(songs["Song 4"]["remaining_uploads"])
+        self.assertIsNone(songs["Song 3"]["remaining_uploads"])
+        self.assertIsNotNone(songs["Song 0"]["remaining_uploads"])
+
+    def test_numbered_pages_by_default(self):
+        response = self.client.get("/api/songs/", {"page_size": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIn("page=2", response.data["next"])
+
+    def test_cursor_pages_are_opt_in(self):
+        titles = []
+        response = self.client.get("/api/songs/", {"cursor": "", "page_size": 2})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            titles += [song["title"] for song in response.data["results"]]
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(titles, [f"Song {number}" for number in reversed(range(5))])
+
+
+class SongSearchTests(MusicAPITestCase):
+    def test_result_without_uploader(self):
+        self.create_song(self.user, 1, album="Night Drive")
+        self.create_song(None, 2, album="Night Drive")
+
+        response = self.client.get("/api/songs/search/", {"q": "night"})
+
+        self.assertEqual(response.status_code, 200)
+        uploaders = {song["title"]: song["uploader"] for song in response.data["results"]}
+        self.assertIsNone(uploaders["Song 2"])
+        self.assertEqual(uploaders["Song 1"]["uid"], str(self.user.uid))
+
+
+class MatchedExchangeListTests(MusicAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        partners = [
+            User.objects.create_user(f"partner{number}@example.com", "password", first_name=f"Partner {number}")
+            for number in range(3)
+        ]
+        for number in range(12):
+            partner = partners[number % 3]
+            SongExchange.objects.create(
+                sender=cls.user,
+                receiver=partner,
+                sent_song=cls.create_song(cls.user, 2 * number),
+                received_song=cls.create_song(partner, 2 * number + 1),
+                status="matched",
+            )
+            SongExchange.objects.create(
+                sender=partner,
+                receiver=cls.user,
+                sent_song=cls.create_song(partner, 100 + 2 * number),
+                received_song=cls.create_song(cls.user, 101 + 2 * number),
+                status="matched",
+            )
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        # The count and the page itself, whatever the number of exchanges on it,
+        # plus the user lookup of a list by uid
+        lists = [
+            ("/api/received-songs", 2),
+            ("/api/sent-songs", 2),
+            (f"/api/user-received-songs/{self.user.uid}/", 3),
+        ]
+        for url, queries in lists:
+            for page_size in (1, 5, 12):
+                with self.subTest(url=url, page_size=page_size):
+                    with self.assertNumQueries(queries):
+                        response = self.client.get(url, {"page_size": page_size})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(len(response.data["results"]), page_size)
+                    self.assertEqual(response.data["count"], 12)
+
+
+class PendingGenreIndexTests(MusicAPITestCase):
+    def setUp(self):
+        super().setUp()
+        # The index lives for the process: build it from this test's rows
+        pending_genre_index.built_at = None
+
+    def create_pending(self, number, genres, **fields):
+        song = self.create_song(self.user, number, genre=genres)
+        return SongExchange.objects.create(sender=self.user, sent_song=song, status="pending", **fields)
+
+    def test_exchange_committed_after_a_newer_one_is_loaded(self):
+        newer = self.create_pending(1, ["pop"], id=100)
+        pending_genre_index.refresh()
+        # An upload whose transaction took longer commits the lower id afterwards
+        older = self.create_pending(2, ["pop", "rock"], id=50)
+        pending_genre_index.refresh()
+
+        ranked = [exchange_id for _, exchange_id in pending_genre_index.rank(["pop", "rock"])]
+        self.assertEqual(ranked, [older.id, newer.id])
+
+
+class GreedyPairsTests(SimpleTestCase):
+    def pairs(self, *rows):
+        # rows: (exchange id, sender id, genres), oldest first
+        return [(a, b) for a, b, _ in greedy_pairs(PendingPool(rows))[0]]
+
+    def test_each_exchange_is_paired_once(self):
+        pairs = self.pairs(*[(number, number, ["pop"]) for number in range(1, 6)])
+
+        self.assertEqual(len(pairs), 2)
+        paired = [exchange_id for pair in pairs for exchange_id in pair]
+        self.assertEqual(len(paired), len(set(paired)))
+
+    def test_exchanges_of_the_same_sender_are_not_paired(self):
+        self.assertEqual(self.pairs((1, 7, ["pop"]), (2, 7, ["pop"]), (3, 8, ["jazz"])), [])
+
+    def test_older_partner_wins_a_tie(self):
+        self.assertEqual(self.pairs((1, 1, ["pop"]), (2, 2, ["pop"]), (3, 3, ["pop"])), [(1, 2)])
+
+    def test_most_similar_pair_first(self):
+        pairs = self.pairs(
+            (1, 1, ["pop"]),
+            (2, 2, ["dance pop", "house"]),
+            (3, 3, ["pop"]),
+            (4, 4, ["house", "dance pop"]),
+        )
+        self.assertEqual(sorted(pairs), [(1, 3), (2, 4)])
+
+    def test_similarity_is_the_upload_matcher_cosine(self):
+        genre_lists = [["pop", "rock"], ["pop", "jazz"], ["metal"]]
+        rows = [(number, number, genres) for number, genres in enumerate(genre_lists, 1)]
+        idf = feature_idf(genre_lists)
+        first, second = (genre_vector(genres, idf, 1.0) for genres in genre_lists[:2])
+
+        pairs = greedy_pairs(PendingPool(rows))[0]
+
+        self.assertEqual([(a, b) for a, b, _ in pairs], [(1, 2)])
+        cosine = sum(weight * second.get(feature, 0) for feature, weight in first.items())
+        self.assertAlmostEqual(pairs[0][2], cosine * 100)
+
+
+class CommitPairsTests(MusicAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.senders = [
+            User.objects.create_user(f"sender{number}@example.com", "password", first_name=f"Sender {number}")
+            for number in range(4)
+        ]
+
+    def setUp(self):
+        super().setUp()
+        self.exchanges = [
+            SongExchange.objects.create(sender=sender, sent_song=self.create_song(sender, number), status="pending")
+            for number, sender in enumerate(self.senders)
+        ]
+
+    def test_pairs_are_matched_with_one_activity_per_exchange(self):
+        first, second, third, fourth = self.exchanges
+        # An upload claimed the fourth exchange since the pool was loaded
+        fourth.receiver, fourth.received_song, fourth.status = self.user, self.create_song(self.user, 9), "matched"
+        fourth.save()
+
+        matched = commit_pairs([(first.id, second.id, 100.0), (third.id, fourth.id, 90.0)])
+
+        self.assertEqual([(a.id, b.id) for a, b in matched], [(first.id, second.id)])
+        for exchange, partner in ((first, second), (second, first)):
+            exchange.refresh_from_db()
+            self.assertEqual(exchange.status, "matched")
+            self.assertEqual(exchange.match_type, "genre")
+            self.assertEqual(exchange.receiver, partner.sender)
+            self.assertEqual(exchange.received_song, partner.sent_song)
+        third.refresh_from_db()
+        self.assertEqual(third.status, "pending")
+        self.assertIsNone(third.receiver)
+
+        activities = Activity.objects.filter(activity_type="song_exchange")
+        self.assertEqual(
+            sorted(activities.values_list("song_exchange_id", flat=True)), sorted([first.id, second.id])
+        )
+
+
+class AutomaticMatchTests(MusicAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.senders = [
+            User.objects.create_user(f"pool{number}@example.com", "password", first_name=f"Pool {number}")
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        super().setUp()
+        pending_genre_index.built_at = None
+
+    def create_pending(self, sender, number, genres):
+        song = self.create_song(sender, number, genre=genres)
+        return SongExchange.objects.create(sender=sender, sent_song=song, status="pending")
+
+    def upload(self, number, genres):
+        return self.create_song(self.user, number, genre=genres)
+
+    def take_elsewhere(self, exchange):
+        exchange.receiver = self.senders[2]
+        exchange.received_song = self.create_song(self.senders[2], 90 + exchange.id)
+        exchange.status = "matched"
+        exchange.save()
+
+    def test_claim_returns_the_exchanges_still_pending(self):
+        pending = self.create_pending(self.senders[0], 1, ["pop"])
+        taken = self.create_pending(self.senders[1], 2, ["pop"])
+        self.take_elsewhere(taken)
+
+        self.assertEqual(claim_pending_exchanges([pending.id, taken.id]), {pending.id})
+
+    def test_most_similar_exchange_is_matched_both_ways(self):
+        close = self.create_pending(self.senders[0], 1, ["pop", "rock"])
+        far = self.create_pending(self.senders[1], 2, ["pop", "jazz"])
+        own = self.create_pending(self.user, 3, ["pop", "rock"])
+        song = self.upload(4, ["pop", "rock"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            matched_song, matched_user = find_and_create_automatic_match(self.user, song)
+
+        self.assertEqual((matched_song, matched_user), (close.sent_song, self.senders[0]))
+        close.refresh_from_db()
+        self.assertEqual((close.status, close.receiver, close.received_song), ("matched", self.user, song))
+        reciprocal = SongExchange.objects.get(sender=self.user, sent_song=song)
+        self.assertEqual(
+            (reciprocal.status, reciprocal.receiver, reciprocal.received_song),
+            ("matched", self.senders[0], close.sent_song),
+        )
+        self.assertEqual(
+            set(SongExchange.objects.filter(status="pending").values_list("id", flat=True)), {far.id, own.id}
+        )
+        self.assertNotIn(close.id, pending_genre_index.vectors)
+
+    def test_exchange_taken_since_indexing_is_pruned_and_the_next_claimed(self):
+        taken = self.create_pending(self.senders[0], 1, ["pop", "rock"])
+        next_best = self.create_pending(self.senders[1], 2, ["pop"])
+        pending_genre_index.refresh()
+        # Another process matched it after this one loaded the index
+        self.take_elsewhere(taken)
+
+        matched_song, _ = find_and_create_automatic_match(self.user, self.upload(3, ["pop", "rock"]))
+
+        self.assertEqual(matched_song, next_best.sent_song)
+        self.assertNotIn(taken.id, pending_genre_index.vectors)
+
+    def test_upload_is_pooled_when_nothing_can_be_claimed(self):
+        taken = self.create_pending(self.senders[0], 1, ["pop"])
+        pending_genre_index.refresh()
+        self.take_elsewhere(taken)
+        song = self.upload(2, ["pop"])
+
+        self.assertEqual(find_and_create_automatic_match(self.user, song), (None, None))
+
+        pooled = SongExchange.objects.get(sender=self.user, sent_song=song)
+        self.assertEqual((pooled.status, pooled.receiver), ("pending", None))
+        self.assertNotIn(taken.id, pending_genre_index.vectors)
+
+    def test_rolled_back_match_leaves_the_exchange_pending_and_indexed(self):
+        candidate = self.create_pending(self.senders[0], 1, ["pop"])
+        song = self.upload(2, ["pop"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.assertEqual(find_and_create_automatic_match(self.user, song)[1], self.senders[0])
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        candidate.refresh_from_db()
+        self.assertEqual(candidate.status, "pending")
+        self.assertIn(candidate.id, pending_genre_index.vectors)
+        self.assertFalse(SongExchange.objects.filter(sender=self.user).exists())
+
+
+class MatchActivityTests(MusicAPITestCase):
+    """Every matcher writes exactly one song_exchange activity per matched exchange"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.partners = [
+            User.objects.create_user(f"match{number}@example.com", "password", first_name=f"Match {number}")
+            for number in range(2)
+        ]
+
+    def setUp(self):
+        super().setUp()
+        pending_genre_index.built_at = None
+        self.pending = [
+            SongExchange.objects.create(
+                sender=partner, sent_song=self.create_song(partner, number, genre=["pop"]), status="pending"
+            )
+            for number, partner in enumerate(self.partners)
+        ]
+
+    def uploads(self, count):
+        return [self.create_song(self.user, 10 + number, genre=["pop"]) for number in range(count)]
+
+    def assertOneActivityPerMatchedExchange(self):
+        matched = set(SongExchange.objects.filter(status="matched").values_list("id", flat=True))
+        activities = list(
+            Activity.objects.filter(activity_type="song_exchange").values_list("song_exchange_id", flat=True)
+        )
+        self.assertTrue(matched)
+        self.assertEqual(sorted(activities), sorted(matched))
+
+    def test_automatic_match(self):
+        find_and_create_automatic_match(self.user, self.uploads(1)[0])
+
+        self.assertOneActivityPerMatchedExchange()
+
+    def test_random_match(self):
+        find_and_create_random_match(self.user, self.uploads(1)[0])
+
+        self.assertOneActivityPerMatchedExchange()
+
+    def test_automatic_matches_in_bulk(self):
+        songs = self.uploads(3)
+
+        results = create_automatic_matches_in_bulk(self.user, songs)
+
+        # Two pending exchanges for three songs: each is taken once, the last song is pooled
+        self.assertEqual({matched_user for _, _, matched_user in results}, {*self.partners, None})
+        self.assertEqual(SongExchange.objects.filter(status="matched").count(), 4)
+        self.assertOneActivityPerMatchedExchange()
+
+    def test_random_matches_in_bulk(self):
+        results = create_random_matches_in_bulk(self.user, self.uploads(2))
+
+        self.assertTrue(all(matched_song for _, matched_song, _ in results))
+        self.assertOneActivityPerMatchedExchange()
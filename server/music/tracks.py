@@ -0,0 +1,61 @@
+"""
+Canonical Spotify tracks.
+
+Every upload of a Spotify track references one Track row holding the track's
+metadata and fun fact, so Spotify and Gemini are asked once per track instead
+of once per upload. Songs keep their own copy of the metadata, which is what
+the feed, profiles and matching read.
+"""
+from music.models import Track
+from music.providers import parse_spotify_url
+
+
+def spotify_track_id(url):
+    """Spotify id of a track URL, or None"""
+    parsed = parse_spotify_url(url)
+    return parsed[1] if parsed and parsed[0] == 'track' else None
+
+
+def stored_track(url):
+    """The Track of a track URL uploaded before, or None"""
+    track_id = spotify_track_id(url)
+    return Track.objects.filter(spotify_id=track_id).first() if track_id else None
+
+
+def track_info(track):
+    """The track as a SongMetadataProvider.get_track dict"""
+    return {
+        'title': track.title,
+        'artists': track.artist,
+        'album': track.album,
+        'duration_seconds': track.duration_seconds,
+        'track_id': track.spotify_id,
+        'genres': track.genre,
+        'cover_image_url': track.cover_image_url,
+        'release_date': track.release_date,
+    }
+
+
+def new_track(info):
+    return Track(
+        spotify_id=info['track_id'],
+        title=info.get('title', 'Unknown Title')[:200],
+        artist=info.get('artists', 'Unknown Artist')[:200],
+        album=(info.get('album') or '')[:200],
+        genre=info.get('genres') or [],
+        duration_seconds=info.get('duration_seconds'),
+        release_date=info.get('release_date', ''),
+        cover_image_url=info.get('cover_image_url') or '',
+    )
+
+
+def store_tracks(infos):
+    """Tracks for get_track dicts, by Spotify id, creating those not stored yet"""
+    Track.objects.bulk_create([new_track(info) for info in infos], ignore_conflicts=True)
+    return Track.objects.in_bulk([info['track_id'] for info in infos], field_name='spotify_id')
+
+
+def share_fun_fact(song, fun_fact_text):
+    """Keep a fun fact generated for a song on its track for later uploads, unless the track has one"""
+    if song.track_id:
+        Track.objects.filter(pk=song.track_id, fun_fact='').update(fun_fact=fun_fact_text)
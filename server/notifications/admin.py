@@ -9,7 +9,7 @@ Notification = load_model('notifications', 'Notification')
 
 
 def mark_unread(modeladmin, request, queryset):
-    queryset.update(unread=True)
+    queryset.mark_all_as_unread()
 mark_unread.short_description = gettext_lazy('Mark selected notifications as unread')
 
 
@@ -4,6 +4,7 @@ from django import get_version
 from django.conf import settings
 from django.contrib.auth.models import Group
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
 from django.db import models
 from django.db.models.query import QuerySet
@@ -19,6 +20,8 @@ from swapper import load_model
 
 from notifications import settings as notifications_settings
 from notifications.signals import notify
+from soundly.caching import shared_cache
+from soundly.metrics import record_cache_lookup
 
 if parse_version(get_version()) >= parse_version('1.8.0'):
     from django.contrib.contenttypes.fields import GenericForeignKey  # noqa
@@ -51,6 +54,57 @@ def assert_soft_delete():
         raise ImproperlyConfigured(msg)
 
 
+def unread_count_cache_key(recipient_id):
+    return 'notifications:unread_count:%s' % recipient_id
+
+
+def get_cached_unread_count(recipient):
+    """Return the cached unread count for a recipient, or None on a cache miss."""
+    return cache.get(unread_count_cache_key(recipient.pk))
+
+
+def get_unread_count(recipient):
+    """
+    Return the number of unread notifications for a recipient.
+
+    The counter is served from the cache and only falls back to the database
+    (repopulating the cache) on a miss. Without a cache shared by all workers
+    every worker would keep its own counter, invalidated only by its own
+    writes, so the count is then always read from the database.
+    """
+    if not shared_cache():
+        return recipient.notifications.unread().count()
+
+    count = get_cached_unread_count(recipient)
+    record_cache_lookup('unread_count', count is not None)
+    if count is None:
+        count = recipient.notifications.unread().count()
+        cache.set(
+            unread_count_cache_key(recipient.pk),
+            count,
+            notifications_settings.get_config()['UNREAD_COUNT_CACHE_TIMEOUT'],
+        )
+    return count
+
+
+def adjust_unread_count(recipient_id, delta):
+    """
+    Apply a delta to a cached unread counter.
+
+    Missing keys are left alone: the next read repopulates them from the database.
+    """
+    key = unread_count_cache_key(recipient_id)
+    try:
+        if cache.incr(key, delta) < 0:
+            cache.delete(key)
+    except ValueError:
+        pass
+
+
+def invalidate_unread_counts(recipient_ids):
+    cache.delete_many([unread_count_cache_key(recipient_id) for recipient_id in set(recipient_ids)])
+
+
 class NotificationQuerySet(models.query.QuerySet):
     ''' Notification QuerySet '''
     def unsent(self):
@@ -88,7 +142,7 @@ class NotificationQuerySet(models.query.QuerySet):
         if recipient:
             qset = qset.filter(recipient=recipient)
 
-        return qset.update(unread=False)
+        return qset._update_and_invalidate(recipient, unread=False)
 
     def mark_all_as_unread(self, recipient=None):
         """Mark as unread any read messages in the current queryset.
@@ -100,7 +154,7 @@ class NotificationQuerySet(models.query.QuerySet):
         if recipient:
             qset = qset.filter(recipient=recipient)
 
-        return qset.update(unread=True)
+        return qset._update_and_invalidate(recipient, unread=True)
 
     def deleted(self):
         """Return only deleted items in the current queryset"""
@@ -121,7 +175,7 @@ class NotificationQuerySet(models.query.QuerySet):
         if recipient:
             qset = qset.filter(recipient=recipient)
 
-        return qset.update(deleted=True)
+        return qset._update_and_invalidate(recipient, deleted=True, deleted_at=timezone.now())
 
     def mark_all_as_active(self, recipient=None):
         """Mark current queryset as active(un-deleted).
@@ -132,7 +186,29 @@ class NotificationQuerySet(models.query.QuerySet):
         if recipient:
             qset = qset.filter(recipient=recipient)
 
-        return qset.update(deleted=False)
+        return qset._update_and_invalidate(recipient, deleted=False, deleted_at=None)
+
+    def delete(self):
+        recipient_ids = self._recipient_ids()
+        result = super().delete()
+        invalidate_unread_counts(recipient_ids)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def _recipient_ids(self, recipient=None):
+        if recipient:
+            return [recipient.pk]
+        return list(self.order_by().values_list('recipient_id', flat=True).distinct())
+
+    def _update_and_invalidate(self, recipient, **kwargs):
+        """Bulk update and drop the cached unread counters of the affected recipients."""
+        recipient_ids = self._recipient_ids(recipient)
+        count = self.update(**kwargs)
+        if count:
+            invalidate_unread_counts(recipient_ids)
+        return count
 
     def mark_as_unsent(self, recipient=None):
         qset = self.sent()
@@ -229,6 +305,8 @@ class AbstractNotification(models.Model):
 
     public = models.BooleanField(_('public'), default=True, db_index=True)
     deleted = models.BooleanField(_('deleted'), default=False, db_index=True)
+    # When the notification was soft-deleted; retention counts from here
+    deleted_at = models.DateTimeField(_('deleted at'), blank=True, null=True)
     emailed = models.BooleanField(_('emailed'), default=False, db_index=True)
 
     data = JSONField(_('data'), blank=True, null=True)
@@ -241,6 +319,8 @@ class AbstractNotification(models.Model):
         # speed up notifications count query
         indexes = [
             models.Index(fields=['recipient', 'unread']),
+            # matches the unread()/read() filters and the id keyset of their pages
+            models.Index(fields=['recipient', 'unread', 'deleted', 'id']),
         ]
         verbose_name = _('Notification')
         verbose_name_plural = _('Notifications')
@@ -273,15 +353,47 @@ class AbstractNotification(models.Model):
     def slug(self):
         return id2slug(self.id)
 
+    @property
+    def counts_as_unread(self):
+        """Whether this notification is included in NotificationQuerySet.unread()"""
+        return self.unread and not (is_soft_delete() and self.deleted)
+
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        super().save(*args, **kwargs)
+        if created and self.counts_as_unread:
+            adjust_unread_count(self.recipient_id, 1)
+
+    def delete(self, *args, **kwargs):
+        counted = self.counts_as_unread
+        result = super().delete(*args, **kwargs)
+        if counted:
+            adjust_unread_count(self.recipient_id, -1)
+        return result
+
     def mark_as_read(self):
         if self.unread:
+            counted = self.counts_as_unread
             self.unread = False
             self.save()
+            if counted:
+                adjust_unread_count(self.recipient_id, -1)
 
     def mark_as_unread(self):
         if not self.unread:
             self.unread = True
             self.save()
+            if self.counts_as_unread:
+                adjust_unread_count(self.recipient_id, 1)
+
+    def mark_as_deleted(self):
+        if not self.deleted:
+            counted = self.counts_as_unread
+            self.deleted = True
+            self.deleted_at = timezone.now()
+            self.save()
+            if counted and not self.counts_as_unread:
+                adjust_unread_count(self.recipient_id, -1)
 
     def actor_object_url(self):
         try:
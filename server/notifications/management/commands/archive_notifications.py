@@ -0,0 +1,62 @@
+"""
+Django management command to move old read notifications into the compact
+NotificationArchive table, keeping the live notifications table small.
+Usage: python manage.py archive_notifications --days 90
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notifications.models import Notification
+from notifications.retention import process_in_ranges
+from notifications.settings import get_config
+
+
+class Command(BaseCommand):
+    help = 'Archive read notifications older than the given number of days'
+
+    def add_arguments(self, parser):
+        config = get_config()
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=config['RETENTION_READ_DAYS'],
+            help='Archive read notifications older than this many days',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=config['RETENTION_BATCH_SIZE'],
+            help='Size of the primary key range moved per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many notifications would be archived without moving them',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+
+        # Soft-deleted notifications are left to purge_notifications
+        candidates = Notification.objects.filter(deleted=False, unread=False, timestamp__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'DRY RUN: Would archive {candidates.count()} notifications read before {cutoff:%Y-%m-%d}.'
+                )
+            )
+            return
+
+        total = process_in_ranges(
+            candidates,
+            options['batch_size'],
+            archive=True,
+            progress=lambda count: self.stdout.write(f'  Archived {count} notifications...'),
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully archived {total} notifications read before {cutoff:%Y-%m-%d}.')
+        )
@@ -0,0 +1,104 @@
+"""
+Django management command to check that the notification list endpoint renders
+with a constant number of queries, regardless of how many notifications it returns.
+Runs inside a transaction that is rolled back, so no data is left behind.
+Usage: python manage.py benchmark_notification_list --count 100
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from notifications.models import Notification
+from notifications.serializers import NotificationHQSerializer
+from notifications.views import NotificationListView
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Measure query count and time of the notification list for N notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=100,
+            help='Number of notifications to render (default: 100)',
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+
+        with transaction.atomic():
+            recipient = User.objects.create_user(
+                email='benchmark-recipient@soundlybeats.com', password=None
+            )
+            actor = User.objects.create_user(
+                email='benchmark-actor@soundlybeats.com', password=None
+            )
+            user_type = ContentType.objects.get_for_model(User)
+
+            self._create_notifications(recipient, actor, user_type, 1)
+            single_queries, _ = self._render(recipient, 1)
+
+            self._create_notifications(recipient, actor, user_type, count - 1)
+            queries, elapsed = self._render(recipient, count)
+
+            legacy_queries = self._render_legacy(recipient, count)
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'List of 1 notification: {single_queries} queries')
+        self.stdout.write(
+            f'List of {count} notifications: {queries} queries, {elapsed * 1000:.1f} ms'
+        )
+        self.stdout.write(f'NotificationHQSerializer for {count} notifications: {legacy_queries} queries')
+
+        if queries > single_queries:
+            raise CommandError(
+                f'Query count grows with the number of notifications ({single_queries} -> {queries})'
+            )
+        self.stdout.write(self.style.SUCCESS('Query count is constant.'))
+
+    def _create_notifications(self, recipient, actor, user_type, count):
+        Notification.objects.bulk_create([
+            Notification(
+                recipient=recipient,
+                actor_content_type=user_type,
+                actor_object_id=str(actor.pk),
+                target_content_type=user_type,
+                target_object_id=str(actor.pk),
+                verb='benchmark',
+                public=False,
+                data={'extra_data': {'song_url': 'https://open.spotify.com/track/benchmark'}},
+            )
+            for _ in range(count)
+        ])
+
+    def _render(self, recipient, page_size):
+        request = APIRequestFactory().get('/api/notifications/', {'page_size': page_size})
+        force_authenticate(request, user=recipient)
+        # Warm the process-level ContentType cache as a running worker would have it
+        ContentType.objects.clear_cache()
+        ContentType.objects.get_for_model(User)
+
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = NotificationListView.as_view()(request)
+            response.render()
+            elapsed = time.perf_counter() - start
+
+        if response.status_code != 200:
+            raise CommandError(f'Notification list returned {response.status_code}')
+        return len(context.captured_queries), elapsed
+
+    def _render_legacy(self, recipient, count):
+        notifications = Notification.objects.filter(recipient=recipient).order_by('-timestamp')[:count]
+        with CaptureQueriesContext(connection) as context:
+            NotificationHQSerializer(notifications, many=True).data
+        return len(context.captured_queries)
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('notifications', '0010_rename_notification_recipient_unread_notificatio_recipie_8bedf2_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_id', models.IntegerField(unique=True, verbose_name='notification id')),
+                ('verb', models.CharField(max_length=255, verbose_name='verb')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='description')),
+                ('actor_object_id', models.CharField(max_length=255, verbose_name='actor object id')),
+                ('target_object_id', models.CharField(blank=True, max_length=255, null=True, verbose_name='target object id')),
+                ('data', models.JSONField(blank=True, null=True, verbose_name='data')),
+                ('timestamp', models.DateTimeField(verbose_name='timestamp')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='archived at')),
+            ],
+            options={
+                'verbose_name': 'Archived notification',
+                'verbose_name_plural': 'Archived notifications',
+                'ordering': ('-timestamp',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'unread', 'deleted', 'timestamp'], name='notificatio_recipie_633b7c_idx'),
+        ),
+        migrations.AddField(
+            model_name='notificationarchive',
+            name='actor_content_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype', verbose_name='actor content type'),
+        ),
+        migrations.AddField(
+            model_name='notificationarchive',
+            name='recipient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL, verbose_name='recipient'),
+        ),
+        migrations.AddField(
+            model_name='notificationarchive',
+            name='target_content_type',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype', verbose_name='target content type'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationarchive',
+            index=models.Index(fields=['recipient', 'timestamp'], name='notificatio_recipie_e4bb2e_idx'),
+        ),
+    ]
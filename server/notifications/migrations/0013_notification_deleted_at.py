@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:06
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def start_grace_period(apps, schema_editor):
+    # When already soft-deleted notifications were deleted is unknown; their
+    # retention period starts now rather than at their creation
+    Notification = apps.get_model('notifications', 'Notification')
+    Notification.objects.filter(deleted=True).update(deleted_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0012_notification_list_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='deleted at'),
+        ),
+        migrations.RunPython(start_grace_period, migrations.RunPython.noop),
+    ]
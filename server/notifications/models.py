@@ -1,3 +1,8 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 from swapper import swappable_setting
 
 from .base.models import AbstractNotification, notify_handler  # noqa
@@ -20,4 +25,65 @@ class Notification(AbstractNotification):
 
     def naturaltime(self):
         from django.contrib.humanize.templatetags.humanize import naturaltime
-        return naturaltime(self.timestamp)     
\ No newline at end of file
+        return naturaltime(self.timestamp)
+
+
+class NotificationArchive(models.Model):
+    """
+    Compact copy of an old read notification, moved out of the live
+    notifications table by the ``archive_notifications`` command.
+    """
+    notification_id = models.IntegerField(_('notification id'), unique=True)
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_notifications',
+        verbose_name=_('recipient'),
+    )
+    verb = models.CharField(_('verb'), max_length=255)
+    description = models.TextField(_('description'), blank=True, null=True)
+    actor_content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('actor content type'),
+    )
+    actor_object_id = models.CharField(_('actor object id'), max_length=255)
+    target_content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('target content type'),
+        blank=True,
+        null=True,
+    )
+    target_object_id = models.CharField(_('target object id'), max_length=255, blank=True, null=True)
+    data = models.JSONField(_('data'), blank=True, null=True)
+    timestamp = models.DateTimeField(_('timestamp'))
+    archived_at = models.DateTimeField(_('archived at'), default=timezone.now)
+
+    class Meta:
+        ordering = ('-timestamp',)
+        indexes = [
+            models.Index(fields=['recipient', 'timestamp']),
+        ]
+        verbose_name = _('Archived notification')
+        verbose_name_plural = _('Archived notifications')
+
+    def __str__(self):
+        return f'{self.verb} ({self.timestamp:%Y-%m-%d})'
+
+    @classmethod
+    def from_notification(cls, notification):
+        return cls(
+            notification_id=notification.id,
+            recipient_id=notification.recipient_id,
+            verb=notification.verb,
+            description=notification.description,
+            actor_content_type_id=notification.actor_content_type_id,
+            actor_object_id=notification.actor_object_id,
+            target_content_type_id=notification.target_content_type_id,
+            target_object_id=notification.target_object_id,
+            data=notification.data,
+            timestamp=notification.timestamp,
+        )
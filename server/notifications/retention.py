@@ -0,0 +1,54 @@
+''' Django notifications retention helpers '''
+# -*- coding: utf-8 -*-
+from django.db import models, transaction
+from django.db.models import Max, Min
+
+from notifications.models import Notification, NotificationArchive
+
+
+def pk_ranges(queryset, batch_size):
+    """
+    Yield half-open (start, end) primary key ranges covering the queryset.
+
+    Working through PK ranges keeps every statement on a bounded slice of the
+    primary key index, so a batch never holds locks on more than batch_size rows.
+    """
+    bounds = queryset.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return
+    for start in range(bounds['low'], bounds['high'] + 1, batch_size):
+        yield start, start + batch_size
+
+
+def delete_batch(queryset):
+    """Hard-delete a batch; purged rows are read or deleted, so unread counters are unaffected."""
+    deleted, _ = models.QuerySet.delete(queryset)
+    return deleted
+
+
+def archive_batch(queryset):
+    """Copy a batch into NotificationArchive and delete the originals in one transaction."""
+    with transaction.atomic():
+        notifications = list(queryset.select_for_update(skip_locked=True))
+        if not notifications:
+            return 0
+        NotificationArchive.objects.bulk_create(
+            [NotificationArchive.from_notification(notification) for notification in notifications],
+            ignore_conflicts=True,
+        )
+        return delete_batch(Notification.objects.filter(id__in=[n.id for n in notifications]))
+
+
+def process_in_ranges(queryset, batch_size, archive=False, progress=None):
+    """
+    Archive or delete every notification in the queryset, one PK range at a time.
+    Returns the number of rows removed from the notifications table.
+    """
+    handler = archive_batch if archive else delete_batch
+    total = 0
+    for start, end in pk_ranges(queryset, batch_size):
+        removed = handler(queryset.filter(id__gte=start, id__lt=end).order_by())
+        total += removed
+        if removed and progress:
+            progress(total)
+    return total
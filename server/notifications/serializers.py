@@ -6,6 +6,28 @@ from notifications.models import Notification
 from django.contrib.contenttypes.models import ContentType
 
 
+def format_created_ago(timestamp, now=None):
+    time_difference = (now or timezone.now()) - timestamp
+
+    if time_difference < timedelta(minutes=1):
+        return "just now"
+    elif time_difference < timedelta(hours=1):
+        minutes = int(time_difference.total_seconds() // 60)
+        return f"{minutes} min ago"
+    elif time_difference < timedelta(days=1):
+        hours = int(time_difference.total_seconds() // 3600)
+        return f"{hours} hour{'s' if hours > 1 else ''} ago"
+    else:
+        days = time_difference.days
+        return f"{days} day{'s' if days > 1 else ''} ago"
+
+
+def get_extra_data(obj, key):
+    if obj.data:
+        return obj.data.get('extra_data', {}).get(key)
+    return None
+
+
 class ContentTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = ContentType
@@ -23,29 +45,51 @@ class NotificationHQSerializer(serializers.ModelSerializer):
 
 
     def get_created_ago(self, obj):
-        now = timezone.now()
-        time_difference = now - obj.timestamp
-
-        if time_difference < timedelta(minutes=1):
-            return "just now"
-        elif time_difference < timedelta(hours=1):
-            minutes = int(time_difference.total_seconds() // 60)
-            return f"{minutes} min ago"
-        elif time_difference < timedelta(days=1):
-            hours = int(time_difference.total_seconds() // 3600)
-            return f"{hours} hour{'s' if hours > 1 else ''} ago"
-        else:
-            days = time_difference.days
-            return f"{days} day{'s' if days > 1 else ''} ago"
+        return format_created_ago(obj.timestamp)
 
     def get_song_url(self, obj):
-        if obj.data:
-            return obj.data.get('extra_data', {}).get('song_url')
-        else:
-            return None
+        return get_extra_data(obj, 'song_url')
 
     def get_activity_id(self, obj):
-        if obj.data:
-            return obj.data.get('extra_data', {}).get('activity_id')
-        else:
+        return get_extra_data(obj, 'activity_id')
+
+
+class NotificationListSerializer(serializers.ModelSerializer):
+    """
+    Read path for notification lists.
+
+    Renders the same payload as NotificationHQSerializer without per-row queries:
+    content types come from the process-level ContentType cache, related ids are
+    read from their columns and ``created_ago`` is computed against the single
+    ``now`` passed in the serializer context.
+    """
+    target_content_type = serializers.SerializerMethodField()
+    created_ago = serializers.SerializerMethodField()
+    song_url = serializers.SerializerMethodField()
+    activity_id = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Notification
+        fields = [
+            'id', 'target_content_type', 'created_ago', 'song_url', 'activity_id',
+            'level', 'unread', 'actor_object_id', 'verb', 'description',
+            'target_object_id', 'action_object_object_id', 'timestamp', 'public',
+            'deleted', 'emailed', 'data', 'recipient', 'actor_content_type',
+            'action_object_content_type',
+        ]
+        read_only_fields = fields
+
+    def get_target_content_type(self, obj):
+        if obj.target_content_type_id is None:
             return None
+        content_type = ContentType.objects.get_for_id(obj.target_content_type_id)
+        return {'id': content_type.id, 'model': content_type.model}
+
+    def get_created_ago(self, obj):
+        return format_created_ago(obj.timestamp, self.context.get('now'))
+
+    def get_song_url(self, obj):
+        return get_extra_data(obj, 'song_url')
+
+    def get_activity_id(self, obj):
+        return get_extra_data(obj, 'activity_id')
@@ -9,6 +9,12 @@ CONFIG_DEFAULTS = {
     'SOFT_DELETE': False,
     'NUM_TO_FETCH': 10,
     'CACHE_TIMEOUT': 2,
+    'UNREAD_COUNT_CACHE_TIMEOUT': 60 * 5,
+    # Retention policy applied by the purge_notifications command
+    'RETENTION_DELETED_DAYS': 30,
+    'RETENTION_READ_DAYS': 90,
+    'RETENTION_ARCHIVE_READ': True,
+    'RETENTION_BATCH_SIZE': 1000,
 }
 
 
@@ -3,36 +3,65 @@ from rest_framework.response import Response
 from rest_framework import generics, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.pagination import CursorPagination
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from notifications.base.models import get_unread_count
 from notifications.models import Notification
+from notifications.settings import get_config
 from music.api.views import SongExchangePagination
-from .serializers import NotificationHQSerializer
+from .serializers import NotificationHQSerializer, NotificationListSerializer
 
 
+class NotificationCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the unbounded read/unread lists, newest first. The
+    cursor only compares the first ordering field and breaks ties by offset, so
+    it is the id: unique and increasing in creation order like the timestamp.
+    """
+    page_size = get_config()['PAGINATE_BY']
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = '-id'
 
-class NotificationListView(generics.ListAPIView):
-    serializer_class = NotificationHQSerializer
+
+class NotificationListMixin:
+    """Shared read path for the notification list endpoints"""
+    serializer_class = NotificationListSerializer
+
+    def get_queryset(self):
+        return self.get_notifications()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['now'] = timezone.now()
+        return context
+
+
+class NotificationListView(NotificationListMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = SongExchangePagination
 
-    def get_queryset(self):
+    def get_notifications(self):
         return Notification.objects.filter(recipient=self.request.user).order_by('-timestamp')
 
 
-class UnreadNotificationListView(generics.ListAPIView):
-    serializer_class = NotificationHQSerializer
+class UnreadNotificationListView(NotificationListMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationCursorPagination
 
-    def get_queryset(self):
-        return self.request.user.notifications.unread().order_by('-timestamp')
+    def get_notifications(self):
+        return self.request.user.notifications.unread()
 
 
-class ReadNotificationListView(generics.ListAPIView):
-    serializer_class = NotificationHQSerializer
+class ReadNotificationListView(NotificationListMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationCursorPagination
 
-    def get_queryset(self):
-        return self.request.user.notifications.read().order_by('-timestamp')
+    def get_notifications(self):
+        return self.request.user.notifications.read()
 
 
 class NotificationDetailView(generics.RetrieveAPIView):
@@ -44,11 +73,19 @@ class NotificationDetailView(generics.RetrieveAPIView):
         return Notification.objects.filter(recipient=self.request.user)
 
 
+def unread_count_etag(request, *args, **kwargs):
+    # Resolved from the cached counter, so an unchanged count answers
+    # If-None-Match with a 304 without querying the notifications table. With a
+    # per-process cache the count, and so the ETag, comes from the database.
+    return f'unread-{request.user.pk}-{get_unread_count(request.user)}'
+
+
 class UnreadNotificationsCountView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @method_decorator(condition(etag_func=unread_count_etag))
     def get(self, request):
-        unread_count = request.user.notifications.unread().count()
+        unread_count = get_unread_count(request.user)
 
         return Response({
             'count': unread_count
@@ -68,7 +105,7 @@ class MarkAllAsReadView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        request.user.notifications.unread().mark_all_as_read()
+        request.user.notifications.unread().mark_all_as_read(recipient=request.user)
         return Response({'detail': 'All unread notifications marked as read'})
 
 
@@ -76,7 +113,7 @@ class MarkAllAsUnreadView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        request.user.notifications.read().mark_all_as_unread()
+        request.user.notifications.read().mark_all_as_unread(recipient=request.user)
         return Response({'detail': 'All read notifications marked as unread'})
 
 
@@ -85,7 +122,7 @@ class DeleteNotificationView(APIView):
 
     def delete(self, request, pk):
         notification = get_object_or_404(Notification, pk=pk, recipient=request.user)
-        notification.deleted()
+        notification.mark_as_deleted()
         return Response({'detail': 'Notification soft deleted'})
 
 
@@ -94,7 +131,7 @@ class MarkAllAsDeletedView(APIView):
 
     def post(self, request):
         notifications = request.user.notifications.read()
-        count = notifications.update(deleted=True)
+        count = notifications.update(deleted=True, deleted_at=timezone.now())
 
         return Response({
             'detail': f'{count} notifications marked as deleted'
@@ -68,7 +68,7 @@ class ResendOTPView(APIView):
             if user.email:
                 import logging
                 logger = logging.getLogger(__name__)
-                logger.info(f"Resending OTP to {user.email}: {otp_obj.otp}")
+                logger.info("Resending OTP to %s: %s", user.email, otp_obj.otp)
                 
                 try:
                     send_mail(
@@ -78,9 +78,9 @@ class ResendOTPView(APIView):
                         [user.email],
                         fail_silently=False,
                     )
-                    logger.info(f"OTP email sent to {user.email}")
+                    logger.info("OTP email sent to %s", user.email)
                 except Exception as e:
-                    logger.error(f"Failed to send OTP email to {user.email}: {str(e)}", exc_info=True)
+                    logger.error("Failed to send OTP email to %s: %s", user.email, e, exc_info=True)
 
             # If you have SMS functionality, add it here
             # For example:
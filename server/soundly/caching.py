@@ -0,0 +1,16 @@
+"""
+Whether the default cache is shared by all server processes.
+
+gunicorn runs several workers. With a per-process cache (LocMemCache, the
+default when CACHE_BACKEND is not set), a value cached or invalidated by one
+worker is invisible to the others, so a cache that is dropped on writes keeps
+serving stale data from the other workers until it expires. Such caches are
+only used when shared_cache() is true; otherwise the data is read from the
+database.
+"""
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def shared_cache():
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache)
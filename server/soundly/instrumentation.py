@@ -0,0 +1,127 @@
+"""
+In-process request metrics recorded by RequestInstrumentationMiddleware.
+
+Each worker keeps its own histograms of wall time, DB query count and DB time per
+resolved URL name. They reset on restart and are exposed per worker through the
+admin-only request_metrics view.
+"""
+import bisect
+import threading
+import time
+
+# Upper bounds of the histogram buckets; the last bucket catches everything above.
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Fixed-bucket histogram with count, sum and max"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of observations"""
+        if not self.count:
+            return None
+        threshold = fraction * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            seen += bucket_count
+            if seen >= threshold:
+                return bound
+        return self.max
+
+    def snapshot(self):
+        labels = [f'le_{bound}' for bound in self.buckets] + ['inf']
+        return {
+            'count': self.count,
+            'sum': round(self.total, 3),
+            'mean': round(self.total / self.count, 3) if self.count else None,
+            'max': round(self.max, 3),
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class RouteStats:
+    def __init__(self):
+        self.wall_ms = Histogram(DURATION_BUCKETS_MS)
+        self.db_ms = Histogram(DURATION_BUCKETS_MS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.budget_violations = 0
+
+    def snapshot(self):
+        return {
+            'wall_ms': self.wall_ms.snapshot(),
+            'db_ms': self.db_ms.snapshot(),
+            'queries': self.queries.snapshot(),
+            'budget_violations': self.budget_violations,
+        }
+
+
+class RequestMetrics:
+    """Per-route statistics shared by all threads of a worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self.started_at = time.time()
+
+    def record(self, route, wall_ms, db_ms, queries, over_budget=False):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats()
+            stats.wall_ms.observe(wall_ms)
+            stats.db_ms.observe(db_ms)
+            stats.queries.observe(queries)
+            if over_budget:
+                stats.budget_violations += 1
+
+    def snapshot(self):
+        with self._lock:
+            routes = {route: stats.snapshot() for route, stats in sorted(self._routes.items())}
+        return {
+            'started_at': self.started_at,
+            'routes': routes,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+            self.started_at = time.time()
+
+
+request_metrics = RequestMetrics()
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper counting queries and the time spent in them.
+
+    Installed with ``connection.execute_wrapper`` for the duration of a request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
@@ -0,0 +1,65 @@
+"""
+Logging through an in-process queue, so formatting and writing log records
+happens on a background thread instead of the request thread.
+
+Django calls LOGGING_CONFIG with the LOGGING dict. configure_logging applies it
+with dictConfig, then puts a QueueHandler in place of the handlers of the root
+logger and of every logger LOGGING configures. One QueueListener thread per
+distinct set of handlers hands the records to them, respecting their levels.
+Listeners are stopped, which drains their queue, at exit, and restarted in
+forked worker processes, where their thread does not survive.
+"""
+import atexit
+import copy
+import logging
+import logging.config
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+_listeners = []
+
+
+class MessageQueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Only the message is rendered here, while its arguments still hold the
+        # logged values; the rest of the formatting, tracebacks included, is left
+        # to the listener's handlers
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def stop_listeners():
+    while _listeners:
+        _listeners.pop().stop()
+
+
+def restart_listeners():
+    for listener in _listeners:
+        listener._thread = None
+        listener.start()
+
+
+def configure_logging(config):
+    stop_listeners()
+    logging.config.dictConfig(config)
+
+    queue_handlers = {}
+    for name in [None, *config.get('loggers', {})]:
+        logger = logging.getLogger(name)
+        handlers = tuple(logger.handlers)
+        if not handlers:
+            continue
+        if handlers not in queue_handlers:
+            log_queue = queue.SimpleQueue()
+            listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            listener.start()
+            _listeners.append(listener)
+            queue_handlers[handlers] = MessageQueueHandler(log_queue)
+        logger.handlers = [queue_handlers[handlers]]
+
+
+atexit.register(stop_listeners)
+os.register_at_fork(after_in_child=restart_listeners)
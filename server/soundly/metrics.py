@@ -0,0 +1,59 @@
+"""
+Prometheus metrics for the application hot paths, exported by soundly.views.metrics.
+
+Under gunicorn every worker keeps its own values. Set PROMETHEUS_MULTIPROC_DIR to
+an empty directory shared by the workers (it must exist before they start) and
+the client library writes samples there so /metrics aggregates all workers;
+gunicorn.conf.py cleans up after exited workers.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+INGEST_STAGE_SECONDS = Histogram(
+    'soundly_song_ingest_stage_seconds',
+    'Time spent in each stage of a song upload',
+    ['stage'],
+)
+MATCH_OUTCOMES = Counter(
+    'soundly_match_outcomes_total',
+    'Song matching attempts by match type and outcome',
+    ['match_type', 'outcome'],
+)
+FEED_ASSEMBLY_SECONDS = Histogram(
+    'soundly_feed_assembly_seconds',
+    'Time to assemble the activity feed',
+)
+NOTIFICATION_FANOUT = Histogram(
+    'soundly_notification_fanout_recipients',
+    'Recipients per notification send',
+    ['verb'],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 1000),
+)
+CACHE_REQUESTS = Counter(
+    'soundly_cache_requests_total',
+    'Application cache lookups by cache and result',
+    ['cache', 'result'],
+)
+
+
+def record_cache_lookup(cache_name, hit):
+    CACHE_REQUESTS.labels(cache=cache_name, result='hit' if hit else 'miss').inc()
+
+
+def render_latest():
+    """Exposition payload and content type for the current process or all workers"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -1,9 +1,20 @@
 """
 Custom CORS middleware that adds CORS headers to all responses.
 This ensures CORS works properly for frontend-backend communication.
+
+RequestInstrumentationMiddleware records per-route timing and query counts.
 """
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.http import HttpResponse
 from django.conf import settings
+from django.db import connection
+
+from soundly.instrumentation import QueryRecorder, request_metrics
+
+logger = logging.getLogger(__name__)
 
 
 class CustomCorsMiddleware:
@@ -12,11 +23,18 @@ class CustomCorsMiddleware:
     In development, allows all origins. In production, should be configured
     to only allow specific origins.
     """
+    sync_capable = True
+    async_capable = True
     
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
     
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
         # Handle OPTIONS preflight requests
         if request.method == "OPTIONS":
             response = HttpResponse()
@@ -30,6 +48,14 @@ class CustomCorsMiddleware:
         self._add_cors_headers(request, response)
         
         return response
+
+    async def __acall__(self, request):
+        if request.method == "OPTIONS":
+            response = HttpResponse()
+        else:
+            response = await self.get_response(request)
+        self._add_cors_headers(request, response)
+        return response
     
     def _add_cors_headers(self, request, response):
         """Add CORS headers based on settings."""
@@ -60,3 +86,81 @@ class CustomCorsMiddleware:
         
         # Preflight cache
         response["Access-Control-Max-Age"] = "86400"
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Records wall time, DB query count and DB time per resolved URL name.
+
+    The figures are added to the response as a ``Server-Timing`` header and kept
+    in the worker's histograms (see soundly.instrumentation). Routes listed in
+    ``REQUEST_QUERY_BUDGETS`` log a warning when a request runs more queries than
+    its budget; ``REQUEST_QUERY_BUDGET_DEFAULT`` applies to all other routes.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "REQUEST_INSTRUMENTATION_ENABLED", True)
+        self.budgets = getattr(settings, "REQUEST_QUERY_BUDGETS", {})
+        self.default_budget = getattr(settings, "REQUEST_QUERY_BUDGET_DEFAULT", None)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        return self._finish(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        # Connections are per thread and the ORM runs in the request's sync
+        # thread (sync_to_async), so the wrapper has to be installed there
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        wrapper = await sync_to_async(self._install_wrapper)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrapper.__exit__)(None, None, None)
+        return self._finish(request, response, recorder, start)
+
+    def _install_wrapper(self, recorder):
+        wrapper = connection.execute_wrapper(recorder)
+        wrapper.__enter__()
+        return wrapper
+
+    def _finish(self, request, response, recorder, start):
+        wall_ms = (time.perf_counter() - start) * 1000
+        db_ms = recorder.duration * 1000
+
+        route = self._route_name(request)
+        budget = self.budgets.get(route, self.default_budget)
+        over_budget = budget is not None and recorder.count > budget
+        if over_budget:
+            logger.warning(
+                "Query budget exceeded on %s: %d queries (budget %d) for %s %s",
+                route, recorder.count, budget, request.method, request.path
+            )
+
+        request_metrics.record(route, wall_ms, db_ms, recorder.count, over_budget)
+        response["Server-Timing"] = (
+            f'app;dur={wall_ms:.1f}, db;dur={db_ms:.1f};desc="{recorder.count} queries"'
+        )
+        return response
+
+    def _route_name(self, request):
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "<unresolved>"
+        return match.view_name or match.route
@@ -55,6 +55,7 @@ MIDDLEWARE = [
     # CORS middleware must be at the top to handle preflight requests
     # Using ONLY custom middleware - removed django-cors-headers as it was interfering
     "soundly.middleware.CustomCorsMiddleware",
+    "soundly.middleware.RequestInstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -94,6 +95,7 @@ YEARLY_PRICE_ID = "price_1Rqw69AMYVKKEks2BtxXCxL8"
 SONG_UPLOAD_LIMIT = config("SONG_UPLOAD_LIMIT")
 
 WSGI_APPLICATION = "soundly.wsgi.application"
+ASGI_APPLICATION = "soundly.asgi.application"
 
 DATABASES = {
     "default": {
@@ -106,6 +108,32 @@ DATABASES = {
     }
 }
 
+# Cache - defaults to a per-process local memory cache. Point CACHE_BACKEND at a
+# shared backend (e.g. django.core.cache.backends.redis.RedisCache, as prod.yml
+# does) so cached counters are shared by all gunicorn workers; caches that must
+# stay consistent across workers are bypassed otherwise (soundly/caching.py).
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default="soundly"),
+    }
+}
+
+# Request instrumentation - per-route timing histograms and optional query budgets,
+# e.g. REQUEST_QUERY_BUDGETS = {"api:user-profile-by-uid": 15}
+REQUEST_INSTRUMENTATION_ENABLED = config("REQUEST_INSTRUMENTATION_ENABLED", default=True, cast=bool)
+REQUEST_QUERY_BUDGETS = {}
+REQUEST_QUERY_BUDGET_DEFAULT = config("REQUEST_QUERY_BUDGET_DEFAULT", default=None, cast=lambda v: int(v) if v else None)
+
+# Bearer token required by the Prometheus /metrics endpoint; when empty, only
+# direct requests from loopback or private addresses are served
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# Seconds a public profile aggregate stays cached; signals drop it earlier on change
+PROFILE_CACHE_TIMEOUT = config("PROFILE_CACHE_TIMEOUT", default=300, cast=int)
+
 AUTH_USER_MODEL = "users.User"
 ACCOUNT_USERNAME_REQUIRED = False
 ACCOUNT_AUTHENTICATION_METHOD = "email"
@@ -149,7 +177,9 @@ REST_AUTH_SERIALIZERS = {
 }
 
 DJANGO_NOTIFICATIONS_CONFIG = {
-    'USE_JSONFIELD': True
+    'USE_JSONFIELD': True,
+    # Deleted notifications are flagged, and unread()/read() filter them out
+    'SOFT_DELETE': True,
 }
 
 FRONTEND_BASE_URL = "https://www.soundlybeats.com"
@@ -241,7 +271,40 @@ CORS_ALLOWED_ORIGINS = config(
 SPOTIPY_CLIENT_ID = config("SPOTIPY_CLIENT_ID", default="")
 SPOTIPY_CLIENT_SECRET = config("SPOTIPY_CLIENT_SECRET", default="")
 
+# Upload path backends (see music/providers.py). Set both to the music.providers.Fake*
+# classes to run offline, with optional injected latency and error rate.
+SONG_METADATA_PROVIDER = config(
+    "SONG_METADATA_PROVIDER", default="music.spotify_utils.SpotifyMetadataProvider"
+)
+FUN_FACT_PROVIDER = config("FUN_FACT_PROVIDER", default="music.gen_ai.GeminiFunFactProvider")
+FAKE_PROVIDER_LATENCY_MS = config("FAKE_PROVIDER_LATENCY_MS", default=0, cast=float)
+FAKE_PROVIDER_LATENCY_JITTER_MS = config("FAKE_PROVIDER_LATENCY_JITTER_MS", default=0, cast=float)
+FAKE_PROVIDER_ERROR_RATE = config("FAKE_PROVIDER_ERROR_RATE", default=0.0, cast=float)
+
+# Concurrent external calls of an upload (see music/ingest.py): pool size per worker
+# process, and the overall budget after which a pending fun fact or push is dropped
+UPLOAD_EXECUTOR_WORKERS = config("UPLOAD_EXECUTOR_WORKERS", default=8, cast=int)
+UPLOAD_DEADLINE_SECONDS = config("UPLOAD_DEADLINE_SECONDS", default=20, cast=float)
+# Tracks taken from one playlist, album or url list by songs/bulk-import/
+BULK_IMPORT_MAX_TRACKS = config("BULK_IMPORT_MAX_TRACKS", default=100, cast=int)
+# Most recent songs sharing a genre that songs/<uid>/match-preview/ scores
+MATCH_PREVIEW_CANDIDATES = config("MATCH_PREVIEW_CANDIDATES", default=2000, cast=int)
+# Of those, how many closest on shared genres alone get their genre similarity scored in full
+MATCH_PREVIEW_SCORED = config("MATCH_PREVIEW_SCORED", default=500, cast=int)
+# Age after which a process rebuilds its genre vector index of the pending pool (music/genre_vectors.py)
+GENRE_INDEX_REFRESH_SECONDS = config("GENRE_INDEX_REFRESH_SECONDS", default=300, cast=int)
+# How long before its commit a pending exchange may have been created and still be added between rebuilds
+GENRE_INDEX_COMMIT_MARGIN_SECONDS = config("GENRE_INDEX_COMMIT_MARGIN_SECONDS", default=60, cast=int)
+# Most recent matches of a query that songs/search/ ranks on PostgreSQL (music/search.py)
+SONG_SEARCH_CANDIDATES = config("SONG_SEARCH_CANDIDATES", default=1000, cast=int)
+# Page-number lists count up to this many rows exactly, and report PostgreSQL's estimate past it (core/pagination.py)
+PAGINATION_EXACT_COUNT_LIMIT = config("PAGINATION_EXACT_COUNT_LIMIT", default=10000, cast=int)
+# Seconds a list count is cached per query; 0 disables the cache
+PAGINATION_COUNT_CACHE_SECONDS = config("PAGINATION_COUNT_CACHE_SECONDS", default=0, cast=int)
+
 # Logging Configuration
+# Handlers run on a background thread fed by a queue (soundly/logging_queue.py)
+LOGGING_CONFIG = "soundly.logging_queue.configure_logging"
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -3,7 +3,7 @@ from django.urls import include, path
 from django.contrib import admin
 
 from search import views as search_views
-from soundly.views import api_root, health_check, readiness_check, cors_test
+from soundly.views import api_root, health_check, readiness_check, cors_test, request_metrics_view, metrics
 
 from dj_rest_auth.views import LoginView, PasswordResetConfirmView
 from dj_rest_auth.registration.views import RegisterView
@@ -15,7 +15,9 @@ urlpatterns = [
     path("", api_root, name="api_root"),
     path("health/", health_check, name="health_check"),
     path("ready/", readiness_check, name="readiness_check"),
+    path("metrics", metrics, name="metrics"),
     path("cors-test/", cors_test, name="cors_test"),
+    path("request-metrics/", request_metrics_view, name="request_metrics"),
     path("admin/", admin.site.urls),
     path("search/", search_views.search, name="search"),
     path("auth/signup/", CustomRegisterView.as_view(), name="account_signup"),
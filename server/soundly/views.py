@@ -1,9 +1,16 @@
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.db import connection
 from django.conf import settings
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+import ipaddress
 import logging
 
+from soundly.instrumentation import request_metrics
+from soundly.metrics import render_latest
+
 logger = logging.getLogger(__name__)
 
 
@@ -68,7 +75,7 @@ def readiness_check(request):
             }
         }, status=200)
     except Exception as e:
-        logger.error(f"Readiness check failed: {e}", exc_info=True)
+        logger.error("Readiness check failed: %s", e, exc_info=True)
         return JsonResponse({
             "status": "not_ready",
             "service": "soundly-api",
@@ -79,6 +86,50 @@ def readiness_check(request):
         }, status=503)
 
 
+def is_internal_request(request):
+    """
+    Whether the request comes straight from a loopback or private address.
+    Requests relayed by the reverse proxy carry X-Forwarded-For and are not.
+    """
+    if "X-Forwarded-For" in request.headers:
+        return False
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return address.is_loopback or address.is_private
+
+
+@require_http_methods(["GET"])
+def metrics(request):
+    """
+    Prometheus exposition of the application metrics.
+    Scrapers must send METRICS_TOKEN as a bearer token; without a token
+    configured, only internal requests are served.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        if request.headers.get("Authorization") != f"Bearer {token}":
+            return HttpResponse(status=403)
+    elif not is_internal_request(request):
+        return HttpResponse(status=403)
+
+    payload, content_type = render_latest()
+    return HttpResponse(payload, content_type=content_type)
+
+
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAdminUser])
+def request_metrics_view(request):
+    """
+    Per-route wall time, query count and DB time histograms of the worker that
+    serves the request. DELETE resets them.
+    """
+    if request.method == "DELETE":
+        request_metrics.reset()
+    return Response(request_metrics.snapshot())
+
+
 @require_http_methods(["GET", "OPTIONS"])
 def cors_test(request):
     """
@@ -107,7 +158,7 @@ def cors_test(request):
             k: v for k, v in response.items() 
             if k.startswith("Access-Control-")
         }
-        logger.debug(f"CORS test endpoint - Response headers: {list(cors_headers.keys())}")
+        logger.debug("CORS test endpoint - Response headers: %s", list(cors_headers.keys()))
     
     return response
 
@@ -73,7 +73,10 @@ class StripeWebhookView(APIView):
         data = json.loads(request.body)
 
         if data["type"] == "invoice.payment_succeeded":
-            logger.info(f"Stripe webhook received: invoice.payment_succeeded for customer {data.get('data', {}).get('object', {}).get('customer', 'unknown')}")
+            logger.info(
+                "Stripe webhook received: invoice.payment_succeeded for customer %s",
+                data.get('data', {}).get('object', {}).get('customer', 'unknown')
+            )
             create_subscription(data)
 
         if data["type"] == "customer.subscription.deleted":
@@ -87,7 +87,7 @@ class CustomRegisterSerializer(RegisterSerializer):
         # Log successful registration
         import logging
         logger = logging.getLogger(__name__)
-        logger.info(f"User registered and activated: {user.email}")
+        logger.info("User registered and activated: %s", user.email)
 
         return user
 
@@ -7,6 +7,8 @@ logger = logging.getLogger(__name__)
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
+from adrf.decorators import api_view as async_api_view
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 from dj_rest_auth.views import PasswordResetView
@@ -42,7 +44,7 @@ class DeleteUserView(APIView):
         user = request.user
         user_email = user.email
         user.delete()
-        logger.info(f"User {user_email} deleted their account")
+        logger.info("User %s deleted their account", user_email)
         return Response({"detail": "User deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
 
 
@@ -86,9 +88,9 @@ class NotificationToggleView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-@api_view(['POST'])
+@async_api_view(['POST'])
 @handle_api_errors
-def google_auth(request):
+async def google_auth(request):
     """
     Google OAuth authentication endpoint.
     Accepts id_token from Google Sign-In and returns JWT tokens.
@@ -104,8 +106,9 @@ def google_auth(request):
         )
 
     try:
-        # Verify the Google OAuth token
-        id_info = id_token.verify_oauth2_token(
+        # Verify the Google OAuth token; fetching Google's certificates is a
+        # blocking HTTP call, so it runs in a worker thread
+        id_info = await sync_to_async(id_token.verify_oauth2_token, thread_sensitive=False)(
             id_token_str,
             requests.Request(),
             GOOGLE_CLIENT_ID
@@ -119,7 +122,7 @@ def google_auth(request):
             )
 
         # Get or create user based on email
-        user, created = User.objects.get_or_create(
+        user, created = await User.objects.aget_or_create(
             email=email,
             defaults={
                 'first_name': id_info.get('given_name', ''),
@@ -134,7 +137,7 @@ def google_auth(request):
                 user.first_name = id_info.get('given_name', '')
             if id_info.get('family_name') and not user.last_name:
                 user.last_name = id_info.get('family_name', '')
-            user.save()
+            await user.asave()
 
         # Generate JWT tokens
         refresh = RefreshToken.for_user(user)
@@ -165,7 +168,7 @@ def google_auth(request):
     except Exception as e:
         # Log the error for debugging
         import traceback
-        logger.error(f"Google OAuth error: {str(e)}", exc_info=True)
+        logger.error("Google OAuth error: %s", e, exc_info=True)
         return Response(
             {'error': 'Authentication failed. Please try again.'}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -182,19 +185,19 @@ class CustomRegisterView(RegisterView):
     """Custom registration view with error logging"""
     
     def post(self, request, *args, **kwargs):
-        logger.info(f"Registration attempt for email: {request.data.get('email', 'unknown')}")
-        logger.debug(f"Registration data keys: {list(request.data.keys())}")
+        logger.info("Registration attempt for email: %s", request.data.get('email', 'unknown'))
+        logger.debug("Registration data keys: %s", list(request.data.keys()))
         
         try:
             response = super().post(request, *args, **kwargs)
             if response.status_code == 201:
-                logger.info(f"Registration successful for: {request.data.get('email')}")
+                logger.info("Registration successful for: %s", request.data.get('email'))
             else:
-                logger.warning(f"Registration failed with status {response.status_code} for {request.data.get('email', 'unknown')}")
-                logger.warning(f"Error details: {response.data}")
+                logger.warning("Registration failed with status %s for %s", response.status_code, request.data.get('email', 'unknown'))
+                logger.warning("Error details: %s", response.data)
             return response
         except Exception as e:
-            logger.error(f"Registration exception for {request.data.get('email', 'unknown')}: {str(e)}", exc_info=True)
+            logger.error("Registration exception for %s: %s", request.data.get('email', 'unknown'), e, exc_info=True)
             return Response(
                 {'error': 'Registration failed', 'details': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
@@ -220,7 +223,7 @@ def check_daily_upload_limit(request):
                 "response": "Unlimited uploads"
             }, status=status.HTTP_200_OK)
     except Exception as e:
-        logger.error(f"Error checking upload limit for {request.user.email}: {str(e)}", exc_info=True)
+        logger.error("Error checking upload limit for %s: %s", request.user.email, e, exc_info=True)
         return Response(
             {"error": "Failed to check upload limit"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -237,13 +240,13 @@ class FriendRequestView(APIView):
         try:
             target_user = User.objects.get(uid=user_id)
         except User.DoesNotExist:
-            logger.warning(f"User {request.user.email} attempted to send friend request to non-existent user {user_id}")
+            logger.warning("User %s attempted to send friend request to non-existent user %s", request.user.email, user_id)
             return Response(
                 {"error": "User not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            logger.error(f"Error fetching user {user_id}: {str(e)}", exc_info=True)
+            logger.error("Error fetching user %s: %s", user_id, e, exc_info=True)
             return Response(
                 {"error": "Invalid user ID"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -321,13 +324,13 @@ class FriendAcceptView(APIView):
         try:
             requester = User.objects.get(uid=user_id)
         except User.DoesNotExist:
-            logger.warning(f"User {request.user.email} attempted to accept friend request from non-existent user {user_id}")
+            logger.warning("User %s attempted to accept friend request from non-existent user %s", request.user.email, user_id)
             return Response(
                 {"error": "User not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            logger.error(f"Error fetching user {user_id}: {str(e)}", exc_info=True)
+            logger.error("Error fetching user %s: %s", user_id, e, exc_info=True)
             return Response(
                 {"error": "Invalid user ID"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -373,13 +376,13 @@ class FriendDeclineView(APIView):
         try:
             requester = User.objects.get(uid=user_id)
         except User.DoesNotExist:
-            logger.warning(f"User {request.user.email} attempted to decline friend request from non-existent user {user_id}")
+            logger.warning("User %s attempted to decline friend request from non-existent user %s", request.user.email, user_id)
             return Response(
                 {"error": "User not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            logger.error(f"Error fetching user {user_id}: {str(e)}", exc_info=True)
+            logger.error("Error fetching user %s: %s", user_id, e, exc_info=True)
             return Response(
                 {"error": "Invalid user ID"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -414,13 +417,13 @@ class FriendRemoveView(APIView):
         try:
             target_user = User.objects.get(uid=user_id)
         except User.DoesNotExist:
-            logger.warning(f"User {request.user.email} attempted to remove non-existent user {user_id}")
+            logger.warning("User %s attempted to remove non-existent user %s", request.user.email, user_id)
             return Response(
                 {"error": "User not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            logger.error(f"Error fetching user {user_id}: {str(e)}", exc_info=True)
+            logger.error("Error fetching user %s: %s", user_id, e, exc_info=True)
             return Response(
                 {"error": "Invalid user ID"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -459,7 +462,7 @@ class FriendsListView(APIView):
                 "friends": serializer.data
             }, status=status.HTTP_200_OK)
         except Exception as e:
-            logger.error(f"Error fetching friends for {request.user.email}: {str(e)}", exc_info=True)
+            logger.error("Error fetching friends for %s: %s", request.user.email, e, exc_info=True)
             return Response(
                 {"error": "Failed to fetch friends"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -481,7 +484,7 @@ class FriendStatusView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            logger.error(f"Error fetching user {user_id}: {str(e)}", exc_info=True)
+            logger.error("Error fetching user %s: %s", user_id, e, exc_info=True)
             return Response(
                 {"error": "Invalid user ID"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -539,13 +542,13 @@ class UserSearchView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         if len(query) < 2:
-            logger.warning(f"Search query too short ({len(query)} chars) from {request.user.email}")
+            logger.warning("Search query too short (%d chars) from %s", len(query), request.user.email)
             return Response({
                 "error": "Search query must be at least 2 characters"
             }, status=status.HTTP_400_BAD_REQUEST)
         
         if len(query) > 100:
-            logger.warning(f"Search query too long ({len(query)} chars) from {request.user.email}")
+            logger.warning("Search query too long (%d chars) from %s", len(query), request.user.email)
             return Response({
                 "error": "Search query must be less than 100 characters"
             }, status=status.HTTP_400_BAD_REQUEST)